@@ -0,0 +1,147 @@
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from simulation_engine import SimulationCancelled
+
+
+class BackgroundRunner:
+    """Runs one engine call at a time on a worker thread.
+
+    The worker only records its latest progress and final outcome; the Tk
+    main loop picks them up every ``poll_ms`` through ``after``, so the UI
+    gets one batched update per poll however fast the model reports.
+    """
+
+    def __init__(self, widget, poll_ms=100):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._thread = None
+        self._cancel = threading.Event()
+        self._progress = None
+        self._outcome = None
+        self._callbacks = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, func, kwargs, on_done, on_progress=None, on_error=None, on_cancel=None):
+        if self.running:
+            raise RuntimeError("A simulation is already running")
+        self._cancel.clear()
+        self._progress = None
+        self._outcome = None
+        self._callbacks = (on_done, on_progress, on_error, on_cancel)
+
+        def work():
+            try:
+                self._outcome = ("done", func(progress=self._report, **kwargs))
+            except SimulationCancelled:
+                self._outcome = ("cancelled", None)
+            except Exception as exc:
+                self._outcome = ("error", exc)
+
+        self._thread = threading.Thread(target=work, daemon=True)
+        self._thread.start()
+        self.widget.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _report(self, done, total):
+        if self._cancel.is_set():
+            raise SimulationCancelled()
+        self._progress = (done, total)
+
+    def _poll(self):
+        on_done, on_progress, on_error, on_cancel = self._callbacks
+        if self._progress is not None and on_progress is not None:
+            on_progress(*self._progress)
+        if self._outcome is None:
+            self.widget.after(self.poll_ms, self._poll)
+            return
+
+        kind, value = self._outcome
+        self._thread = None
+        if kind == "done":
+            on_done(value)
+        elif kind == "error" and on_error is not None:
+            on_error(value)
+        elif kind == "cancelled" and on_cancel is not None:
+            on_cancel()
+
+
+class ProgressPanel(ttk.Frame):
+    """Progress bar, status text and Cancel button driving a BackgroundRunner."""
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.runner = BackgroundRunner(self)
+
+        self.bar = ttk.Progressbar(self, mode="determinate", maximum=100, length=300)
+        self.bar.pack(side=tk.LEFT, padx=5)
+        self.status = ttk.Label(self, text="Ready", width=40)
+        self.status.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+    @property
+    def running(self):
+        return self.runner.running
+
+    def run(self, func, kwargs, on_done, on_progress=None, on_error=None):
+        """Start ``func(**kwargs)`` in the background; returns False if a run is already going.
+
+        ``on_progress(done, total)`` is called on the Tk thread after the bar is updated.
+        ``on_error(exc)`` may handle a failure itself by returning True; otherwise an
+        error dialog is shown.
+        """
+        if self.runner.running:
+            return False
+        self.bar["value"] = 0
+        self.status.config(text="Running...")
+        self.cancel_button.config(state=tk.NORMAL)
+
+        def done(result):
+            self._finish("Done", 100)
+            on_done(result)
+
+        def progress(done, total):
+            self._show_progress(done, total)
+            if on_progress is not None:
+                on_progress(done, total)
+
+        def error(exc):
+            if on_error is not None and on_error(exc):
+                self._finish("Failed", 0)
+            else:
+                self._show_error(exc)
+
+        self.runner.start(func, kwargs, on_done=done, on_progress=progress,
+                          on_error=error, on_cancel=lambda: self._finish("Cancelled", 0))
+        return True
+
+    def cancel(self):
+        if self.runner.running:
+            self.status.config(text="Cancelling...")
+            self.runner.cancel()
+
+    def _show_progress(self, done, total):
+        if total:
+            self.bar["value"] = 100 * done / total
+            self.status.config(text=f"Running... {done:,} / {total:,}")
+
+    def _show_error(self, exc):
+        self._finish("Failed", 0)
+        if isinstance(exc, ValueError):
+            messagebox.showerror("Input Error", str(exc) or "Please enter valid integer values.")
+        elif isinstance(exc, ImportError):
+            messagebox.showerror("Missing Dependency", str(exc))
+        else:
+            messagebox.showerror("Simulation Error", f"{type(exc).__name__}: {exc}")
+
+    def _finish(self, text, value):
+        self.bar["value"] = value
+        self.status.config(text=text)
+        self.cancel_button.config(state=tk.DISABLED)
@@ -0,0 +1,197 @@
+"""Benchmarks of every model across problem sizes.
+
+Times each model at sizes 10^2, 10^3, ... and records, per run:
+
+* ``simulate_s``: running the model and keeping its rows,
+* ``entities_per_s``: customers or days simulated per second,
+* ``format_s``: turning every row into display text,
+* ``table_s``: filling the GUI table (skipped without a display),
+* ``peak_memory_bytes``: peak traced allocation of a separate run.
+
+Results are written as JSON so runs can be compared over time::
+
+    python benchmark.py --max-size 1e6 --output bench-new.json
+    python benchmark.py --compare bench-old.json bench-new.json
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import simulation_engine as engine
+from simulation_engine.vectorized import np
+
+CASES = {
+    "double_server": ("double_server", lambda n: {"num_applicants": n}),
+    "single_server": ("single_server", lambda n: {"num_applicants": n}),
+    "single_server_vectorized": ("single_server", lambda n: {"num_applicants": n, "vectorized": True}),
+    "event_scheduling": ("event_scheduling", lambda n: {"max_customers": n, "stop_time": 10 * n}),
+    "mn_inventory": ("mn_inventory", lambda n: {"initial_inv": 12, "cycle_length": 7, "reorder_point": 6,
+                                                "order_quantity": 10, "num_days": n}),
+    "newspaper": ("newspaper", lambda n: {"num_papers": 70, "num_days": n}),
+    "multi_server": ("multi_server", lambda n: {"num_customers": n, "servers": 10}),
+}
+
+
+def _best_time(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _table_factory():
+    """A function timing how long a VirtualTable takes to show rows, or None without a display."""
+    try:
+        import tkinter as tk
+        from virtual_table import VirtualTable
+
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        return None
+
+    def fill(result):
+        table = VirtualTable(root, columns=result.columns, format_row=engine.row_formatter(result.model))
+        table.pack()
+        start = time.perf_counter()
+        table.set_rows(result.rows)
+        table.scroll_to(len(result.rows) // 2)
+        root.update_idletasks()
+        elapsed = time.perf_counter() - start
+        table.destroy()
+        return elapsed
+
+    return fill
+
+
+def run_case(name, size, repeat=1, memory_limit=10 ** 6, table=None):
+    model, params = CASES[name]
+    params = params(size)
+
+    def simulate():
+        return engine.run_model(model, rng=random.Random(size), **params)
+
+    simulate_s, result = _best_time(simulate, repeat)
+    format_s, _ = _best_time(result.display_rows, repeat)
+    record = {
+        "case": name,
+        "model": model,
+        "size": size,
+        "rows": len(result),
+        "simulate_s": simulate_s,
+        "entities_per_s": size / simulate_s if simulate_s else None,
+        "format_s": format_s,
+        "table_s": table(result) if table is not None else None,
+        "peak_memory_bytes": _peak_memory(simulate) if size <= memory_limit else None,
+    }
+    del result
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cases, sizes, repeat=1, memory_limit=10 ** 6, table=True, report=print):
+    fill = _table_factory() if table else None
+    records = []
+    for name in cases:
+        if name == "single_server_vectorized" and np is None:
+            report(f"{name}: skipped (NumPy is not installed)")
+            continue
+        for size in sizes:
+            record = run_case(name, size, repeat, memory_limit, fill)
+            records.append(record)
+            report(_format_record(record))
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__ if np is not None else None,
+        "repeat": repeat,
+        "results": records,
+    }
+
+
+def _format_record(r):
+    def seconds(value):
+        return f"{value:9.4f}s" if value is not None else "        -"
+
+    memory = f"{r['peak_memory_bytes'] / 2 ** 20:9.1f}MiB" if r["peak_memory_bytes"] is not None else "         -"
+    return (f"{r['case']:<25} {r['size']:>10,}  sim {seconds(r['simulate_s'])} "
+            f"({r['entities_per_s']:>12,.0f}/s)  fmt {seconds(r['format_s'])}  "
+            f"table {seconds(r['table_s'])}  mem {memory}")
+
+
+def compare(old, new):
+    """Lines comparing the simulate times of two result files (ratio > 1 means slower)."""
+    before = {(r["case"], r["size"]): r for r in old["results"]}
+    lines = [f"{old.get('commit')} -> {new.get('commit')}"]
+    for r in new["results"]:
+        o = before.get((r["case"], r["size"]))
+        if o is None:
+            continue
+        ratio = r["simulate_s"] / o["simulate_s"] if o["simulate_s"] else float("inf")
+        flag = "  SLOWER" if ratio > 1.1 else ("  faster" if ratio < 0.9 else "")
+        lines.append(f"{r['case']:<25} {r['size']:>10,}  {o['simulate_s']:9.4f}s -> {r['simulate_s']:9.4f}s"
+                     f"  x{ratio:.2f}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--min-size", type=float, default=1e2)
+    parser.add_argument("--max-size", type=float, default=1e5, help="largest size, up to 1e7")
+    parser.add_argument("--repeat", type=int, default=1, help="best of this many runs")
+    parser.add_argument("--memory-limit", type=float, default=1e6,
+                        help="largest size whose peak memory is traced (tracing is slow)")
+    parser.add_argument("--no-table", action="store_true", help="skip the GUI table timing")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            print(compare(json.load(f_old), json.load(f_new)))
+        return
+
+    sizes = []
+    size = int(args.min_size)
+    while size <= int(args.max_size):
+        sizes.append(size)
+        size *= 10
+    results = run_benchmarks(args.cases, sizes, args.repeat, int(args.memory_limit), not args.no_table)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
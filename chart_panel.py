@@ -0,0 +1,94 @@
+import tkinter as tk
+from tkinter import ttk
+
+from simulation_engine import SeriesTracker, lttb
+
+
+class ChartPanel(ttk.LabelFrame):
+    """Line chart of a model's series, fed the run's rows while it is still going.
+
+    Rows are read incrementally from the backing sequence the table shows
+    (at most ``chunk`` per update, so a fast run cannot stall the UI) and go
+    through a :class:`~simulation_engine.SeriesTracker`; only its decimated
+    points, reduced with LTTB to about two per pixel, are drawn.
+    """
+
+    COLORS = ("#1f77b4", "#d62728", "#2ca02c")
+    MARGIN = 45
+
+    def __init__(self, master, model, buckets=1000, chunk=100000, **kwargs):
+        kwargs.setdefault("text", "Chart")
+        kwargs.setdefault("padding", 5)
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.buckets = buckets
+        self.chunk = chunk
+        self.rows = None
+        self.tracker = None
+        self._seen = 0
+        self.canvas = tk.Canvas(self, width=420, height=250, bg="white", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+
+    def update_rows(self, rows, complete=False):
+        """Add the rows of ``rows`` not seen yet (all of them if it is a new sequence) and redraw.
+
+        While a run is going only ``chunk`` rows are taken per call; the rest
+        wait for the next update unless ``complete`` is set.
+        """
+        if rows is not self.rows:
+            self.rows = rows
+            self.tracker = SeriesTracker(self.model, self.buckets)
+            self._seen = 0
+        stop = len(rows) if complete else min(len(rows), self._seen + self.chunk)
+        while self._seen < stop:
+            end = min(stop, self._seen + self.chunk)
+            self.tracker.feed(rows[self._seen:end])
+            self._seen = end
+        self.redraw()
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        if self.tracker is None or not self.tracker.count:
+            return
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        left, top, right, bottom = self.MARGIN, 20, width - 10, height - 25
+        if right - left < 10 or bottom - top < 10:
+            return
+        series = {name: lttb(points, 2 * (right - left)) for name, points in self.tracker.series().items()}
+        xs = [p[0] for points in series.values() for p in (points[0], points[-1])]
+        ys = [p[1] for points in series.values() for p in points]
+        x0, x1 = min(xs), max(xs)
+        y0, y1 = min(ys), max(ys)
+        if x1 == x0:
+            x1 = x0 + 1
+        if y1 == y0:
+            y0, y1 = y0 - 1, y1 + 1
+        sx = (right - left) / (x1 - x0)
+        sy = (bottom - top) / (y1 - y0)
+
+        canvas.create_rectangle(left, top, right, bottom, outline="#999999")
+        canvas.create_text(left - 4, top, text=f"{y1:g}", anchor=tk.NE, font=("TkDefaultFont", 8))
+        canvas.create_text(left - 4, bottom, text=f"{y0:g}", anchor=tk.SE, font=("TkDefaultFont", 8))
+        canvas.create_text(left, bottom + 4, text=f"{x0:g}", anchor=tk.NW, font=("TkDefaultFont", 8))
+        canvas.create_text(right, bottom + 4, text=f"{x1:g}", anchor=tk.NE, font=("TkDefaultFont", 8))
+        canvas.create_text((left + right) / 2, bottom + 4, anchor=tk.N, font=("TkDefaultFont", 8),
+                           text=f"{self.tracker.x_label} ({self.tracker.count:,} points)")
+        if y0 < 0 < y1:
+            zero = bottom - (0 - y0) * sy
+            canvas.create_line(left, zero, right, zero, fill="#dddddd", dash=(2, 2))
+
+        legend_x = left
+        for (name, points), color in zip(series.items(), self.COLORS):
+            coords = []
+            for x, y in points:
+                coords.append(left + (x - x0) * sx)
+                coords.append(bottom - (y - y0) * sy)
+            if len(coords) == 2:
+                canvas.create_oval(coords[0] - 2, coords[1] - 2, coords[0] + 2, coords[1] + 2, fill=color,
+                                   outline=color)
+            else:
+                canvas.create_line(*coords, fill=color)
+            label = canvas.create_text(legend_x, top - 4, text=name, fill=color, anchor=tk.SW)
+            legend_x = canvas.bbox(label)[2] + 12
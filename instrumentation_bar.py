@@ -0,0 +1,65 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from simulation_engine import Instrumentation
+
+
+class InstrumentationBar(ttk.Frame):
+    """Status bar that opts a tab's runs into instrumentation and shows the figures.
+
+    While "Instrument" is off, :meth:`new_run` returns None and runs are not
+    measured at all.  The last run's figures can be saved as JSON, and as a
+    cProfile dump when "Profile" was on.
+    """
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.instrumentation = None
+        self.enabled = tk.BooleanVar(value=False)
+        self.profile = tk.BooleanVar(value=False)
+
+        ttk.Checkbutton(self, text="Instrument", variable=self.enabled).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(self, text="Profile", variable=self.profile).pack(side=tk.LEFT, padx=5)
+        self.json_button = ttk.Button(self, text="Export JSON", command=self.export_json, state=tk.DISABLED)
+        self.json_button.pack(side=tk.RIGHT, padx=5)
+        self.profile_button = ttk.Button(self, text="Export Profile", command=self.export_profile,
+                                         state=tk.DISABLED)
+        self.profile_button.pack(side=tk.RIGHT, padx=5)
+        self.status = ttk.Label(self, text="", anchor=tk.W)
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+    def new_run(self):
+        """Instrumentation for the next run, or None when instrumentation is off."""
+        if not self.enabled.get():
+            self.instrumentation = None
+            self.status.config(text="")
+        else:
+            self.instrumentation = Instrumentation(profile=self.profile.get())
+            self.status.config(text="Measuring...")
+        self.json_button.config(state=tk.DISABLED)
+        self.profile_button.config(state=tk.DISABLED)
+        return self.instrumentation
+
+    def show(self):
+        if self.instrumentation is None:
+            return
+        self.status.config(text=self.instrumentation.summary())
+        self.json_button.config(state=tk.NORMAL)
+        if self.instrumentation.profiler is not None:
+            self.profile_button.config(state=tk.NORMAL)
+
+    def export_json(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            self._save(self.instrumentation.to_json, path)
+
+    def export_profile(self):
+        path = filedialog.asksaveasfilename(defaultextension=".prof", filetypes=[("cProfile data", "*.prof")])
+        if path:
+            self._save(self.instrumentation.dump_profile, path)
+
+    def _save(self, write, path):
+        try:
+            write(path)
+        except OSError as exc:
+            messagebox.showerror("Export Error", str(exc))
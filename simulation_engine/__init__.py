@@ -0,0 +1,123 @@
+"""Headless simulation engine behind the Modeling & Simulation GUI.
+
+Every model is a plain function returning a :class:`SimulationResult`, with a
+``*_stream`` twin that yields the table rows one at a time; nothing
+in this package imports tkinter, so it can be used from batch jobs and worker
+processes without a display.
+"""
+from .batch import Scenario, load_scenarios, run_batch, write_metrics
+from .cache import ResultCache, cache_key, cached_run, default_cache
+from .columnar import ColumnarResult, write_columnar
+from .des import Resource, Simulation, TimeWeighted
+from .distributions import EmpiricalDistribution
+from .event_scheduling import event_scheduling_simulation, event_scheduling_stream
+from .exact import EXACT, ExactTooCostly, exact_measures, exact_result
+from .fitting import FAMILIES, DistributionFit, ParametricDistribution, fit_file
+from .importance import Exceeds, ImportanceStreams, ImportanceSummary, Streak, importance_sampling
+from .instrumentation import Instrumentation
+from .inventory import mn_inventory_simulation, mn_inventory_stream
+from .models import MODELS, SCHEMAS, STREAMS, get_model, get_schema, row_formatter, run_model
+from .newspaper import newspaper_simulation, newspaper_stream
+from .online import RunningStats
+from .optimize import InventoryPolicySearch, NewspaperSweep, newspaper_sweep, pareto_front
+from .progress import PROGRESS_INTERVAL, SimulationCancelled
+from .queueing import (double_server_simulation, double_server_stream, multi_server_simulation,
+                       multi_server_stream, single_server_simulation, single_server_stream)
+from .replication import ReplicationSummary, replication_seed, run_replications
+from .results import Column, ModelStream, SimulationResult, display_row
+from .sequential import SequentialSummary, batch_means_until, replicate_until
+from .stats import MeasureSummary, summarize
+from .steady_state import SteadyStateEstimate, batch_means, mser, steady_state
+from .streams import STREAM_NAMES, AntitheticRandom, RandomStreams
+from .timeseries import CHART_SERIES, MinMaxDecimator, SeriesTracker, lttb
+from .traces import Trace, open_trace
+from .variance_reduction import (AntitheticSummary, ComparisonSummary, antithetic_replications,
+                                 compare_configurations)
+
+__version__ = "1.0.0"
+
+__all__ = [
+    "CHART_SERIES",
+    "EXACT",
+    "FAMILIES",
+    "MODELS",
+    "PROGRESS_INTERVAL",
+    "SCHEMAS",
+    "STREAMS",
+    "STREAM_NAMES",
+    "AntitheticRandom",
+    "AntitheticSummary",
+    "Column",
+    "ColumnarResult",
+    "ComparisonSummary",
+    "DistributionFit",
+    "EmpiricalDistribution",
+    "ExactTooCostly",
+    "Exceeds",
+    "ImportanceStreams",
+    "ImportanceSummary",
+    "Instrumentation",
+    "InventoryPolicySearch",
+    "MeasureSummary",
+    "MinMaxDecimator",
+    "ModelStream",
+    "NewspaperSweep",
+    "ParametricDistribution",
+    "RandomStreams",
+    "ReplicationSummary",
+    "Resource",
+    "ResultCache",
+    "RunningStats",
+    "Scenario",
+    "SequentialSummary",
+    "SeriesTracker",
+    "Simulation",
+    "SimulationCancelled",
+    "SimulationResult",
+    "SteadyStateEstimate",
+    "Streak",
+    "TimeWeighted",
+    "Trace",
+    "antithetic_replications",
+    "batch_means",
+    "batch_means_until",
+    "cache_key",
+    "cached_run",
+    "compare_configurations",
+    "default_cache",
+    "display_row",
+    "double_server_simulation",
+    "double_server_stream",
+    "event_scheduling_simulation",
+    "event_scheduling_stream",
+    "exact_measures",
+    "exact_result",
+    "fit_file",
+    "get_model",
+    "get_schema",
+    "importance_sampling",
+    "load_scenarios",
+    "lttb",
+    "mn_inventory_simulation",
+    "mn_inventory_stream",
+    "mser",
+    "multi_server_simulation",
+    "multi_server_stream",
+    "newspaper_simulation",
+    "newspaper_stream",
+    "newspaper_sweep",
+    "open_trace",
+    "pareto_front",
+    "replicate_until",
+    "replication_seed",
+    "row_formatter",
+    "run_batch",
+    "run_model",
+    "run_replications",
+    "single_server_simulation",
+    "single_server_stream",
+    "steady_state",
+    "summarize",
+    "write_columnar",
+    "write_metrics",
+]
@@ -0,0 +1,61 @@
+"""Run scenario files without a display: ``python -m simulation_engine scenarios.json``.
+
+Writes ``metrics.csv`` (and/or ``metrics.json``) with one line per scenario
+to the output directory, plus the rows of each scenario's first replication
+under ``traces/`` when ``--trace`` is given.  Exits with status 1 if any
+scenario failed.
+"""
+import argparse
+import os
+import sys
+
+from .batch import METRICS_FORMATS, TRACE_FORMATS, load_scenarios, run_batch, write_metrics
+from .cache import ResultCache
+
+
+def _report(done, total, record):
+    if record["error"]:
+        status = f"failed: {record['error']}"
+    else:
+        status = "cached" if record["cached"] else f"{record['elapsed_s']:.2f}s"
+    print(f"[{done}/{total}] {record['id']} {status}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation_engine",
+                                     description="Run every scenario of a scenario file headlessly.")
+    parser.add_argument("scenarios", help="scenario file (.json or .csv)")
+    parser.add_argument("-o", "--output", default="batch-output", help="output directory")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, help="seed of scenarios that do not set one")
+    parser.add_argument("--replications", type=int, help="override the replications of every scenario")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--format", nargs="+", choices=METRICS_FORMATS, default=["csv"],
+                        help="metrics file formats")
+    parser.add_argument("--trace", choices=TRACE_FORMATS, help="also write the rows of each scenario")
+    parser.add_argument("--cache", metavar="DIR", help="result cache directory; scenarios found in it are not rerun")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = load_scenarios(args.scenarios, args.seed, args.replications)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    cache = ResultCache(args.cache) if args.cache else None
+    os.makedirs(args.output, exist_ok=True)
+    records = run_batch(scenarios, args.workers, args.trace, os.path.join(args.output, "traces"),
+                        args.confidence, _report, cache)
+    for fmt in args.format:
+        path = os.path.join(args.output, f"metrics.{fmt}")
+        write_metrics(records, path, fmt)
+        print(f"Wrote {path}", file=sys.stderr)
+
+    failed = sum(1 for record in records if record["error"])
+    if failed:
+        print(f"{failed} of {len(records)} scenarios failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Headless batch runs of scenario matrices.
+
+A scenario file lists parameter combinations of one or more models.  In JSON
+it is a block, or a list of blocks, like::
+
+    {"model": "mn_inventory", "seed": 42, "replications": 10,
+     "params": {"initial_inv": 12, "num_days": 28, "cycle_length": 7, "order_quantity": 10},
+     "matrix": {"reorder_point": [4, 5, 6], "initial_inv": [8, 12, 16]}}
+
+``params`` are shared by the block, ``matrix`` is expanded into every
+combination of its values and ``cases`` (a list of parameter dicts) adds
+explicit combinations, each crossed with the matrix.  In CSV every row is one
+scenario: a ``model`` column, optional ``seed``, ``replications`` and ``name``
+columns and one column per parameter (empty cells are left out).
+
+Replication ``j`` of every scenario uses ``replication_streams(seed, j)``, so
+scenarios with the same seed are compared on common random numbers.
+"""
+import csv
+import inspect
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import cache_key
+from .columnar import write_columnar
+from .models import STREAMS, get_model
+from .replication import replication_streams
+from .results import ModelStream, display_row
+from .stats import summarize_measures
+from .vectorized import require_numpy
+
+TRACE_FORMATS = ("csv", "json", "columnar")
+METRICS_FORMATS = ("csv", "json")
+_RESERVED = ("model", "seed", "replications", "name")
+# Passed by the runner itself, so a scenario may not set them
+_RUNNER_PARAMS = ("rng", "progress", "keep_rows")
+# Choose how a model runs rather than what it simulates; streams do not take them
+_ENGINE_PARAMS = ("vectorized",)
+
+
+class Scenario:
+    """One parameter combination of a model, run ``replications`` times from ``seed``."""
+
+    def __init__(self, id, model, params, seed, replications=1):
+        if replications < 1:
+            raise ValueError(f"Scenario {id}: replications must be at least 1")
+        self.id = id
+        self.model = model
+        self.params = dict(params)
+        self.seed = seed
+        self.replications = replications
+
+    def validate(self):
+        """Fail before any work is fanned out if the model or its parameters are wrong.
+
+        The parameters are bound to the model function and to the stream a
+        trace is written from; building the stream checks their values
+        without running anything.
+        """
+        model = get_model(self.model)
+        runner = sorted(set(self.params) & set(_RUNNER_PARAMS))
+        if runner:
+            raise ValueError(f"Scenario {self.id}: {', '.join(runner)} cannot be set in a scenario")
+        try:
+            inspect.signature(model).bind(**self.params)
+            if self.model in STREAMS:
+                STREAMS[self.model](**_stream_params(self.params))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Scenario {self.id}: {exc}") from None
+
+    def __repr__(self):
+        return f"Scenario({self.id!r}, {self.model!r}, {self.params!r}, seed={self.seed})"
+
+
+# ==================== SCENARIO FILES ====================
+def _parse_value(text):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return text
+
+
+def _expand_block(block):
+    """Parameter dicts of one JSON block: every case crossed with every matrix combination."""
+    base = block.get("params", {})
+    matrix = block.get("matrix", {})
+    names = list(matrix)
+    cases = block.get("cases") or [{}]
+    for case in cases:
+        for values in itertools.product(*(matrix[name] for name in names)):
+            yield dict(base, **case, **dict(zip(names, values)))
+
+
+def _read_entries(path):
+    """``(model, params, seed, replications, name)`` of every scenario in a file."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                values = {key.strip(): _parse_value(value.strip()) for key, value in row.items()
+                          if key and value is not None and value.strip()}
+                if "model" not in values:
+                    raise ValueError(f"{path}: every row needs a model")
+                params = {key: value for key, value in values.items() if key not in _RESERVED}
+                yield (values["model"], params, values.get("seed"), values.get("replications", 1),
+                       values.get("name"))
+        return
+
+    with open(path) as f:
+        blocks = json.load(f)
+    if isinstance(blocks, dict):
+        blocks = [blocks]
+    for block in blocks:
+        if "model" not in block:
+            raise ValueError(f"{path}: every block needs a model")
+        for params in _expand_block(block):
+            yield block["model"], params, block.get("seed"), block.get("replications", 1), block.get("name")
+
+
+def load_scenarios(path, seed=None, replications=None):
+    """Scenarios of a ``.json`` or ``.csv`` scenario file, validated.
+
+    ``seed`` is used by scenarios that do not set their own (a random one is
+    drawn when neither does, and recorded in the metrics); ``replications``
+    overrides the file.
+    """
+    if replications is not None and replications < 1:
+        raise ValueError("replications must be at least 1")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    scenarios = []
+    for index, (model, params, own_seed, reps, name) in enumerate(_read_entries(path)):
+        scenario_id = f"{index:04d}-{name or model}"
+        scenario = Scenario(scenario_id, model, params, seed if own_seed is None else own_seed,
+                            reps if replications is None else replications)
+        scenario.validate()
+        scenarios.append(scenario)
+    if not scenarios:
+        raise ValueError(f"{path} lists no scenarios")
+    return scenarios
+
+
+# ==================== TRACES ====================
+def _stream_params(params):
+    return {name: value for name, value in params.items() if name not in _ENGINE_PARAMS}
+
+
+def _source(scenario, rng):
+    """A ModelStream of the scenario, or its result when it runs on another engine or has no stream form."""
+    if scenario.params.get("vectorized") or scenario.model not in STREAMS:
+        return get_model(scenario.model)(rng=rng, **scenario.params)
+    return STREAMS[scenario.model](rng=rng, **_stream_params(scenario.params))
+
+
+def _rows(source):
+    return source if isinstance(source, ModelStream) else source.rows
+
+
+def _write_csv_trace(source, path):
+    """Rows as the table shows them."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(source.columns)
+        for row in _rows(source):
+            writer.writerow(display_row(source.schema, row))
+
+
+def _write_json_trace(source, path):
+    """Raw row values, written as they are produced; blank cells keep their sentinel."""
+    with open(path, "w") as f:
+        f.write(f'{{"model": {json.dumps(source.model)}, "columns": {json.dumps(list(source.columns))}, '
+                f'"rows": [')
+        separator = "\n"
+        for row in _rows(source):
+            f.write(separator + json.dumps(row))
+            separator = ",\n"
+        f.write(f'\n], "measures": {json.dumps(source.measures)}}}\n')
+
+
+def write_trace(source, path, fmt):
+    """Write the rows of a ModelStream or SimulationResult; returns the measures."""
+    if fmt == "csv":
+        _write_csv_trace(source, path)
+    elif fmt == "json":
+        _write_json_trace(source, path)
+    elif fmt == "columnar":
+        write_columnar(source, path)
+    else:
+        raise ValueError(f"Unknown trace format {fmt!r}; expected one of {', '.join(TRACE_FORMATS)}")
+    return source.measures
+
+
+# ==================== RUNNING ====================
+def _numeric(measures):
+    return {name: value for name, value in measures.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)}
+
+
+def _samples_key(scenario):
+    # The same entry collect_samples uses for these replications
+    return cache_key(scenario.model, scenario.params, scenario.seed, kind="replications", antithetic=False)
+
+
+def _run_samples(scenario, trace=None, trace_dir=None):
+    """Measures of every replication, trace path, error text and seconds taken."""
+    samples = []
+    path = error = None
+    start = time.perf_counter()
+    try:
+        for j in range(scenario.replications):
+            rng = replication_streams(scenario.seed, j)
+            if j == 0 and trace is not None:
+                extension = "" if trace == "columnar" else f".{trace}"
+                path = os.path.join(trace_dir, scenario.id + extension)
+                samples.append(write_trace(_source(scenario, rng), path, trace))
+            else:
+                samples.append(get_model(scenario.model)(rng=rng, keep_rows=False, **scenario.params).measures)
+    except Exception as exc:
+        samples = None
+        error = f"{type(exc).__name__}: {exc}"
+    return samples, path, error, time.perf_counter() - start
+
+
+def _record(scenario, samples, path, error, elapsed, confidence, cached=False):
+    record = {"id": scenario.id, "model": scenario.model, "params": scenario.params, "seed": scenario.seed,
+              "replications": scenario.replications, "measures": None, "trace_path": path,
+              "error": error, "elapsed_s": elapsed, "cached": cached}
+    if samples is not None:
+        samples = [_numeric(sample) for sample in samples]
+        if scenario.replications == 1:
+            record["measures"] = samples[0]
+        else:
+            record["measures"] = {name: summary.as_dict()
+                                  for name, summary in summarize_measures(samples, confidence).items()}
+    return record
+
+
+def run_scenario(scenario, trace=None, trace_dir=None, confidence=0.95):
+    """Metrics record of one scenario; the first replication's rows go to ``trace_dir``.
+
+    Errors are recorded rather than raised, so one bad scenario does not
+    stop a sweep.
+    """
+    return _record(scenario, *_run_samples(scenario, trace, trace_dir), confidence)
+
+
+def run_batch(scenarios, workers=None, trace=None, trace_dir=None, confidence=0.95, report=None, cache=None):
+    """Metrics records of every scenario, in scenario order.
+
+    Scenarios are spread over a process pool (one worker per CPU by
+    default); ``report(done, total, record)`` is called as each one finishes.
+    Scenarios whose replications are in ``cache`` are not run again unless
+    a trace is asked for, and newly run ones are added to it.
+    """
+    if trace is not None:
+        if trace not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format {trace!r}; expected one of {', '.join(TRACE_FORMATS)}")
+        if trace == "columnar":
+            require_numpy()
+        os.makedirs(trace_dir, exist_ok=True)
+
+    records = {}
+
+    def finished(record):
+        records[record["id"]] = record
+        if report is not None:
+            report(len(records), len(scenarios), record)
+
+    def ran(scenario, outcome):
+        if cache is not None and outcome[0] is not None:
+            cache.put(_samples_key(scenario), outcome[0])
+        finished(_record(scenario, *outcome, confidence))
+
+    pending = []
+    for scenario in scenarios:
+        samples = cache.get(_samples_key(scenario)) if cache is not None and trace is None else None
+        if samples is not None and len(samples) >= scenario.replications:
+            finished(_record(scenario, samples[:scenario.replications], None, None, 0.0, confidence, cached=True))
+        else:
+            pending.append(scenario)
+    if not pending:
+        return [records[scenario.id] for scenario in scenarios]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(pending)))
+    if workers == 1:
+        for scenario in pending:
+            ran(scenario, _run_samples(scenario, trace, trace_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_run_samples, scenario, trace, trace_dir): scenario for scenario in pending}
+            for future in as_completed(futures):
+                ran(futures[future], future.result())
+    return [records[scenario.id] for scenario in scenarios]
+
+
+# ==================== METRICS FILES ====================
+def _flat_metrics(record):
+    row = {"id": record["id"], "model": record["model"], "seed": record["seed"],
+           "replications": record["replications"]}
+    row.update(record["params"])
+    for name, value in (record["measures"] or {}).items():
+        if isinstance(value, dict):
+            row[name] = value["mean"]
+            row[f"{name}_hw"] = value["half_width"]
+        else:
+            row[name] = value
+    row["elapsed_s"] = record["elapsed_s"]
+    row["cached"] = record["cached"]
+    row["trace_path"] = record["trace_path"] or ""
+    row["error"] = record["error"] or ""
+    return row
+
+
+def write_metrics(records, path, fmt="csv"):
+    """One line (CSV) or object (JSON) of parameters and measures per scenario.
+
+    CSV columns are the union over all scenarios; with several replications
+    a measure is its mean and ``<measure>_hw`` its confidence half width.
+    """
+    if fmt == "json":
+        with open(path, "w") as f:
+            json.dump(records, f, indent=2)
+        return
+    if fmt != "csv":
+        raise ValueError(f"Unknown metrics format {fmt!r}; expected one of {', '.join(METRICS_FORMATS)}")
+    rows = [_flat_metrics(record) for record in records]
+    fields = {}
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+    for name in ("elapsed_s", "cached", "trace_path", "error"):
+        fields[name] = fields.pop(name)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(fields))
+        writer.writeheader()
+        writer.writerows(rows)
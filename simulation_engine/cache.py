@@ -0,0 +1,235 @@
+"""Content-addressed cache of simulation results.
+
+A key is the SHA-256 of the model, its parameters, the seed and the engine
+version, so a result is only ever reused for a run that would reproduce it
+exactly.  The engine version includes a digest of this package's source, so
+editing a model invalidates everything cached before the edit.
+
+:class:`ResultCache` keeps the most recently used values in memory and,
+when given a directory, pickles every value to disk as well.  The disk tier
+is bounded in bytes and evicts the least recently used files first.  Results
+whose tables are too large are sized from their row count and skipped before
+anything is pickled.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .models import get_model
+from .streams import RandomStreams
+from .traces import trace_fingerprint
+
+CACHE_DIR_ENV = "SIMULATION_ENGINE_CACHE"
+_SUFFIX = ".pickle"
+# Upper estimate of the pickled size of one table cell
+_CELL_BYTES = 8
+_engine_version = None
+_default_cache = None
+
+
+def engine_version():
+    """Package version plus a digest of the engine's source files."""
+    global _engine_version
+    if _engine_version is None:
+        from . import __version__
+
+        digest = hashlib.sha256()
+        package = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(package)):
+            if name.endswith(".py"):
+                with open(os.path.join(package, name), "rb") as f:
+                    digest.update(name.encode() + b"\0" + f.read())
+        _engine_version = f"{__version__}+{digest.hexdigest()[:12]}"
+    return _engine_version
+
+
+def _key_value(value):
+    """JSON stand-in of a non-JSON parameter: its full ``fingerprint()``, else its repr."""
+    fingerprint = getattr(value, "fingerprint", None)
+    return fingerprint() if callable(fingerprint) else repr(value)
+
+
+def _size_hint(value):
+    """Estimated size of a value with table rows; other values (measures, samples) count as 0."""
+    rows = getattr(value, "rows", None)
+    schema = getattr(value, "schema", None)
+    if rows is None or schema is None:
+        return 0
+    return len(rows) * len(schema) * _CELL_BYTES
+
+
+def cache_key(model, params, seed, **extra):
+    """Key of a run of ``model`` with ``params`` from ``seed``; ``extra`` tells kinds of entries apart."""
+    if params.get("trace") is not None:
+        # A log file is keyed by its size and modification time too, so rewriting it is a miss
+        params = dict(params, trace=trace_fingerprint(params["trace"]))
+    payload = {"model": model, "params": params, "seed": seed, "engine": engine_version(), **extra}
+    text = json.dumps(payload, sort_keys=True, default=_key_value)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU memory tier of ``max_items`` values over an optional disk tier of ``max_bytes``.
+
+    Values whose tables are estimated above ``max_item_bytes`` are not
+    cached at all, and the memory tier also keeps its estimated total under
+    ``max_memory_bytes``.  Disk entries are written atomically, so several
+    processes may share a directory; an unreadable entry counts as a miss
+    and is removed.  One cache may be used from several threads.
+    """
+
+    def __init__(self, directory=None, max_items=32, max_bytes=256 * 2 ** 20, max_item_bytes=16 * 2 ** 20,
+                 max_memory_bytes=64 * 2 ** 20):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + _SUFFIX)
+
+    def _remember(self, key, value, size):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while len(self._memory) > self.max_items or self._memory_bytes > self.max_memory_bytes:
+                self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                self._remove(path)
+            else:
+                # The modification time orders entries for eviction.
+                os.utime(path)
+                self._remember(key, value, _size_hint(value))
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def __contains__(self, key):
+        return key in self._memory or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def put(self, key, value):
+        """Store ``value``; returns False if it is too large to cache."""
+        size = _size_hint(value)
+        if size > self.max_item_bytes:
+            return False
+        self._remember(key, value, size)
+        if self.directory is None:
+            return True
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > min(self.max_item_bytes, self.max_bytes):
+            return False
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+        with self._lock:
+            if self._disk_bytes is None:
+                self._evict()
+            else:
+                self._disk_bytes += len(data)
+                if self._disk_bytes > self.max_bytes:
+                    self._evict()
+        return True
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(_SUFFIX):
+                        stat = entry.stat()
+                        yield stat.st_mtime, stat.st_size, entry.path
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Delete the least recently used files until the disk tier fits in ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._disk_bytes = total
+
+    @property
+    def disk_bytes(self):
+        if self.directory is None:
+            return 0
+        if self._disk_bytes is None:
+            self._evict()
+        return self._disk_bytes
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.directory is not None:
+            for _, _, path in list(self._entries()):
+                self._remove(path)
+            self._disk_bytes = 0
+
+    def __repr__(self):
+        return (f"ResultCache(directory={self.directory!r}, items={len(self._memory)}, "
+                f"hits={self.hits}, misses={self.misses})")
+
+
+def default_cache():
+    """Process-wide cache in ``$SIMULATION_ENGINE_CACHE`` or ``~/.cache/simulation_engine``."""
+    global _default_cache
+    if _default_cache is None:
+        directory = os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache",
+                                                                   "simulation_engine")
+        _default_cache = ResultCache(directory)
+    return _default_cache
+
+
+def cached_run(model, params, seed, cache=None):
+    """Result of ``model`` with ``params`` on ``RandomStreams(seed)``, computed at most once."""
+    cache = default_cache() if cache is None else cache
+    key = cache_key(model, params, seed)
+    return cache.get_or_compute(key, lambda: get_model(model)(rng=RandomStreams(seed), **params))
@@ -0,0 +1,158 @@
+"""Typed column storage for results, saved as .npy files and memory-mapped back.
+
+A :class:`ColumnarResult` keeps each table column in one NumPy array of the
+column's dtype instead of a list of row tuples, so a cell costs 1-8 bytes
+rather than a boxed Python object, and formatting waits until a row is
+displayed.  On disk a result is a directory with ``result.json`` (model,
+measures, summary text) and one ``<column>.npy`` file per column; reopening it
+with ``mmap=True`` maps the files instead of reading them, so results larger
+than memory open instantly and load only the slices that are touched.
+
+NumPy is optional, as for :mod:`simulation_engine.vectorized`.
+"""
+import json
+import os
+
+from .results import ArrayRows, Column, SimulationResult
+from .vectorized import np, require_numpy
+
+META_FILE = "result.json"
+_CHUNK_ROWS = 1 << 16
+# Fixed .npy header size, so the header can be rewritten once the row count
+# of a streamed column is known.
+_HEADER_BYTES = 128
+
+
+def _npy_header(dtype, shape):
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+    # Format 1.0: magic, version, header length, then the dict padded with
+    # spaces and ending in a newline.
+    header = header.encode("latin1").ljust(_HEADER_BYTES - 11) + b"\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header
+
+
+class _ColumnFile:
+    """One .npy file written in appended chunks."""
+
+    def __init__(self, path, column):
+        self.dtype = np.dtype(column.dtype)
+        self.shape = column.shape
+        self.length = 0
+        self.file = open(path, "wb")
+        self.file.write(bytes(_HEADER_BYTES))
+
+    def write(self, values):
+        values = np.asarray(values, dtype=self.dtype)
+        self.file.write(values.tobytes())
+        self.length += len(values)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(_npy_header(self.dtype, (self.length,) + self.shape))
+        self.file.close()
+
+
+def _row_chunks(rows):
+    """Lists of column values, ``_CHUNK_ROWS`` rows at a time."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == _CHUNK_ROWS:
+            yield list(zip(*chunk))
+            chunk = []
+    if chunk:
+        yield list(zip(*chunk))
+
+
+def _source_chunks(source):
+    rows = source.rows if isinstance(source, SimulationResult) else source
+    if isinstance(rows, ArrayRows):
+        for start in range(0, len(rows), _CHUNK_ROWS):
+            yield [array[start:start + _CHUNK_ROWS] for array in rows.arrays]
+    else:
+        yield from _row_chunks(rows)
+
+
+def _stored_column(column, stored):
+    """``column`` with the dtype, format and blank saved in result.json; callable formats are kept."""
+    fmt = column.fmt if stored["fmt"] is None else stored["fmt"]
+    return Column(column.name, stored["dtype"], fmt, stored["blank"], column.shape)
+
+
+class ColumnarResult(SimulationResult):
+    """A SimulationResult whose rows are backed by one typed array per column."""
+
+    def __init__(self, model, schema, arrays, measures, performance):
+        super().__init__(model, schema, ArrayRows(arrays), measures, performance)
+        self.arrays = dict(zip(self.columns, arrays))
+
+    def column(self, name):
+        return self.arrays[name]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    @classmethod
+    def from_rows(cls, source):
+        """Convert a SimulationResult, or run a ModelStream, into typed arrays in memory."""
+        require_numpy()
+        schema = source.schema
+        parts = [[] for _ in schema]
+        for values in _source_chunks(source):
+            for part, column, chunk in zip(parts, schema, values):
+                part.append(np.asarray(chunk, dtype=column.dtype))
+        arrays = [np.concatenate(part) if part else np.empty((0,) + column.shape, dtype=column.dtype)
+                  for part, column in zip(parts, schema)]
+        return cls(source.model, schema, arrays, source.measures, source.performance)
+
+    def save(self, path):
+        return write_columnar(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved result; with ``mmap`` the columns are mapped, not read."""
+        from .models import SCHEMAS
+
+        require_numpy()
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        schema = SCHEMAS[meta["model"]]
+        if [column.name for column in schema] != meta["columns"]:
+            raise ValueError(f"{path} does not match the current {meta['model']} columns")
+        if "schema" in meta:
+            schema = tuple(_stored_column(column, stored) for column, stored in zip(schema, meta["schema"]))
+        arrays = [np.load(os.path.join(path, f"{column.name}.npy"), mmap_mode="r" if mmap else None)
+                  for column in schema]
+        return cls(meta["model"], schema, arrays, meta["measures"], meta["performance"])
+
+
+def write_columnar(source, path):
+    """Write a SimulationResult or a ModelStream to ``path`` and memory-map it back.
+
+    Rows are converted and written a chunk at a time, so a stream is saved
+    without ever holding its whole table in memory.
+    """
+    require_numpy()
+    os.makedirs(path, exist_ok=True)
+    files = [_ColumnFile(os.path.join(path, f"{column.name}.npy"), column) for column in source.schema]
+    try:
+        for values in _source_chunks(source):
+            for file, chunk in zip(files, values):
+                file.write(chunk)
+    finally:
+        for file in files:
+            file.close()
+
+    meta = {
+        "model": source.model,
+        "columns": [column.name for column in source.schema],
+        # Replayed traces change column types and formats, so the schema is stored with the data
+        "schema": [{"dtype": np.dtype(column.dtype).str, "fmt": column.fmt if isinstance(column.fmt, str) else None,
+                    "blank": column.blank} for column in source.schema],
+        "measures": source.measures,
+        "performance": source.performance,
+    }
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return ColumnarResult.load(path)
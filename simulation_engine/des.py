@@ -0,0 +1,219 @@
+"""A small discrete-event simulation kernel.
+
+:class:`Simulation` holds the clock and the future event list (a binary heap
+of ``(time, priority, sequence, event type, data)`` entries).  Each event
+type is registered once with its handler and a tie-break priority; handlers
+are called as ``handler(data)`` with ``sim.clock`` set to the event time and
+schedule further events themselves.  :class:`Resource` is a server pool with
+a FIFO queue, and :class:`TimeWeighted` integrates a piecewise-constant
+value such as a queue length over time.  Per-observation statistics (waits,
+sojourn times) fit :class:`~simulation_engine.online.RunningStats`.
+
+A minimal model::
+
+    sim = Simulation()
+    server = Resource(sim)
+
+    def arrive(customer):
+        sim.schedule_in("arrive", rng.expovariate(1.0), customer + 1)
+        if server.request(customer):
+            sim.schedule_in("depart", rng.expovariate(1.2), customer)
+
+    def depart(customer):
+        following = server.release()
+        if following is not None:
+            sim.schedule_in("depart", rng.expovariate(1.2), following)
+
+    sim.on("arrive", arrive, priority=1)
+    sim.on("depart", depart, priority=0)
+    sim.schedule("arrive", 0.0, 1)
+    sim.run(until=10_000)
+
+Hot handlers can push events through :meth:`Simulation.scheduler`, which
+skips the argument checks of :meth:`Simulation.schedule`.
+"""
+import heapq
+import itertools
+import math
+from collections import deque
+
+
+class TimeWeighted:
+    """Time integral, time average and maximum of a value that changes at event times."""
+
+    __slots__ = ("sim", "value", "area", "max", "_last", "_start")
+
+    def __init__(self, sim, value=0):
+        self.sim = sim
+        self.value = value
+        self.area = 0
+        self.max = value
+        self._last = self._start = sim.clock
+
+    def set(self, value):
+        now = self.sim.clock
+        self.area += self.value * (now - self._last)
+        self._last = now
+        self.value = value
+        if value > self.max:
+            self.max = value
+
+    def add(self, delta):
+        now = self.sim.clock
+        self.area += self.value * (now - self._last)
+        self._last = now
+        self.value += delta
+        if self.value > self.max:
+            self.max = self.value
+
+    def area_at(self, time=None):
+        """Integral of the value from the start up to ``time`` (default: now)."""
+        if time is None:
+            time = self.sim.clock
+        return self.area + self.value * (time - self._last)
+
+    def mean(self, time=None):
+        if time is None:
+            time = self.sim.clock
+        elapsed = time - self._start
+        return self.area_at(time) / elapsed if elapsed > 0 else 0.0
+
+
+class Resource:
+    """``capacity`` identical servers in front of one FIFO queue.
+
+    ``busy`` and ``queue_length`` are :class:`TimeWeighted`, so utilization
+    and average queue length come for free.
+    """
+
+    def __init__(self, sim, capacity=1):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.queue = deque()
+        self.busy = TimeWeighted(sim)
+        self.queue_length = TimeWeighted(sim)
+
+    @property
+    def in_system(self):
+        return self.busy.value + len(self.queue)
+
+    def request(self, entity):
+        """Seize a server for ``entity`` (True) or queue it (False)."""
+        if self.busy.value < self.capacity:
+            self.busy.add(1)
+            return True
+        self.queue.append(entity)
+        self.queue_length.set(len(self.queue))
+        return False
+
+    def release(self):
+        """Free a server; returns the queued entity that takes it over, or None."""
+        if self.queue:
+            entity = self.queue.popleft()
+            self.queue_length.set(len(self.queue))
+            return entity
+        self.busy.add(-1)
+        return None
+
+    def utilization(self, time=None):
+        return self.busy.mean(time) / self.capacity
+
+
+class Simulation:
+    """Clock, future event list and event handlers of one run."""
+
+    def __init__(self, start=0):
+        self.clock = start
+        self.fel = []
+        self.events_processed = 0
+        self._handlers = {}
+        self._priorities = {}
+        self._sequence = itertools.count()
+        self._stopped = False
+
+    def on(self, event_type, handler, priority=0):
+        """Handle ``event_type`` with ``handler(data)``; at equal times lower priorities go first."""
+        self._handlers[event_type] = handler
+        self._priorities[event_type] = priority
+
+    def schedule(self, event_type, time, data=None):
+        if time < self.clock:
+            raise ValueError(f"Cannot schedule {event_type!r} at {time}, before the clock ({self.clock})")
+        try:
+            priority = self._priorities[event_type]
+        except KeyError:
+            raise ValueError(f"No handler registered for event type {event_type!r}") from None
+        heapq.heappush(self.fel, (time, priority, next(self._sequence), event_type, data))
+
+    def schedule_in(self, event_type, delay, data=None):
+        self.schedule(event_type, self.clock + delay, data)
+
+    def scheduler(self, event_type):
+        """A fast ``push(time, data=None)`` for one registered event type.
+
+        It skips the checks of :meth:`schedule` (about twice as fast), so hot
+        handlers should use it for times they know are not in the past.
+        """
+        try:
+            priority = self._priorities[event_type]
+        except KeyError:
+            raise ValueError(f"No handler registered for event type {event_type!r}") from None
+        fel = self.fel
+        sequence = self._sequence
+        heappush = heapq.heappush
+
+        def push(time, data=None):
+            heappush(fel, (time, priority, next(sequence), event_type, data))
+
+        return push
+
+    @property
+    def next_time(self):
+        """Time of the next event, or infinity when the list is empty."""
+        return self.fel[0][0] if self.fel else math.inf
+
+    def peek(self, n):
+        """The next ``n`` events as ``(time, event type, data)``, in processing order."""
+        return [(e[0], e[3], e[4]) for e in heapq.nsmallest(n, self.fel)]
+
+    def step(self):
+        """Process the next event and return it as ``(time, event type, data)``, or None."""
+        if not self.fel:
+            return None
+        time, _, _, event_type, data = heapq.heappop(self.fel)
+        self.clock = time
+        self._handlers[event_type](data)
+        self.events_processed += 1
+        return time, event_type, data
+
+    def stop(self):
+        """Make :meth:`run` return after the event being handled."""
+        self._stopped = True
+
+    def run(self, until=math.inf, max_events=None):
+        """Process events up to time ``until`` (the clock then stands at ``until``).
+
+        Returns the number of events processed; stops early after
+        ``max_events`` events or when a handler calls :meth:`stop`.
+        """
+        fel = self.fel
+        handlers = self._handlers
+        pop = heapq.heappop
+        limit = math.inf if max_events is None else max_events
+        count = 0
+        self._stopped = False
+        while fel and count < limit:
+            if fel[0][0] > until:
+                break
+            time, _, _, event_type, data = pop(fel)
+            self.clock = time
+            handlers[event_type](data)
+            count += 1
+            if self._stopped:
+                break
+        if not self._stopped and count < limit and until != math.inf:
+            # Nothing is left before ``until``
+            self.clock = max(self.clock, until)
+        self.events_processed += count
+        return count
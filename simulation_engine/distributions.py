@@ -0,0 +1,176 @@
+"""Discrete empirical distributions shared by the models."""
+import math
+import random
+
+from .vectorized import np, require_numpy
+
+
+def _alias_tables(probabilities):
+    """Acceptance probabilities and aliases of Vose's alias method."""
+    n = len(probabilities)
+    scaled = [p * n for p in probabilities]
+    accept = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        g = large.pop()
+        accept[s] = scaled[s]
+        alias[s] = g
+        scaled[g] -= 1.0 - scaled[s]
+        (small if scaled[g] < 1.0 else large).append(g)
+    return accept, alias
+
+
+def digit_table(distribution, name):
+    """``(table, low, high)`` of a distribution the models draw by random digits."""
+    if distribution.table is None:
+        raise ValueError(f"The {name} distribution has no digit table; build it with from_ranges or "
+                         f"from_probabilities")
+    return distribution.table, distribution.low, distribution.high
+
+
+def has_fractions(*distributions):
+    """Whether any of ``distributions`` has values that are not whole numbers, as fits at a finer resolution do."""
+    return any(not float(value).is_integer() for dist in distributions for value in dist.values)
+
+
+class EmpiricalDistribution:
+    """A discrete distribution over ``values`` with the given probabilities.
+
+    Built with :meth:`from_ranges`, it also carries the textbook random-digit
+    table: ``table[digit]`` is the value of a digit in ``[low, high]``, one list
+    index per draw.  Independently of digits, :meth:`sample` and
+    :meth:`sample_array` draw values in O(1) each with the alias method.
+    """
+
+    def __init__(self, values, probabilities):
+        if len(values) != len(probabilities) or not values:
+            raise ValueError("values and probabilities must be non-empty and of equal length")
+        if any(p < 0 for p in probabilities):
+            raise ValueError("probabilities must not be negative")
+        total = sum(probabilities)
+        if total <= 0:
+            raise ValueError("probabilities must not all be zero")
+        self.values = tuple(values)
+        self.probabilities = tuple(p / total for p in probabilities)
+        self._accept, self._alias = _alias_tables(self.probabilities)
+        self.table = None
+        self.low = self.high = None
+        self._arrays = {}
+
+    @classmethod
+    def from_ranges(cls, ranges, low=0, high=99):
+        """Distribution of a table of ``(value, first digit, last digit)`` rows.
+
+        Digits in ``[low, high]`` that no row covers take the value of the last
+        row, as the original lookup loops did.
+        """
+        table = [None] * low + [ranges[-1][0]] * (high - low + 1)
+        for value, lo, hi in ranges:
+            table[lo:hi + 1] = [value] * (hi - lo + 1)
+        counts = {}
+        for value in table[low:]:
+            counts[value] = counts.get(value, 0) + 1
+        dist = cls(list(counts), list(counts.values()))
+        dist.table = table
+        dist.low = low
+        dist.high = high
+        return dist
+
+    @classmethod
+    def from_probabilities(cls, values, probabilities, low=0, high=99):
+        """The cumulative-digit table of ``values`` with the given probabilities.
+
+        Each value gets the digits up to its cumulative probability rounded
+        to the digit grid, as the textbook tables are built; a value with
+        less than about half a digit's probability gets no digit.
+        """
+        digits = high - low + 1
+        total = math.fsum(probabilities)
+        ranges = []
+        first = low
+        cumulative = 0.0
+        for value, p in zip(values, probabilities):
+            cumulative += p
+            last = low + round(cumulative / total * digits) - 1
+            if last >= first:
+                ranges.append((value, first, min(last, high)))
+                first = last + 1
+        return cls.from_ranges(ranges, low, high)
+
+    @classmethod
+    def uniform(cls, low, high):
+        """Each integer in ``[low, high]`` equally likely; a digit is its own value."""
+        return cls.from_ranges([(value, value, value) for value in range(low, high + 1)], low, high)
+
+    @property
+    def ranges(self):
+        """``(value, first digit, last digit)`` rows of the digit table, as :meth:`from_ranges` takes them."""
+        if self.table is None:
+            return None
+        rows = []
+        for digit in range(self.low, self.high + 1):
+            value = self.table[digit]
+            if rows and rows[-1][0] == value and rows[-1][2] == digit - 1:
+                rows[-1] = (value, rows[-1][1], digit)
+            else:
+                rows.append((value, digit, digit))
+        return rows
+
+    def fingerprint(self):
+        """Everything a draw depends on, exactly, for cache keys (the repr rounds probabilities)."""
+        return {"values": list(self.values), "probabilities": list(self.probabilities), "table": self.table,
+                "low": self.low, "high": self.high}
+
+    @property
+    def mean(self):
+        return sum(v * p for v, p in zip(self.values, self.probabilities))
+
+    def lookup(self, digit):
+        return self.table[digit]
+
+    def draw(self, rng=None):
+        """Draw a digit with ``rng.randint(low, high)`` and return ``(digit, value)``.
+
+        Distributions without a digit table return ``(-1, sample(rng))``.
+        """
+        if self.table is None:
+            return -1, self.sample(rng)
+        digit = (rng or random).randint(self.low, self.high)
+        return digit, self.table[digit]
+
+    def lookup_array(self, digits, dtype=None):
+        """Values of an array of digits, with one NumPy take."""
+        require_numpy()
+        key = np.dtype(dtype).str if dtype is not None else None
+        array = self._arrays.get(key)
+        if array is None:
+            fill = self.table[self.low]
+            array = np.array([fill if value is None else value for value in self.table], dtype=dtype)
+            self._arrays[key] = array
+        return array[digits]
+
+    def sample(self, rng=None):
+        """One value by the alias method (a single ``rng.random()`` call)."""
+        n = len(self.values)
+        u = (rng or random).random() * n
+        # An antithetic stream's random() returns 1 - u, which can be exactly 1.
+        i = min(int(u), n - 1)
+        return self.values[i] if u - i < self._accept[i] else self.values[self._alias[i]]
+
+    def sample_array(self, size, generator=None):
+        """``size`` values by the alias method from a NumPy Generator."""
+        require_numpy()
+        if generator is None:
+            generator = np.random.default_rng()
+        u = generator.random(size) * len(self.values)
+        i = u.astype(np.intp)
+        accept = np.asarray(self._accept)[i]
+        index = np.where(u - i < accept, i, np.asarray(self._alias)[i])
+        return np.asarray(self.values)[index]
+
+    def __repr__(self):
+        pairs = ", ".join(f"{v!r}: {p:.4g}" for v, p in zip(self.values, self.probabilities))
+        return f"EmpiricalDistribution({{{pairs}}})"
@@ -0,0 +1,164 @@
+"""Event-scheduling simulation of a single-server queue, on the :mod:`~simulation_engine.des` kernel."""
+from heapq import nsmallest
+
+from .des import Resource, Simulation
+from .distributions import EmpiricalDistribution, digit_table, has_fractions
+from .progress import PROGRESS_INTERVAL
+from .results import Column, ModelStream
+from .streams import as_streams
+
+
+# Event data is the customer id.  At equal times a departure is handled
+# before an arrival, so an arriving customer sees the server freed by a
+# simultaneous departure; remaining ties keep scheduling order.
+EVENT_PRIORITY = {'D': 0, 'A': 1}
+FEL_DISPLAY_LIMIT = 5
+# FEL cells store each event type by its index here
+FEL_EVENT_TYPES = "DA"
+
+INTERARRIVAL_DISTRIBUTION = EmpiricalDistribution.uniform(1, 8)
+SERVICE_DISTRIBUTION = EmpiricalDistribution.uniform(1, 6)
+
+
+def format_event(code):
+    """Event cells hold the customer id, negated for departures."""
+    return f"Arr(C{code})" if code > 0 else f"Dep(C{-code})"
+
+
+def format_fel(entries):
+    """FEL cells hold FEL_DISPLAY_LIMIT ``(type index, time)`` pairs, padded with ``(-1, -1)``."""
+    return "".join(f"({FEL_EVENT_TYPES[int(kind)]},{time:.15g}) " for kind, time in entries if kind >= 0)
+
+
+EVENT_SCHEDULING_SCHEMA = (
+    Column("Clock", "i8"), Column("Event", "i8", format_event), Column("LQ", "i8"), Column("LS", "u1"),
+    Column("FEL", "i8", format_fel, shape=(FEL_DISPLAY_LIMIT, 2)), Column("S", "i8"), Column("Nd", "i8"),
+    Column("B", "i8"), Column("MQ", "i8"),
+)
+EVENT_SCHEDULING_COLUMNS = tuple(column.name for column in EVENT_SCHEDULING_SCHEMA)
+# Interarrival or service times with fractional values make every time column a float
+EVENT_SCHEDULING_FLOAT_SCHEMA = tuple(
+    Column(column.name, "f8", "g" if column.name != "FEL" else column.fmt, shape=column.shape)
+    if column.name in ("Clock", "FEL", "S", "B") else column
+    for column in EVENT_SCHEDULING_SCHEMA
+)
+
+
+def event_scheduling_simulation(max_customers, stop_time, rng=None, progress=None, keep_rows=True,
+                                interarrival=None, service=None):
+    return event_scheduling_stream(max_customers, stop_time, rng, progress, interarrival, service).run(keep_rows)
+
+
+def event_scheduling_stream(max_customers, stop_time, rng=None, progress=None, interarrival=None, service=None):
+    """``interarrival`` and ``service`` replace the uniform 1-8 and 1-6 minute tables."""
+    if max_customers < 1:
+        raise ValueError("max_customers must be at least 1")
+    if stop_time <= 0:
+        raise ValueError("stop_time must be positive")
+    interarrival = interarrival or INTERARRIVAL_DISTRIBUTION
+    service = service or SERVICE_DISTRIBUTION
+    fractional = has_fractions(interarrival, service)
+    return ModelStream("event_scheduling", EVENT_SCHEDULING_FLOAT_SCHEMA if fractional else EVENT_SCHEDULING_SCHEMA,
+                       _event_scheduling_rows(max_customers, stop_time, interarrival, service, fractional, rng,
+                                              progress),
+                       event_scheduling_performance)
+
+
+def _event_scheduling_rows(max_customers, stop_time, interarrival, service, fractional, rng, progress):
+    streams = as_streams(rng)
+    arrival_rng = streams.stream("arrival")
+    service_rng = streams.stream("service")
+
+    interarrival_table, interarrival_low, interarrival_high = digit_table(interarrival, "interarrival")
+    service_table, service_low, service_high = digit_table(service, "service")
+
+    def get_interarrival_time():
+        return interarrival_table[arrival_rng.randint(interarrival_low, interarrival_high)]
+
+    def get_service_time():
+        return service_table[service_rng.randint(service_low, service_high)]
+
+    sim = Simulation()
+    server = Resource(sim)
+    next_customer = 2
+    Nd = 0
+
+    def arrival(cust_id):
+        nonlocal next_customer
+        next_arr = sim.clock + get_interarrival_time()
+        if next_arr <= stop_time + 20:
+            schedule_arrival(next_arr, next_customer)
+            next_customer += 1
+        if server.request(cust_id):
+            schedule_departure(sim.clock + get_service_time(), cust_id)
+
+    def departure(cust_id):
+        nonlocal Nd
+        Nd += 1
+        next_cust = server.release()
+        if next_cust is not None:
+            schedule_departure(sim.clock + get_service_time(), next_cust)
+
+    for event_type, handler in (('A', arrival), ('D', departure)):
+        sim.on(event_type, handler, EVENT_PRIORITY[event_type])
+    schedule_arrival = sim.scheduler('A')
+    schedule_departure = sim.scheduler('D')
+    schedule_arrival(0, 1)
+
+    busy = server.busy
+    queue = server.queue
+    busy_area = busy.area_at
+    queue_area = server.queue_length.area_at
+    step = sim.step
+    event_list = sim.fel
+    MQ = 0
+    events_handled = 0
+    time = float if fractional else int
+    no_event = ((-1, -1),)
+
+    while Nd < max_customers and event_list:
+        if progress is not None and events_handled % PROGRESS_INTERVAL == 0:
+            progress(sim.clock, stop_time)
+        if event_list[0][0] > stop_time:
+            # Statistics run on to the stop time; later events never happen
+            sim.run(until=stop_time)
+            break
+
+        # MQ samples the queue as the previous event left it
+        if len(queue) > MQ:
+            MQ = len(queue)
+        clock, event_type, cust_id = step()
+
+        fel = tuple((FEL_EVENT_TYPES.index(e[3]), e[0]) for e in nsmallest(FEL_DISPLAY_LIMIT, event_list))
+        fel += no_event * (FEL_DISPLAY_LIMIT - len(fel))
+
+        events_handled += 1
+        B = busy_area()
+        yield (
+            time(clock), cust_id if event_type == 'A' else -cust_id, len(queue), busy.value,
+            fel, time(B + queue_area()), Nd, time(B), MQ
+        )
+
+    clock = sim.clock
+    if clock > 0:
+        avg_q_len = server.queue_length.area_at(clock) / clock
+        utilization = busy.area_at(clock) / clock
+    else:
+        avg_q_len = 0
+        utilization = 0
+
+    return {
+        "clock": clock,
+        "departures": Nd,
+        "max_queue": MQ,
+        "utilization": utilization,
+        "avg_queue_length": avg_q_len,
+    }
+
+
+def event_scheduling_performance(m):
+    return f"""Total Simulation Time:   {m['clock']} min
+Total Departures (Nd):   {m['departures']}
+Max Queue Length (MQ):   {m['max_queue']}
+Server Utilization:      {m['utilization']:.2f} ({(m['utilization']*100):.1f}%)
+Avg Queue Length:        {m['avg_queue_length']:.2f} customers"""
@@ -0,0 +1,437 @@
+"""Exact expected performance of the models with small discrete inputs.
+
+The arrival, service, demand, lead-time and newsday tables are finite, so
+the expectations the simulations estimate can be computed directly:
+
+* the newsvendor enumerates the joint newsday type and demand distribution;
+* the single- and double-server queues carry the distribution of the
+  servers' remaining busy times from customer to customer (the Lindley
+  recursion, over every outcome at once);
+* the M-N inventory carries the distribution of (net stock, days until the
+  outstanding order arrives) from day to day, a Markov chain.
+
+The queue and inventory chains stop iterating once their distribution no
+longer changes (a stable queue, or an inventory at the same point of its
+review cycle) and extrapolate the remaining customers or cycles; an
+overloaded single server stops once it will never be idle again, after
+which its waits only drift upward.  States less likely than ``tolerance``
+are dropped, which bounds the error of every result by about
+``tolerance`` per step.
+
+A queue that is close to overloaded, or an inventory that settles slowly,
+never stops early and its state count keeps growing, so the solvers give
+up with :class:`ExactTooCostly` once they have updated ``max_work``
+(state, outcome) pairs, a few seconds of work.  Simulate those instead.
+
+Every solver takes the same distribution arguments as its model
+(``arrival``, ``service``, ``demand``, ...), so fitted tables can be solved
+too; the queue solvers' work grows with the number of distinct values, so
+fit those at a coarse resolution.
+
+Measures that are sums over customers or days (average wait, probability of
+waiting, days with shortage, profits) are exact expectations.  Ratios such
+as server utilization are reported as the ratio of the expected totals;
+``max_wait`` and ``wait_std`` have no counterpart here.
+"""
+import math
+from functools import partial
+
+from .inventory import DEMAND_DISTRIBUTION as INVENTORY_DEMAND
+from .inventory import LEAD_TIME_DISTRIBUTION, MN_INVENTORY_SCHEMA, mn_inventory_performance
+from .newspaper import (COST_PER_PAPER, DEMAND_DISTRIBUTIONS, NEWSDAY_DISTRIBUTION, NEWSPAPER_SCHEMA,
+                        newspaper_day, newspaper_performance)
+from .queueing import (ARRIVAL_DISTRIBUTION, DOUBLE_SERVER_SCHEMA, SERVICE_DISTRIBUTION,
+                       SERVICE_DISTRIBUTION_SERVER1, SERVICE_DISTRIBUTION_SERVER2, SINGLE_SERVER_SCHEMA,
+                       double_server_performance, single_server_performance)
+from .results import SimulationResult
+
+TOLERANCE = 1e-15
+# Customers or days between progress reports; each one updates a whole distribution
+PROGRESS_STEP = 10
+# (state, outcome) pairs a solver may update before giving up; about 1.5 million a second
+MAX_WORK = 5 * 10**6
+
+
+class ExactTooCostly(ValueError):
+    """Raised when an exact solution would take more than ``max_work`` state updates."""
+
+
+def _spend(work, step, max_work, model):
+    work += step
+    if work > max_work:
+        raise ExactTooCostly(f"The exact {model} solution needs more than {max_work:,} state updates for these "
+                             f"inputs; run the simulation instead")
+    return work
+
+
+def _pairs(distribution):
+    return list(zip(distribution.values, distribution.probabilities))
+
+
+def _distance(a, b):
+    return sum(abs(p - b.get(state, 0.0)) for state, p in a.items()) + sum(
+        p for state, p in b.items() if state not in a)
+
+
+def _prune(states, tolerance):
+    return {state: p for state, p in states.items() if p >= tolerance}
+
+
+# ==================== QUEUES ====================
+def _lundberg(increments):
+    """``theta > 0`` with ``E[exp(-theta D)] = 1`` for a walk with upward drift, or None.
+
+    A walk started at ``w`` then ever falls to ``w - x`` or below with
+    probability at most ``exp(-theta * x)`` (Lundberg's inequality).
+    """
+    if sum(d * p for d, p in increments) <= 0:
+        return None
+    if min(d for d, _ in increments) >= 0:
+        return math.inf
+
+    def excess(theta):
+        return math.fsum(p * math.exp(-theta * d) for d, p in increments) - 1
+
+    high = 1.0
+    while excess(high) < 0:
+        high *= 2
+    low = 0.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if excess(mid) < 0:
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+def single_server_exact(num_applicants, tolerance=TOLERANCE, progress=None, arrival=None, service=None,
+                        max_work=MAX_WORK):
+    """Lindley recursion ``W' = max(0, W + S - A)`` over the whole distribution of the wait.
+
+    A stable queue stops once the wait distribution settles; an overloaded
+    one stops once the server will, within ``tolerance``, never be idle
+    again, after which every wait grows by ``E[S - A]`` per customer.
+    """
+    if num_applicants < 1:
+        raise ValueError("num_applicants must be at least 1")
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    service = service or SERVICE_DISTRIBUTION
+    increments = {}
+    for serv_time, ps in _pairs(service):
+        for inter, pa in _pairs(arrival):
+            increments[serv_time - inter] = increments.get(serv_time - inter, 0.0) + ps * pa
+    increments = list(increments.items())
+    drift = math.fsum(d * p for d, p in increments)
+    theta = _lundberg(increments)
+
+    states = {0: 1.0}
+    total_wait = num_waited = total_idle = 0.0
+    work = 0
+    done = 1
+    while done < num_applicants:
+        if progress is not None and done % PROGRESS_STEP == 0:
+            progress(done, num_applicants)
+        work = _spend(work, len(states) * len(increments), max_work, "single-server")
+        new = {}
+        wait = waited = idle = 0.0
+        for w, p in states.items():
+            for d, pd in increments:
+                x = w + d
+                q = p * pd
+                if x > 0:
+                    wait += q * x
+                    waited += q
+                else:
+                    idle -= q * x
+                    x = 0
+                new[x] = new.get(x, 0.0) + q
+        new = _prune(new, tolerance)
+        total_wait += wait
+        num_waited += waited
+        total_idle += idle
+        done += 1
+        left = num_applicants - done
+        if left and _distance(new, states) < tolerance:
+            total_wait += left * wait
+            num_waited += left * waited
+            total_idle += left * idle
+            break
+        if left and theta is not None and math.fsum(
+                p * math.exp(-theta * (w - 1)) for w, p in new.items()) < tolerance:
+            # Waits from here on are the current ones plus a sum of increments
+            total_wait += left * (wait + drift * (left + 1) / 2)
+            num_waited += left
+            break
+        states = new
+
+    total_service = num_applicants * service.mean
+    busy_plus_idle = total_service + total_idle
+    return {
+        "avg_wait": total_wait / num_applicants,
+        "prob_wait": num_waited / num_applicants,
+        "server_utilization": total_service / busy_plus_idle,
+        "prob_server_idle": total_idle / busy_plus_idle,
+        "avg_service": total_service / num_applicants,
+        "avg_in_system": (total_wait + total_service) / num_applicants,
+    }
+
+
+def _double_server_step(states, arrivals, services, first):
+    """One customer: arrive, take the server that frees up first, be served.
+
+    ``states`` maps the servers' remaining busy times (relative to the
+    previous arrival) to probabilities.  Returns the new states, the
+    customer's expected wait and probability of waiting, and the probability
+    of taking each server.
+    """
+    new = {}
+    wait = waited = 0.0
+    chosen = [0.0, 0.0]
+    for state, p in states.items():
+        for inter, pa in ((0, 1.0),) if first else arrivals:
+            remaining = (state[0] - inter, state[1] - inter)
+            # Lowest index on ties, as the heap of (free time, server) does
+            server = 0 if remaining[0] <= remaining[1] else 1
+            start = remaining[server]
+            q = p * pa
+            chosen[server] += q
+            if start > 0:
+                wait += q * start
+                waited += q
+            else:
+                start = 0
+            # The server left idle here frees up before the one just taken, so it is
+            # the next one chosen whatever its idle time; it is stored as free from now.
+            other = max(remaining[1 - server], 0)
+            for service, ps in services[server]:
+                key = (start + service, other) if server == 0 else (other, start + service)
+                new[key] = new.get(key, 0.0) + q * ps
+    return new, wait, waited, chosen
+
+
+def double_server_exact(num_applicants, tolerance=TOLERANCE, progress=None, arrival=None, service=None,
+                        max_work=MAX_WORK):
+    """Remaining busy times of both servers carried from customer to customer.
+
+    Once the distribution settles the remaining customers are extrapolated;
+    an overloaded queue never settles and costs about ``n ** 1.5`` state
+    updates, so the default tables give up after a few hundred customers.
+    """
+    if num_applicants < 1:
+        raise ValueError("num_applicants must be at least 1")
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    if service is None:
+        service = (SERVICE_DISTRIBUTION_SERVER1, SERVICE_DISTRIBUTION_SERVER2)
+    distributions = list(service) if isinstance(service, (list, tuple)) else [service, service]
+    arrivals = _pairs(arrival)
+    services = [_pairs(s) for s in distributions]
+    outcomes = len(arrivals) * max(len(s) for s in services)
+    states = {(0, 0): 1.0}
+    total_wait = num_waited = 0.0
+    served = [0.0, 0.0]
+    work = 0
+    done = 0
+    while done < num_applicants:
+        if progress is not None and done and done % PROGRESS_STEP == 0:
+            progress(done, num_applicants)
+        work = _spend(work, len(states) * outcomes, max_work, "double-server")
+        new, wait, waited, chosen = _double_server_step(states, arrivals, services, done == 0)
+        new = _prune(new, tolerance)
+        done += 1
+        # Customers after the first all see the same distribution once it settles
+        repeat = num_applicants - done if done > 1 and _distance(new, states) < tolerance else 0
+        total_wait += wait * (1 + repeat)
+        num_waited += waited * (1 + repeat)
+        for server in (0, 1):
+            served[server] += chosen[server] * (1 + repeat)
+        done += repeat
+        states = new
+
+    # The last customer leaves max(remaining) after the last arrival
+    horizon = (num_applicants - 1) * arrival.mean + sum(p * max(state) for state, p in states.items())
+    busy_1, busy_2 = (count * s.mean for count, s in zip(served, distributions))
+    return {
+        "total_time_horizon": horizon,
+        "avg_wait": total_wait / num_applicants,
+        "prob_wait": num_waited / num_applicants,
+        "server_utilization_1": busy_1 / horizon,
+        "server_utilization_2": busy_2 / horizon,
+        "system_utilization": (busy_1 + busy_2) / (2 * horizon),
+        "prob_server_1_idle": (horizon - busy_1) / horizon,
+        "prob_server_2_idle": (horizon - busy_2) / horizon,
+        "avg_service": (busy_1 + busy_2) / num_applicants,
+        "avg_in_system": (total_wait + busy_1 + busy_2) / num_applicants,
+    }
+
+
+# ==================== M-N INVENTORY ====================
+def _inventory_day(states, day, cycle_length, reorder_point, order_quantity, demands, lead_times):
+    """One day of the chain over (net stock, arrival day or -1); returns the new states,
+    expected ending inventory and probability of a shortage."""
+    new = {}
+    end_inv = short = 0.0
+    review = day % cycle_length == 0
+    for (stock, arrival_day), p in states.items():
+        if day == arrival_day:
+            stock += order_quantity
+            arrival_day = -1
+        for demand, pd in demands:
+            left = stock - demand
+            q = p * pd
+            if left >= 0:
+                end_inv += q * left
+            else:
+                short += q
+            if review and left <= reorder_point and arrival_day == -1:
+                for lead_time, pl in lead_times:
+                    key = (left, day + lead_time + 1)
+                    new[key] = new.get(key, 0.0) + q * pl
+            else:
+                key = (left, arrival_day)
+                new[key] = new.get(key, 0.0) + q
+    return new, end_inv, short
+
+
+def _relative(states, day):
+    # Arrival days relative to ``day``, so two points of the cycle compare equal
+    return {(stock, arrival - day if arrival != -1 else -1): p for (stock, arrival), p in states.items()}
+
+
+def _backlog_bound(cycle_length, reorder_point, order_quantity, demands, lead_times):
+    """Lundberg exponent and floor of the backlog when orders fall behind demand, or None.
+
+    While the backlog after a review stays at least ``floor``, stock is
+    negative every day and every review orders, so the backlog changes by
+    ``(demand of a cycle) - order_quantity`` per cycle.  That needs each
+    order to arrive within its cycle.
+    """
+    if max(lead_time for lead_time, _ in lead_times) + 1 > cycle_length:
+        return None
+    cycle_demand = {0: 1.0}
+    for _ in range(cycle_length):
+        total = {}
+        for d, p in cycle_demand.items():
+            for demand, pd in demands:
+                total[d + demand] = total.get(d + demand, 0.0) + p * pd
+        cycle_demand = total
+    theta = _lundberg([(d - order_quantity, p) for d, p in cycle_demand.items()])
+    if theta is None:
+        return None
+    return theta, order_quantity + max(1, -reorder_point)
+
+
+def mn_inventory_exact(initial_inv, cycle_length, reorder_point, order_quantity, num_days,
+                       tolerance=TOLERANCE, progress=None, demand=None, lead_time=None, max_work=MAX_WORK):
+    """Markov chain over (net stock, arrival day of the outstanding order), one day at a time.
+
+    The chain is compared at the same point of every review cycle and the
+    remaining cycles are extrapolated once it settles.  When orders fall
+    behind demand the backlog grows instead; once it will, within
+    ``tolerance``, never come back, every remaining day is a shortage day.
+    """
+    if cycle_length < 1 or num_days < 1:
+        raise ValueError("cycle_length and num_days must be at least 1")
+    demands = _pairs(demand or INVENTORY_DEMAND)
+    lead_times = _pairs(lead_time or LEAD_TIME_DISTRIBUTION)
+    backlog = _backlog_bound(cycle_length, reorder_point, order_quantity, demands, lead_times)
+    states = {(initial_inv, -1): 1.0}
+    total_end_inv = days_with_shortage = 0.0
+    work = 0
+    day = 1
+    while day <= num_days:
+        if progress is not None and day > 1:
+            progress(day - 1, num_days)
+        # One review cycle at a time, so the chain can be compared at the same point of the cycle
+        start = dict(states)
+        cycle_end_inv = cycle_short = 0.0
+        cycle_start = day
+        while day <= num_days and (day == cycle_start or (day - 1) % cycle_length):
+            work = _spend(work, len(states) * len(demands), max_work, "M-N inventory")
+            states, end_inv, short = _inventory_day(states, day, cycle_length, reorder_point, order_quantity,
+                                                    demands, lead_times)
+            states = _prune(states, tolerance)
+            cycle_end_inv += end_inv
+            cycle_short += short
+            day += 1
+        total_end_inv += cycle_end_inv
+        days_with_shortage += cycle_short
+        full = day - cycle_start == cycle_length
+        if full and _distance(_relative(states, day), _relative(start, cycle_start)) < tolerance:
+            cycles = (num_days - day + 1) // cycle_length
+            total_end_inv += cycles * cycle_end_inv
+            days_with_shortage += cycles * cycle_short
+            day += cycles * cycle_length
+            states = {(stock, arrival + cycles * cycle_length if arrival != -1 else -1): p
+                      for (stock, arrival), p in states.items()}
+        elif full and backlog is not None:
+            theta, floor = backlog
+            if math.fsum(p * math.exp(-theta * (-stock - floor)) for (stock, _), p in states.items()) < tolerance:
+                days_with_shortage += num_days - day + 1
+                break
+    return {
+        "avg_end_inv": total_end_inv / num_days,
+        "days_with_shortage": days_with_shortage,
+        "shortage_percent": days_with_shortage / num_days * 100,
+    }
+
+
+# ==================== NEWSPAPER ====================
+def newspaper_exact(num_papers, num_days, progress=None, newsday=None, demand=None):
+    # One pass over every (newsday type, demand) outcome; progress is accepted like every other model's
+    newsday = newsday or NEWSDAY_DISTRIBUTION
+    if demand is None:
+        demand = DEMAND_DISTRIBUTIONS
+    revenue = lost_profit = salvage = profit = 0.0
+    daily_cost = num_papers * COST_PER_PAPER
+    for day_type, pt in _pairs(newsday):
+        demands = demand[day_type] if isinstance(demand, dict) else demand
+        for papers_wanted, pd in _pairs(demands):
+            r, lost, s, daily_profit = newspaper_day(num_papers, papers_wanted, daily_cost)
+            q = pt * pd
+            revenue += q * r
+            lost_profit += q * lost
+            salvage += q * s
+            profit += q * daily_profit
+    return {
+        "total_revenue": revenue * num_days,
+        "total_cost": daily_cost * num_days,
+        "total_lost_profit": lost_profit * num_days,
+        "total_salvage": salvage * num_days,
+        "net_profit": profit * num_days,
+    }
+
+
+# Model name -> (exact measures, schema, performance formatter)
+EXACT = {
+    "double_server": (double_server_exact, DOUBLE_SERVER_SCHEMA, double_server_performance),
+    "single_server": (single_server_exact, SINGLE_SERVER_SCHEMA, single_server_performance),
+    "mn_inventory": (mn_inventory_exact, MN_INVENTORY_SCHEMA, mn_inventory_performance),
+    "newspaper": (newspaper_exact, NEWSPAPER_SCHEMA, newspaper_performance),
+}
+
+
+def _exact(model):
+    try:
+        return EXACT[model]
+    except KeyError:
+        raise ValueError(f"No exact solution for model {model!r}; expected one of {', '.join(EXACT)}") from None
+
+
+def exact_measures(model, **params):
+    """Expected performance measures of ``model`` with ``params``, without simulating."""
+    return _exact(model)[0](**params)
+
+
+def exact_result(model, progress=None, **params):
+    """A :class:`SimulationResult` with no rows and the exact expected measures.
+
+    It stands in for a simulation run wherever only the measures are used.
+    """
+    solve, schema, performance = _exact(model)
+    measures = solve(progress=progress, **params)
+    if model == "newspaper":
+        performance = partial(performance, num_papers=params["num_papers"], num_days=params["num_days"])
+    # Expected counts are fractional; the formatters print some measures without a precision
+    shown = {name: round(value, 2) for name, value in measures.items()}
+    return SimulationResult(model, schema, [], measures, "Exact expected values\n\n" + performance(shown))
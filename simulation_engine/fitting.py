@@ -0,0 +1,396 @@
+"""Fit the models' input distributions from large data files in one streaming pass.
+
+:class:`DistributionFit` takes observations one NumPy chunk at a time and
+keeps only the count of every distinct value (rounded to ``resolution``)
+and running moments, so a file of any size needs memory for one chunk.
+From it come
+
+* :meth:`DistributionFit.empirical`, the cumulative-digit table of the
+  observed frequencies, built the way the textbook tables are;
+* :meth:`DistributionFit.parametric`, the maximum-likelihood exponential,
+  lognormal, normal, Poisson or uniform fit, which
+  :meth:`ParametricDistribution.digit_table` turns into a digit table of
+  evenly spaced quantiles.
+
+Both are :class:`~simulation_engine.distributions.EmpiricalDistribution`
+digit tables, so they go into any model argument a built-in table goes
+into.  :func:`fit_file` reads CSV, raw binary and ``.npy`` files with the
+readers of :mod:`simulation_engine.traces`, split across worker processes.
+NumPy is optional, as for :mod:`simulation_engine.vectorized`.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from .distributions import EmpiricalDistribution
+from .online import RunningStats
+from .replication import _chunks
+from .traces import (BINARY_DTYPE, CHUNK_BYTES, CHUNK_ROWS, binary_columns, csv_chunks, csv_layout,
+                     split_lines)
+from .vectorized import np, require_numpy
+
+FAMILIES = ("exponential", "lognormal", "normal", "poisson", "uniform")
+# Distinct values a fit counts before it asks for a coarser resolution
+MAX_VALUES = 100000
+
+
+def _normal_logpdf(x, mu, sigma):
+    return -((x - mu) / sigma) ** 2 / 2 - math.log(sigma) - math.log(2 * math.pi) / 2
+
+
+class ParametricDistribution:
+    """A fitted exponential, lognormal, normal, Poisson or uniform distribution.
+
+    ``params`` are ``scale`` (exponential), ``mu`` and ``sigma`` (normal,
+    and lognormal on the log scale), ``mean`` (Poisson) or ``low`` and
+    ``high`` (uniform).
+    """
+
+    def __init__(self, family, **params):
+        if family not in FAMILIES:
+            raise ValueError(f"Unknown family {family!r}; expected one of {', '.join(FAMILIES)}")
+        self.family = family
+        self.params = params
+
+    @property
+    def mean(self):
+        p = self.params
+        if self.family == "exponential":
+            return p["scale"]
+        if self.family == "lognormal":
+            return math.exp(p["mu"] + p["sigma"] ** 2 / 2)
+        if self.family == "normal":
+            return p["mu"]
+        if self.family == "poisson":
+            return p["mean"]
+        return (p["low"] + p["high"]) / 2
+
+    def _log_pmf(self, k):
+        mean = self.params["mean"]
+        if mean == 0:
+            return 0.0 if k == 0 else -math.inf
+        return k * math.log(mean) - mean - math.lgamma(k + 1)
+
+    def pdf(self, x):
+        """Density at ``x``, or the probability of ``x`` for the Poisson."""
+        return math.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        """Log of :meth:`pdf`, computed directly so far tails do not underflow to ``-inf``."""
+        p = self.params
+        if self.family == "exponential":
+            return -x / p["scale"] - math.log(p["scale"]) if x >= 0 else -math.inf
+        if self.family == "lognormal":
+            if x <= 0:
+                return -math.inf
+            return _normal_logpdf(math.log(x), p["mu"], p["sigma"]) - math.log(x)
+        if self.family == "normal":
+            return _normal_logpdf(x, p["mu"], p["sigma"])
+        if self.family == "poisson":
+            return self._log_pmf(x) if x >= 0 and float(x).is_integer() else -math.inf
+        return -math.log(p["high"] - p["low"]) if p["low"] <= x <= p["high"] else -math.inf
+
+    def cdf(self, x):
+        p = self.params
+        if self.family == "exponential":
+            return -math.expm1(-x / p["scale"]) if x > 0 else 0.0
+        if self.family == "lognormal":
+            return NormalDist(p["mu"], p["sigma"]).cdf(math.log(x)) if x > 0 else 0.0
+        if self.family == "normal":
+            return NormalDist(p["mu"], p["sigma"]).cdf(x)
+        if self.family == "poisson":
+            return math.fsum(math.exp(self._log_pmf(k)) for k in range(math.floor(x) + 1)) if x >= 0 else 0.0
+        return min(max((x - p["low"]) / (p["high"] - p["low"]), 0.0), 1.0)
+
+    def sf(self, x):
+        """``1 - cdf(x)``, accurate in the upper tail."""
+        p = self.params
+        if self.family == "exponential":
+            return math.exp(-x / p["scale"]) if x > 0 else 1.0
+        if self.family == "lognormal":
+            return NormalDist(p["mu"], p["sigma"]).cdf(2 * p["mu"] - math.log(x)) if x > 0 else 1.0
+        if self.family == "normal":
+            return NormalDist(p["mu"], p["sigma"]).cdf(2 * p["mu"] - x)
+        return 1.0 - self.cdf(x)
+
+    def ppf(self, q):
+        """The value below which a fraction ``q`` of the distribution lies."""
+        p = self.params
+        if self.family == "exponential":
+            return -p["scale"] * math.log1p(-q)
+        if self.family == "lognormal":
+            return math.exp(NormalDist(p["mu"], p["sigma"]).inv_cdf(q))
+        if self.family == "normal":
+            return NormalDist(p["mu"], p["sigma"]).inv_cdf(q)
+        if self.family == "poisson":
+            k, cumulative = 0, 0.0
+            while True:
+                cumulative += math.exp(self._log_pmf(k))
+                if cumulative >= q:
+                    return k
+                k += 1
+        return p["low"] + q * (p["high"] - p["low"])
+
+    def digit_table(self, low=0, high=99, resolution=1, minimum=None):
+        """An EmpiricalDistribution giving digit ``d`` the quantile at the middle of its slot.
+
+        Values are rounded to a multiple of ``resolution`` (whole numbers by
+        default, as the models' clocks and stock levels are) and raised to
+        ``minimum`` if given, e.g. 0 for service times fitted as normal.
+        """
+        digits = high - low + 1
+        table = []
+        for k in range(digits):
+            value = self.ppf((k + 0.5) / digits)
+            if resolution:
+                value = round(value / resolution) * resolution
+            if minimum is not None:
+                value = max(value, minimum)
+            table.append(value)
+        ranges = []
+        for digit, value in enumerate(table, low):
+            if ranges and ranges[-1][0] == value:
+                ranges[-1] = (value, ranges[-1][1], digit)
+            else:
+                ranges.append((value, digit, digit))
+        return EmpiricalDistribution.from_ranges(ranges, low, high)
+
+    def __repr__(self):
+        params = ", ".join(f"{name}={value:.6g}" for name, value in self.params.items())
+        return f"ParametricDistribution({self.family!r}, {params})"
+
+
+class DistributionFit:
+    """Counts and moments of a stream of observations, added one array at a time.
+
+    ``resolution`` rounds every value to a multiple of it before counting
+    (1 counts whole minutes or units); ``None`` counts exact values, as for
+    categories such as newsday types.  Fits of parts of a file are combined
+    with :meth:`merge`.
+    """
+
+    def __init__(self, resolution=1, max_values=MAX_VALUES):
+        self.resolution = resolution
+        self.max_values = max_values
+        self.counts = {}
+        self.stats = RunningStats()
+        self.log_stats = RunningStats()
+        self.nonpositive = 0
+
+    def add(self, values):
+        require_numpy()
+        values = np.asarray(values).ravel()
+        if values.dtype.kind in "biuf":
+            values = values.astype(np.float64)
+            values = values[~np.isnan(values)]
+            self.stats.merge(RunningStats.from_array(values))
+            positive = values[values > 0]
+            self.nonpositive += len(values) - len(positive)
+            self.log_stats.merge(RunningStats.from_array(np.log(positive)))
+            if self.resolution:
+                values = np.rint(values / self.resolution)
+                if isinstance(self.resolution, int):
+                    values = values.astype(np.int64)
+                values = values * self.resolution
+        keys, counts = np.unique(values, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+        self._check_size()
+        return self
+
+    def merge(self, other):
+        """Combine with the fit of another, disjoint part of the data."""
+        if other.resolution != self.resolution:
+            raise ValueError("Only fits of the same resolution can be merged")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.stats.merge(other.stats)
+        self.log_stats.merge(other.log_stats)
+        self.nonpositive += other.nonpositive
+        self._check_size()
+        return self
+
+    def _check_size(self):
+        if len(self.counts) > self.max_values:
+            raise ValueError(f"More than {self.max_values} distinct values; fit with a coarser resolution")
+
+    @property
+    def count(self):
+        return sum(self.counts.values())
+
+    @property
+    def numeric(self):
+        return self.stats.count == self.count > 0
+
+    def empirical(self, low=0, high=99):
+        """The cumulative-digit table of the observed frequencies, over digits ``low`` to ``high``."""
+        if not self.counts:
+            raise ValueError("Nothing to fit; no observations were added")
+        values = sorted(self.counts)
+        return EmpiricalDistribution.from_probabilities(values, [self.counts[v] for v in values], low, high)
+
+    def parametric(self, family):
+        """The maximum-likelihood fit of ``family`` to the observations."""
+        s = self.stats
+        if not self.numeric:
+            raise ValueError("A parametric fit needs numeric observations")
+        if family == "exponential":
+            if s.min < 0:
+                raise ValueError("An exponential fit needs non-negative observations")
+            return ParametricDistribution(family, scale=s.mean)
+        if family == "lognormal":
+            if self.nonpositive:
+                raise ValueError("A lognormal fit needs positive observations")
+            if not self.log_stats.std:
+                raise ValueError("A lognormal fit needs observations that differ")
+            return ParametricDistribution(family, mu=self.log_stats.mean, sigma=self.log_stats.std)
+        if family == "normal":
+            if not s.std:
+                raise ValueError("A normal fit needs observations that differ")
+            return ParametricDistribution(family, mu=s.mean, sigma=s.std)
+        if family == "poisson":
+            if s.min < 0 or self.resolution != 1:
+                raise ValueError("A Poisson fit needs non-negative counts at resolution 1")
+            return ParametricDistribution(family, mean=s.mean)
+        if family == "uniform":
+            if s.max == s.min:
+                raise ValueError("A uniform fit needs observations that differ")
+            return ParametricDistribution(family, low=s.min, high=s.max)
+        raise ValueError(f"Unknown family {family!r}; expected one of {', '.join(FAMILIES)}")
+
+    def log_likelihood(self, distribution):
+        """Log-likelihood of the counted values, each as the interval ``resolution`` wide around it.
+
+        Upper-tail intervals are taken from the survival function, and where
+        an interval's probability still underflows its density times its
+        width stands in, so every family gets a finite, comparable value.
+        """
+        width = self.resolution or 0
+        total = 0.0
+        for value, count in self.counts.items():
+            if distribution.family == "poisson" or not width:
+                log_p = distribution.logpdf(value)
+            else:
+                lo, hi = value - width / 2, value + width / 2
+                if distribution.cdf(value) > 0.5:
+                    p = distribution.sf(lo) - distribution.sf(hi)
+                else:
+                    p = distribution.cdf(hi) - distribution.cdf(lo)
+                log_p = math.log(p) if p > 0 else distribution.logpdf(value) + math.log(width)
+            total += count * log_p
+        return total
+
+    def compare(self, families=FAMILIES):
+        """``(AIC, distribution)`` of every family that fits the data, best (lowest AIC) first."""
+        fits = []
+        for family in families:
+            try:
+                distribution = self.parametric(family)
+            except ValueError:
+                continue
+            aic = 2 * len(distribution.params) - 2 * self.log_likelihood(distribution)
+            fits.append((aic, distribution))
+        fits.sort(key=lambda fit: fit[0])
+        return fits
+
+    def best(self, families=FAMILIES):
+        fits = self.compare(families)
+        if not fits:
+            raise ValueError(f"None of {', '.join(families)} fits the observations")
+        return fits[0][1]
+
+    def format(self):
+        lines = [f"{self.count:,} observations, {len(self.counts):,} distinct values"]
+        if self.numeric:
+            s = self.stats
+            lines.append(f"mean {s.mean:.6g}, std {s.std:.6g}, min {s.min:g}, max {s.max:g}")
+            for aic, distribution in self.compare():
+                lines.append(f"  AIC {aic:14.2f}  {distribution}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"DistributionFit(count={self.count}, values={len(self.counts)}, resolution={self.resolution!r})"
+
+
+# ==================== FILES ====================
+def _add(fits, values, groups, resolution, max_values):
+    if groups is None:
+        fits.setdefault(None, DistributionFit(resolution, max_values)).add(values)
+        return
+    keys, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    if len(keys) > max_values:
+        raise ValueError(f"More than {max_values} groups; is the grouping column right?")
+    grouped = np.split(values[np.argsort(inverse, kind="stable")], np.cumsum(counts)[:-1])
+    for key, group in zip(keys.tolist(), grouped):
+        fits.setdefault(key, DistributionFit(resolution, max_values)).add(group)
+    if len(fits) > max_values:
+        raise ValueError(f"More than {max_values} groups; is the grouping column right?")
+
+
+def _fit_csv(path, columns, start, stop, text, categorical, resolution, max_values, delimiter, chunk_bytes):
+    fits = {}
+    for arrays, _ in csv_chunks(path, columns, start, stop, delimiter, str if text else None, chunk_bytes):
+        values = arrays[0] if categorical or not text else arrays[0].astype(np.float64)
+        _add(fits, values, arrays[1] if len(arrays) > 1 else None, resolution, max_values)
+    return fits
+
+
+def _fit_binary(path, columns, start, stop, resolution, max_values, dtype, offset, chunk_rows):
+    arrays = binary_columns(path, columns, dtype, offset)
+    fits = {}
+    for lo in range(start, stop, chunk_rows):
+        hi = min(lo + chunk_rows, stop)
+        _add(fits, np.asarray(arrays[0][lo:hi]), np.asarray(arrays[1][lo:hi]) if len(arrays) > 1 else None,
+             resolution, max_values)
+    return fits
+
+
+def fit_file(path, column, by=None, resolution=1, categorical=False, workers=None, max_values=MAX_VALUES,
+             delimiter=",", header=True, chunk_bytes=CHUNK_BYTES, dtype=BINARY_DTYPE, offset=0,
+             chunk_rows=CHUNK_ROWS):
+    """Fit ``column`` of a CSV (``.csv``, ``.txt``), ``.npy`` or raw binary file in one pass.
+
+    The file is cut into ranges of whole lines (or records) fitted by
+    ``workers`` processes (one per CPU by default) and merged.  Columns are
+    named as for :class:`~simulation_engine.traces.Trace`.  With ``by``, the
+    result maps every value of that column to the fit of the rows that have
+    it, e.g. one demand fit per newsday type; otherwise it is one
+    :class:`DistributionFit`.  ``categorical`` counts text values such as
+    the newsday types themselves.
+    """
+    require_numpy()
+    columns = (column,) if by is None else (column, by)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if str(path).lower().endswith((".csv", ".txt")):
+        indices, start = csv_layout(path, columns, delimiter, header)
+        bounds = split_lines(path, start, workers * 4)
+        text = categorical or by is not None
+        jobs = [(path, indices, lo, hi, text, categorical, resolution, max_values, delimiter, chunk_bytes)
+                for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+        function = _fit_csv
+    else:
+        length = len(binary_columns(path, columns, dtype, offset)[0])
+        jobs = [(path, columns, lo, hi, resolution, max_values, dtype, offset, chunk_rows)
+                for lo, hi in _chunks(length, workers * 4) if lo < hi]
+        function = _fit_binary
+
+    if workers == 1 or len(jobs) <= 1:
+        parts = [function(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            parts = list(executor.map(function, *zip(*jobs)))
+
+    fits = {}
+    for part in parts:
+        for key, fit in part.items():
+            if key in fits:
+                fits[key].merge(fit)
+            else:
+                fits[key] = fit
+    if by is not None:
+        return fits
+    if None not in fits:
+        raise ValueError(f"{path} has no observations")
+    return fits[None]
@@ -0,0 +1,141 @@
+"""Opt-in timers and counters for simulation runs.
+
+An :class:`Instrumentation` records where the time of one run goes: the
+model itself, the random draws inside it, formatting rows for display and
+inserting them into a table.  Nothing is measured unless a run goes through
+:meth:`Instrumentation.run`, so ordinary runs pay nothing for it.
+"""
+import cProfile
+import json
+import time
+
+from .results import ModelStream
+from .streams import as_streams
+
+
+class _CountingRandom:
+    """Generator proxy that counts and times ``randint`` and ``random`` calls."""
+
+    def __init__(self, rng, instrumentation):
+        self._rng = rng
+        self._instrumentation = instrumentation
+
+    def randint(self, a, b):
+        start = time.perf_counter()
+        value = self._rng.randint(a, b)
+        self._instrumentation.draw(time.perf_counter() - start)
+        return value
+
+    def random(self):
+        start = time.perf_counter()
+        value = self._rng.random()
+        self._instrumentation.draw(time.perf_counter() - start)
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self._rng, name)
+
+
+class _CountingStreams:
+    """Streams whose generators are wrapped in :class:`_CountingRandom`."""
+
+    def __init__(self, streams, instrumentation):
+        self.shared = streams.shared
+        self._streams = streams
+        self._instrumentation = instrumentation
+        self._proxies = {}
+        if self.shared:
+            # Bulk draws (vectorized runs) use the raw generator and are not counted.
+            self.rng = streams.rng
+
+    def stream(self, name):
+        rng = self._streams.stream(name)
+        proxy = self._proxies.get(id(rng))
+        if proxy is None:
+            proxy = self._proxies[id(rng)] = _CountingRandom(rng, self._instrumentation)
+        return proxy
+
+
+class Instrumentation:
+    """Per-phase timers (seconds) and counters of one run.
+
+    Timers: ``simulate`` (the whole model run), ``rng`` (inside random draws),
+    ``format`` and ``ui_insert`` (filled in by the table showing the rows).
+    Counters: ``rng_draws``, ``rows_emitted``, ``events_processed`` (event
+    scheduling, one row per event) and ``ui_refreshes``.  With ``profile`` the
+    model run is also recorded by cProfile; see :meth:`dump_profile`.
+    """
+
+    def __init__(self, profile=False):
+        self.model = None
+        self.timers = {}
+        self.counters = {}
+        self.profiler = cProfile.Profile() if profile else None
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def draw(self, seconds):
+        self.counters["rng_draws"] = self.counters.get("rng_draws", 0) + 1
+        self.timers["rng"] = self.timers.get("rng", 0.0) + seconds
+
+    def run(self, func, rows=None, **kwargs):
+        """Call ``func(**kwargs)`` (a model or ``*_stream`` function) with instrumented streams.
+
+        A ModelStream is drained into ``rows`` like :meth:`ModelStream.run`.
+        """
+        kwargs["rng"] = _CountingStreams(as_streams(kwargs.get("rng")), self)
+        if self.profiler is not None:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            result = func(**kwargs)
+            if isinstance(result, ModelStream):
+                result = result.run(rows=rows)
+        finally:
+            self.add_time("simulate", time.perf_counter() - start)
+            if self.profiler is not None:
+                self.profiler.disable()
+        self.model = result.model
+        self.count("rows_emitted", len(result.rows))
+        if result.model == "event_scheduling":
+            self.count("events_processed", len(result.rows))
+        return result
+
+    def as_dict(self):
+        simulate = self.timers.get("simulate", 0.0)
+        rows = self.counters.get("rows_emitted", 0)
+        return {
+            "model": self.model,
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+            "rows_per_s": rows / simulate if simulate else None,
+            "rng_share": self.timers.get("rng", 0.0) / simulate if simulate else None,
+        }
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def dump_profile(self, path):
+        """Write the cProfile data, readable with ``pstats`` or snakeviz."""
+        if self.profiler is None:
+            raise RuntimeError("This run was not profiled")
+        self.profiler.dump_stats(path)
+
+    def summary(self):
+        t = self.timers
+        c = self.counters
+        parts = [f"{c.get('rows_emitted', 0):,} rows", f"{c.get('rng_draws', 0):,} draws",
+                 f"sim {t.get('simulate', 0.0):.3f}s (rng {t.get('rng', 0.0):.3f}s)"]
+        if "format" in t:
+            parts.append(f"format {t['format']:.3f}s")
+        if "ui_insert" in t:
+            parts.append(f"UI {t['ui_insert']:.3f}s / {c.get('ui_refreshes', 0)} refreshes")
+        return " | ".join(parts)
+
+    def __repr__(self):
+        return f"Instrumentation({self.summary()})"
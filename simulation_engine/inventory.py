@@ -0,0 +1,134 @@
+"""Periodic-review (M, N) inventory model."""
+from .distributions import EmpiricalDistribution, digit_table
+from .progress import PROGRESS_INTERVAL
+from .results import Column, ModelStream
+from .streams import as_streams
+
+
+# Cells with nothing to report hold BLANK (0 for Cycle and Shortage, which
+# are never 0 when shown) and are displayed empty.
+BLANK = -1
+
+MN_INVENTORY_SCHEMA = (
+    Column("Cycle", "i8", blank=0), Column("Day", "i8"), Column("BeginInv", "i8"), Column("RndDem", "u1"),
+    Column("Demand", "i8"), Column("EndInv", "i8"), Column("Shortage", "i8", blank=0),
+    Column("OrderQty", "i8", blank=BLANK), Column("RndLead", "i1", blank=BLANK),
+    Column("DaysUntil", "i8", blank=BLANK),
+)
+MN_INVENTORY_COLUMNS = tuple(column.name for column in MN_INVENTORY_SCHEMA)
+
+
+DEMAND_DISTRIBUTION = EmpiricalDistribution.from_ranges(
+    [(0, 1, 33), (1, 34, 58), (2, 59, 78), (3, 79, 90), (4, 91, 100)], 1, 100)
+LEAD_TIME_DISTRIBUTION = EmpiricalDistribution.from_ranges([(1, 1, 30), (2, 31, 80), (3, 81, 100)], 1, 100)
+
+
+def get_demand(rnd):
+    return DEMAND_DISTRIBUTION.table[rnd]
+
+
+def get_lead_time(rnd):
+    return LEAD_TIME_DISTRIBUTION.table[rnd]
+
+
+def mn_inventory_simulation(initial_inv, cycle_length, reorder_point, order_quantity, num_days, rng=None,
+                            progress=None, keep_rows=True, demand=None, lead_time=None):
+    return mn_inventory_stream(initial_inv, cycle_length, reorder_point, order_quantity, num_days,
+                               rng, progress, demand, lead_time).run(keep_rows)
+
+
+def mn_inventory_stream(initial_inv, cycle_length, reorder_point, order_quantity, num_days, rng=None,
+                        progress=None, demand=None, lead_time=None):
+    """``demand`` and ``lead_time`` replace the daily demand and lead-time (days) tables."""
+    if cycle_length < 1 or num_days < 1:
+        raise ValueError("cycle_length and num_days must be at least 1")
+    if min(initial_inv, reorder_point, order_quantity) < 0:
+        raise ValueError("initial_inv, reorder_point and order_quantity must not be negative")
+    rows = _mn_inventory_rows(initial_inv, cycle_length, reorder_point, order_quantity, num_days,
+                              demand or DEMAND_DISTRIBUTION, lead_time or LEAD_TIME_DISTRIBUTION, rng, progress)
+    return ModelStream("mn_inventory", MN_INVENTORY_SCHEMA, rows, mn_inventory_performance)
+
+
+def _mn_inventory_rows(initial_inv, cycle_length, reorder_point, order_quantity, num_days, demand_distribution,
+                       lead_time_distribution, rng, progress):
+    streams = as_streams(rng)
+    demand_rng = streams.stream("demand")
+    lead_time_rng = streams.stream("lead_time")
+    demand_table, demand_low, demand_high = digit_table(demand_distribution, "demand")
+    lead_time_table, lead_time_low, lead_time_high = digit_table(lead_time_distribution, "lead_time")
+
+    current_inventory_pos = initial_inv
+    order_arrival_day = -1
+    order_amount_coming = 0
+    total_end_inv = 0
+    days_with_shortage = 0
+
+    for day in range(1, num_days + 1):
+        if progress is not None and day % PROGRESS_INTERVAL == 0:
+            progress(day, num_days)
+        cycle_num = ((day - 1) // cycle_length) + 1
+        day_in_cycle = day % cycle_length
+        if day_in_cycle == 0:
+            day_in_cycle = cycle_length
+
+        if day == order_arrival_day:
+            current_inventory_pos += order_amount_coming
+            order_arrival_day = -1
+
+        begin_inv_display = max(0, current_inventory_pos)
+
+        rnd_dem = demand_rng.randint(demand_low, demand_high)
+        demand = demand_table[rnd_dem]
+
+        current_inventory_pos -= demand
+
+        if current_inventory_pos >= 0:
+            end_inv_display = current_inventory_pos
+            shortage_display = 0
+        else:
+            end_inv_display = 0
+            shortage_display = abs(current_inventory_pos)
+            days_with_shortage += 1
+        total_end_inv += end_inv_display
+
+        is_review_day = (day % cycle_length == 0)
+
+        order_placed = BLANK
+        rnd_lead = BLANK
+        days_until = BLANK
+
+        if order_arrival_day != -1:
+            days_until = max(0, order_arrival_day - day - 1)
+
+        if is_review_day:
+            if current_inventory_pos <= reorder_point and order_arrival_day == -1:
+                rnd_lead = lead_time_rng.randint(lead_time_low, lead_time_high)
+                lead_time = lead_time_table[rnd_lead]
+                order_amount_coming = order_quantity
+                order_arrival_day = day + lead_time + 1
+                order_placed = order_quantity
+                days_until = lead_time
+
+        yield (
+            cycle_num if day_in_cycle == 1 else 0,
+            day_in_cycle,
+            begin_inv_display,
+            rnd_dem,
+            demand,
+            end_inv_display,
+            shortage_display,
+            order_placed,
+            rnd_lead,
+            days_until
+        )
+
+    return {
+        "avg_end_inv": total_end_inv / num_days,
+        "days_with_shortage": days_with_shortage,
+        "shortage_percent": (days_with_shortage / num_days) * 100,
+    }
+
+
+def mn_inventory_performance(m):
+    return f"""Average Ending Inventory: {m['avg_end_inv']:.2f} units
+Shortage Condition Existed: {m['days_with_shortage']} days ({m['shortage_percent']:.1f}%)"""
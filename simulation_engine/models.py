@@ -0,0 +1,59 @@
+"""Registry of the engine's models, looked up by name."""
+from functools import partial
+
+from .event_scheduling import EVENT_SCHEDULING_SCHEMA, event_scheduling_simulation, event_scheduling_stream
+from .inventory import MN_INVENTORY_SCHEMA, mn_inventory_simulation, mn_inventory_stream
+from .newspaper import NEWSPAPER_SCHEMA, newspaper_simulation, newspaper_stream
+from .queueing import (DOUBLE_SERVER_SCHEMA, MULTI_SERVER_SCHEMA, SINGLE_SERVER_SCHEMA,
+                       double_server_simulation, double_server_stream, multi_server_simulation,
+                       multi_server_stream, single_server_simulation, single_server_stream)
+from .results import display_row
+
+
+MODELS = {
+    "double_server": double_server_simulation,
+    "single_server": single_server_simulation,
+    "event_scheduling": event_scheduling_simulation,
+    "mn_inventory": mn_inventory_simulation,
+    "newspaper": newspaper_simulation,
+    "multi_server": multi_server_simulation,
+}
+
+STREAMS = {
+    "double_server": double_server_stream,
+    "single_server": single_server_stream,
+    "event_scheduling": event_scheduling_stream,
+    "mn_inventory": mn_inventory_stream,
+    "newspaper": newspaper_stream,
+    "multi_server": multi_server_stream,
+}
+
+SCHEMAS = {
+    "double_server": DOUBLE_SERVER_SCHEMA,
+    "single_server": SINGLE_SERVER_SCHEMA,
+    "event_scheduling": EVENT_SCHEDULING_SCHEMA,
+    "mn_inventory": MN_INVENTORY_SCHEMA,
+    "newspaper": NEWSPAPER_SCHEMA,
+    "multi_server": MULTI_SERVER_SCHEMA,
+}
+
+
+def get_model(model):
+    try:
+        return MODELS[model]
+    except KeyError:
+        raise ValueError(f"Unknown model {model!r}; expected one of {', '.join(MODELS)}") from None
+
+
+def run_model(model, **params):
+    return get_model(model)(**params)
+
+
+def get_schema(model):
+    get_model(model)
+    return SCHEMAS[model]
+
+
+def row_formatter(model):
+    """Function turning a row of ``model`` into its display texts."""
+    return partial(display_row, get_schema(model))
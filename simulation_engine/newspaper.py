@@ -0,0 +1,144 @@
+"""Newsvendor model with Good/Fair/Poor newsdays."""
+from functools import partial
+
+from .distributions import EmpiricalDistribution, digit_table
+from .progress import PROGRESS_INTERVAL
+from .results import Column, ModelStream
+from .streams import as_streams
+
+
+NEWSPAPER_SCHEMA = (
+    Column("Day", "i8"), Column("RndType", "u1"), Column("Type", "U4"), Column("RndDem", "u1"),
+    Column("Dem", "i8"), Column("Revenue", "f8", ".2f"), Column("LostProf", "f8", ".2f"),
+    Column("Salvage", "f8", ".2f"), Column("Profit", "f8", ".2f"),
+)
+NEWSPAPER_COLUMNS = tuple(column.name for column in NEWSPAPER_SCHEMA)
+
+COST_PER_PAPER = 0.33
+SELLING_PRICE = 0.50
+SALVAGE_VALUE = 0.05
+LOST_PROFIT_PER_UNIT = SELLING_PRICE - COST_PER_PAPER
+
+
+NEWSDAY_DISTRIBUTION = EmpiricalDistribution.from_ranges(
+    [("Good", 1, 35), ("Fair", 36, 80), ("Poor", 81, 100)], 1, 100)
+DEMAND_DISTRIBUTIONS = {
+    "Good": EmpiricalDistribution.from_ranges(
+        [(40, 1, 3), (50, 4, 8), (60, 9, 23), (70, 24, 43), (80, 44, 78), (90, 79, 93), (100, 94, 100)], 1, 100),
+    "Fair": EmpiricalDistribution.from_ranges(
+        [(40, 1, 10), (50, 11, 28), (60, 29, 68), (70, 69, 88), (80, 89, 96), (90, 97, 100)], 1, 100),
+    "Poor": EmpiricalDistribution.from_ranges(
+        [(40, 1, 44), (50, 45, 66), (60, 67, 82), (70, 83, 94), (80, 95, 100)], 1, 100),
+}
+
+
+def get_newsday_type(rnd):
+    return NEWSDAY_DISTRIBUTION.table[rnd]
+
+
+def get_demand(newsday_type, rnd):
+    return DEMAND_DISTRIBUTIONS[newsday_type].table[rnd]
+
+
+def newspaper_day(num_papers, demand, daily_cost=None):
+    """Revenue, lost profit, salvage and profit of one day with ``num_papers`` bought."""
+    if daily_cost is None:
+        daily_cost = num_papers * COST_PER_PAPER
+    units_sold = min(demand, num_papers)
+    revenue = units_sold * SELLING_PRICE
+
+    if demand > num_papers:
+        excess_demand = demand - num_papers
+        lost_profit = excess_demand * LOST_PROFIT_PER_UNIT
+    else:
+        lost_profit = 0.0
+
+    if num_papers > demand:
+        unsold = num_papers - demand
+        salvage = unsold * SALVAGE_VALUE
+    else:
+        salvage = 0.0
+
+    daily_profit = revenue - daily_cost - lost_profit + salvage
+    return revenue, lost_profit, salvage, daily_profit
+
+
+def newspaper_simulation(num_papers, num_days, rng=None, progress=None, keep_rows=True, newsday=None, demand=None):
+    return newspaper_stream(num_papers, num_days, rng, progress, newsday, demand).run(keep_rows)
+
+
+def newspaper_stream(num_papers, num_days, rng=None, progress=None, newsday=None, demand=None):
+    """``newsday`` replaces the newsday-type table and ``demand`` the demand tables.
+
+    ``demand`` maps every newsday type to a distribution, or is one
+    distribution used whatever the type.
+    """
+    if num_papers < 0:
+        raise ValueError("num_papers must not be negative")
+    if num_days < 1:
+        raise ValueError("num_days must be at least 1")
+    newsday = newsday or NEWSDAY_DISTRIBUTION
+    if demand is None:
+        demand = DEMAND_DISTRIBUTIONS
+    elif not isinstance(demand, dict):
+        demand = {day_type: demand for day_type in newsday.values}
+    missing = [day_type for day_type in newsday.values if day_type not in demand]
+    if missing:
+        raise ValueError(f"No demand distribution for newsday types {', '.join(map(str, missing))}")
+    return ModelStream("newspaper", NEWSPAPER_SCHEMA,
+                       _newspaper_rows(num_papers, num_days, newsday, demand, rng, progress),
+                       partial(newspaper_performance, num_papers=num_papers, num_days=num_days))
+
+
+def _newspaper_rows(num_papers, num_days, newsday, demand_distributions, rng, progress):
+    streams = as_streams(rng)
+    newsday_rng = streams.stream("newsday")
+    demand_rng = streams.stream("demand")
+    newsday_table, newsday_low, newsday_high = digit_table(newsday, "newsday")
+    demand_tables = {day_type: digit_table(dist, f"{day_type} demand")
+                     for day_type, dist in demand_distributions.items()}
+
+    daily_cost = num_papers * COST_PER_PAPER
+
+    total_revenue = 0.0
+    total_lost_profit = 0.0
+    total_salvage = 0.0
+    total_daily_profit = 0.0
+
+    for day in range(1, num_days + 1):
+        if progress is not None and day % PROGRESS_INTERVAL == 0:
+            progress(day, num_days)
+        rnd_type = newsday_rng.randint(newsday_low, newsday_high)
+        day_type = newsday_table[rnd_type]
+
+        demand_table, demand_low, demand_high = demand_tables[day_type]
+        rnd_dem = demand_rng.randint(demand_low, demand_high)
+        demand = demand_table[rnd_dem]
+
+        revenue, lost_profit, salvage, daily_profit = newspaper_day(num_papers, demand, daily_cost)
+
+        total_revenue += revenue
+        total_lost_profit += lost_profit
+        total_salvage += salvage
+        total_daily_profit += daily_profit
+
+        yield (
+            day, rnd_type, day_type, rnd_dem, demand,
+            revenue, lost_profit, salvage, daily_profit
+        )
+
+    return {
+        "total_revenue": total_revenue,
+        "total_cost": daily_cost * num_days,
+        "total_lost_profit": total_lost_profit,
+        "total_salvage": total_salvage,
+        "net_profit": total_daily_profit,
+    }
+
+
+def newspaper_performance(m, num_papers, num_days):
+    return f"""Total Revenue:       ${m['total_revenue']:.2f}
+Total Cost:          ${m['total_cost']:.2f}  ({num_papers} papers * ${COST_PER_PAPER} * {num_days} days)
+Total Lost Profit:   ${m['total_lost_profit']:.2f}
+Total Salvage:       ${m['total_salvage']:.2f}
+Net Profit:          ${m['net_profit']:.2f}"""
@@ -0,0 +1,79 @@
+"""Constant-memory accumulators for streaming runs."""
+import math
+
+
+class RunningStats:
+    """Count, total, mean, variance, minimum and maximum of a stream of numbers.
+
+    The mean is reported as ``total / count`` so integer-valued measures stay
+    exact; the variance uses Welford's update, which is numerically stable.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "_mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        self.total += x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @classmethod
+    def from_array(cls, values):
+        """Statistics of a NumPy array, computed with array operations."""
+        stats = cls()
+        if len(values):
+            stats.count = len(values)
+            stats.total = values.sum().item()
+            stats.min = values.min().item()
+            stats.max = values.max().item()
+            stats._mean = stats.total / stats.count
+            deviations = values - stats._mean
+            stats._m2 = float(deviations @ deviations)
+        return stats
+
+    def merge(self, other):
+        """Combine with the statistics of another, disjoint stream (Chan et al.)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.total, self.min, self.max = other.count, other.total, other.min, other.max
+            self._mean, self._m2 = other._mean, other._m2
+            return self
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self._mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def __repr__(self):
+        return (f"RunningStats(count={self.count}, mean={self.mean:.6g}, std={self.std:.6g}, "
+                f"min={self.min}, max={self.max})")
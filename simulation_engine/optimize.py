@@ -0,0 +1,214 @@
+"""Searches over model decision variables."""
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import cache_key
+from .newspaper import newspaper_day
+from .replication import _chunks, _run_chunk
+from .stats import MeasureSummary, summarize_measures, t_quantile
+from .vectorized import newspaper_demands, np, require_numpy
+
+
+# ==================== NEWSPAPER ORDER QUANTITY ====================
+class NewspaperSweep:
+    """Expected daily profit of each order quantity over one shared set of demand days."""
+
+    def __init__(self, num_days, summaries):
+        self.num_days = num_days
+        self.summaries = summaries
+
+    @property
+    def quantities(self):
+        return list(self.summaries)
+
+    @property
+    def best(self):
+        """Order quantity with the highest expected profit (the smallest one on ties)."""
+        return max(self.summaries, key=lambda q: (self.summaries[q].mean, -q))
+
+    def format(self):
+        best = self.best
+        lines = [f"newspaper: {len(self.summaries)} order quantities over {self.num_days:,} common demand days",
+                 f"{'Papers':>6}  {'Profit/day':>10}  {'CI':>21}"]
+        for q, s in self.summaries.items():
+            mark = "  <- best" if q == best else ""
+            lines.append(f"{q:>6}  {s.mean:>10.4f}  [{s.low:>9.4f}, {s.high:>9.4f}]{mark}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"NewspaperSweep(quantities={len(self.summaries)}, num_days={self.num_days}, best={self.best})"
+
+
+def newspaper_sweep(quantities, num_days, rng=None, confidence=0.95):
+    """Expected daily profit, with confidence bands, for every order quantity.
+
+    One set of ``num_days`` demands is drawn exactly as ``newspaper_simulation``
+    would draw it from ``rng`` and every quantity is evaluated on it, so the
+    quantities are compared on common random numbers.  Demand only takes a
+    handful of values, so each quantity costs a few operations on the demand
+    histogram rather than a pass over the days.
+    """
+    require_numpy()
+    quantities = sorted(set(quantities))
+    if not quantities:
+        raise ValueError("quantities must not be empty")
+    if num_days < 1:
+        raise ValueError("num_days must be at least 1")
+
+    counts = np.bincount(newspaper_demands(num_days, rng))
+    demands = np.flatnonzero(counts)
+    counts = counts[demands]
+    t = t_quantile(0.5 + confidence / 2, num_days - 1) if num_days > 1 else None
+
+    summaries = {}
+    for q in quantities:
+        profits = np.array([newspaper_day(q, int(d))[3] for d in demands])
+        mean = float(counts @ profits) / num_days
+        if num_days > 1:
+            std = math.sqrt(float(counts @ (profits - mean) ** 2) / (num_days - 1))
+            half_width = t * std / math.sqrt(num_days)
+        else:
+            std, half_width = 0.0, math.inf
+        summaries[q] = MeasureSummary(f"profit_{q}", num_days, mean, std, half_width, confidence)
+    return NewspaperSweep(num_days, summaries)
+
+
+# ==================== M-N INVENTORY POLICY ====================
+POLICY_PARAMS = ("reorder_point", "cycle_length", "order_quantity")
+POLICY_BOUNDS = ((0, math.inf), (1, math.inf), (1, math.inf))
+
+
+def _evaluate_policies(base_params, policies, replications, seed):
+    """Replication samples of each policy; every policy reuses the same streams."""
+    samples = []
+    for policy in policies:
+        params = dict(base_params, **dict(zip(POLICY_PARAMS, policy)))
+        samples.append(_run_chunk("mn_inventory", params, seed, 0, replications))
+    return samples
+
+
+def pareto_front(points):
+    """Points not dominated in (avg_end_inv, shortage_percent), both minimized.
+
+    ``points`` maps policies to measure summaries; the front is returned in
+    increasing average inventory (so decreasing shortage).
+    """
+    ordered = sorted(points.items(), key=lambda item: (item[1]["avg_end_inv"].mean,
+                                                       item[1]["shortage_percent"].mean))
+    front = []
+    best_shortage = math.inf
+    for policy, summaries in ordered:
+        shortage = summaries["shortage_percent"].mean
+        if shortage < best_shortage:
+            front.append(policy)
+            best_shortage = shortage
+    return front
+
+
+class InventoryPolicySearch:
+    """Search over (reorder_point, cycle_length, order_quantity) for the M-N inventory model.
+
+    Every policy is run for the same ``replications`` with the streams of
+    ``replication_streams(seed, i)``, so all policies see the same demands
+    and lead-time digits.  Evaluated policies are cached in ``results`` and
+    never run twice, whether they come from a grid or from ``refine``; with a
+    ``cache`` they are also shared with earlier searches and
+    ``run_replications`` calls of the same seed.
+    """
+
+    def __init__(self, replications, seed=None, workers=None, confidence=0.95, initial_inv=12, num_days=28,
+                 cache=None):
+        if replications < 1:
+            raise ValueError("replications must be at least 1")
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.replications = replications
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.confidence = confidence
+        self.base_params = {"initial_inv": initial_inv, "num_days": num_days}
+        self.cache = cache
+        self.results = {}
+
+    def _cache_key(self, policy):
+        params = dict(self.base_params, **dict(zip(POLICY_PARAMS, policy)))
+        # The same entry collect_samples uses for these replications
+        return cache_key("mn_inventory", params, self.seed, kind="replications", antithetic=False)
+
+    def evaluate(self, policies):
+        """Evaluate the not yet evaluated ``policies``; returns how many were run."""
+        todo = []
+        for policy in policies:
+            policy = tuple(int(value) for value in policy)
+            if policy[1] < 1:
+                raise ValueError("cycle_length must be at least 1")
+            if policy not in self.results and policy not in todo:
+                todo.append(policy)
+        if self.cache is not None:
+            for policy in list(todo):
+                samples = self.cache.get(self._cache_key(policy))
+                if samples is not None and len(samples) >= self.replications:
+                    self.results[policy] = summarize_measures(samples[:self.replications], self.confidence)
+                    todo.remove(policy)
+        if not todo:
+            return 0
+
+        workers = min(self.workers, len(todo))
+        if workers == 1:
+            samples = _evaluate_policies(self.base_params, todo, self.replications, self.seed)
+        else:
+            samples = []
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_evaluate_policies, self.base_params, todo[start:stop],
+                                           self.replications, self.seed)
+                           for start, stop in _chunks(len(todo), workers * 4)]
+                for future in futures:
+                    samples.extend(future.result())
+        for policy, policy_samples in zip(todo, samples):
+            self.results[policy] = summarize_measures(policy_samples, self.confidence)
+            if self.cache is not None:
+                self.cache.put(self._cache_key(policy), policy_samples)
+        return len(todo)
+
+    def grid(self, reorder_points, cycle_lengths, order_quantities):
+        return self.evaluate(itertools.product(reorder_points, cycle_lengths, order_quantities))
+
+    def refine(self, step=1, max_rounds=20, bounds=POLICY_BOUNDS):
+        """Evaluate the neighbours of the Pareto front until the front stops changing.
+
+        Each round tries every policy one ``step`` away in each parameter from a
+        front policy, within the inclusive ``(low, high)`` ``bounds`` of each
+        parameter; already evaluated neighbours come from the cache.
+        """
+        for _ in range(max_rounds):
+            neighbours = []
+            for policy in self.pareto_front():
+                for i in range(len(POLICY_PARAMS)):
+                    for delta in (-step, step):
+                        candidate = list(policy)
+                        candidate[i] += delta
+                        low, high = bounds[i]
+                        if low <= candidate[i] <= high:
+                            neighbours.append(tuple(candidate))
+            if not self.evaluate(neighbours):
+                break
+
+    def pareto_front(self):
+        return pareto_front(self.results)
+
+    def format(self):
+        lines = [f"mn_inventory: {len(self.results)} policies x {self.replications} replications (seed {self.seed})",
+                 "Pareto front (average ending inventory vs. shortage days):",
+                 f"{'Reorder':>7} {'Cycle':>5} {'Qty':>5}  {'AvgEndInv':>20}  {'Shortage %':>20}"]
+        for policy in self.pareto_front():
+            inv = self.results[policy]["avg_end_inv"]
+            short = self.results[policy]["shortage_percent"]
+            lines.append(f"{policy[0]:>7} {policy[1]:>5} {policy[2]:>5}  "
+                         f"{inv.mean:>10.3f} ± {inv.half_width:<7.3f}  {short.mean:>10.3f} ± {short.half_width:.3f}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"InventoryPolicySearch(policies={len(self.results)}, replications={self.replications}, seed={self.seed})"
@@ -0,0 +1,12 @@
+"""Progress reporting and cancellation for long runs.
+
+Every model accepts an optional ``progress(done, total)`` callback that is
+called every ``PROGRESS_INTERVAL`` entities (customers, events or days).  A
+callback cancels the run by raising :class:`SimulationCancelled`.
+"""
+
+PROGRESS_INTERVAL = 1000
+
+
+class SimulationCancelled(Exception):
+    """Raised from a progress callback to abandon the run in progress."""
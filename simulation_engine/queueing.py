@@ -0,0 +1,430 @@
+"""Single-, double- and multi-server queueing models."""
+import heapq
+
+from .distributions import EmpiricalDistribution, digit_table, has_fractions
+from .progress import PROGRESS_INTERVAL
+from .online import RunningStats
+from .results import Column, ModelStream
+from .streams import as_streams
+from .traces import as_trace
+
+
+DOUBLE_SERVER_SCHEMA = (
+    Column("Cust", "i8"), Column("RandArr", "u1"), Column("InterArr", "i8"), Column("Arrive", "i8"),
+    Column("RandServ", "u1"), Column("S1Time", "i8"), Column("S1Begin", "i8"), Column("S1End", "i8"),
+    Column("S2Time", "i8"), Column("S2Begin", "i8"), Column("S2End", "i8"), Column("Wait", "i8"),
+    Column("SysTime", "i8"),
+)
+SINGLE_SERVER_SCHEMA = (
+    Column("Cust", "i8"), Column("RandArr", "u1"), Column("InterArr", "i8"), Column("Arrive", "i8"),
+    Column("RandServ", "u1"), Column("ServTime", "i8"), Column("Start", "i8"), Column("Wait", "i8"),
+    Column("End", "i8"), Column("Idle", "i8"), Column("InSystem", "i8"),
+)
+# Digit columns hold -1 for inputs sampled without random digits.
+MULTI_SERVER_SCHEMA = (
+    Column("Cust", "i8"), Column("RandArr", "i2", blank=-1), Column("InterArr", "i8"), Column("Arrive", "i8"),
+    Column("RandServ", "i2", blank=-1), Column("Server", "i4"), Column("ServTime", "i8"), Column("Start", "i8"),
+    Column("Wait", "i8"), Column("End", "i8"), Column("InSystem", "i8"),
+)
+DOUBLE_SERVER_COLUMNS = tuple(column.name for column in DOUBLE_SERVER_SCHEMA)
+SINGLE_SERVER_COLUMNS = tuple(column.name for column in SINGLE_SERVER_SCHEMA)
+MULTI_SERVER_COLUMNS = tuple(column.name for column in MULTI_SERVER_SCHEMA)
+
+ARRIVAL_RANGES = [(5, 0, 29), (10, 30, 69), (15, 70, 89), (20, 90, 99)]
+SERVICE_RANGES = [(15, 0, 24), (20, 25, 64), (30, 65, 89), (45, 90, 99)]
+SERVICE_RANGES_SERVER1 = SERVICE_RANGES
+SERVICE_RANGES_SERVER2 = [(10, 0, 19), (15, 20, 59), (25, 60, 89), (35, 90, 99)]
+
+ARRIVAL_DISTRIBUTION = EmpiricalDistribution.from_ranges(ARRIVAL_RANGES)
+SERVICE_DISTRIBUTION = EmpiricalDistribution.from_ranges(SERVICE_RANGES)
+SERVICE_DISTRIBUTION_SERVER1 = SERVICE_DISTRIBUTION
+SERVICE_DISTRIBUTION_SERVER2 = EmpiricalDistribution.from_ranges(SERVICE_RANGES_SERVER2)
+
+
+# ==================== MULTI SERVER SIMULATION ====================
+def _serve(num_customers, arrival, services, rng, progress, busy):
+    """Customers of one FIFO queue in front of ``len(services)`` servers.
+
+    Yields ``(customer, arrival digit, interarrival, arrival, service digit,
+    server, service time, start, end)`` per customer and adds each service
+    time to ``busy[server]``.  A customer takes the server that frees up first
+    (the lowest index on ties), which sits on top of a heap of
+    ``(free time, server)`` pairs, so choosing and updating it is O(log c).
+    """
+    streams = as_streams(rng)
+    arrival_rng = streams.stream("arrival")
+    service_rng = streams.stream("service")
+
+    free = [(0, server) for server in range(len(services))]
+    clock = 0
+    for i in range(num_customers):
+        if progress is not None and i and i % PROGRESS_INTERVAL == 0:
+            progress(i, num_customers)
+        rnd_arr, inter = arrival.draw(arrival_rng)
+        if i == 0:
+            inter = 0
+        clock += inter
+
+        free_time, server = free[0]
+        rnd_serv, serv_time = services[server].draw(service_rng)
+        start = max(clock, free_time)
+        end = start + serv_time
+        heapq.heapreplace(free, (end, server))
+        busy[server] += serv_time
+        yield i + 1, rnd_arr, inter, clock, rnd_serv, server, serv_time, start, end
+
+
+def multi_server_simulation(num_customers=None, servers=2, service=None, arrival=None, rng=None, progress=None,
+                            keep_rows=True, trace=None):
+    return multi_server_stream(num_customers, servers, service, arrival, rng, progress, trace).run(keep_rows)
+
+
+def multi_server_stream(num_customers=None, servers=2, service=None, arrival=None, rng=None, progress=None,
+                        trace=None):
+    """A FIFO queue with ``servers`` parallel servers.
+
+    ``service`` is one EmpiricalDistribution shared by all servers or a list
+    with one per server (default: the single-server service table), and
+    ``arrival`` the interarrival distribution (default: the shared arrival
+    table).  With a :class:`~simulation_engine.traces.Trace` the recorded
+    customers are replayed instead, at most ``num_customers`` of them.
+    """
+    _check_customers(num_customers, trace, "num_customers")
+    if servers < 1:
+        raise ValueError("servers must be at least 1")
+    busy = [0] * servers
+    if trace is not None:
+        customers = _serve_trace(trace, num_customers, servers, progress, busy)
+        return ModelStream("multi_server", _trace_schema(MULTI_SERVER_SCHEMA), _multi_server_rows(customers, busy),
+                           multi_server_performance)
+    if service is None:
+        service = SERVICE_DISTRIBUTION
+    services = list(service) if isinstance(service, (list, tuple)) else [service] * servers
+    if len(services) != servers:
+        raise ValueError(f"Expected {servers} service distributions, got {len(services)}")
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    customers = _serve(num_customers, arrival, services, rng, progress, busy)
+    return ModelStream("multi_server", _drawn_schema(MULTI_SERVER_SCHEMA, arrival, *services),
+                       _multi_server_rows(customers, busy), multi_server_performance)
+
+
+def _multi_server_rows(customers, busy):
+    waits = RunningStats()
+    in_system = RunningStats()
+    num_waited = 0
+    total_time_horizon = 0
+
+    for cust, rnd_arr, inter, arrival_time, rnd_serv, server, serv_time, start, end in customers:
+        wait = start - arrival_time
+        if wait > 0:
+            num_waited += 1
+        waits.add(wait)
+        in_system.add(end - arrival_time)
+        total_time_horizon = max(total_time_horizon, end)
+        yield (cust, rnd_arr, inter, arrival_time, rnd_serv, server + 1, serv_time, start, wait, end,
+               end - arrival_time)
+
+    num_customers = waits.count
+    total_service = sum(busy)
+    return {
+        "servers": len(busy),
+        "total_time_horizon": total_time_horizon,
+        "avg_wait": waits.mean,
+        "prob_wait": num_waited / num_customers,
+        "max_wait": waits.max,
+        "wait_std": waits.std,
+        "server_utilization": [time / total_time_horizon for time in busy],
+        "system_utilization": total_service / (len(busy) * total_time_horizon),
+        "avg_service": total_service / num_customers,
+        "avg_in_system": in_system.mean,
+    }
+
+
+def multi_server_performance(m):
+    servers = "\n".join(f"  Server {k}: {u:.2f}" for k, u in enumerate(m["server_utilization"], 1))
+    return f"""Total Time Horizon (max end time): {m['total_time_horizon']} minutes
+Average waiting time: {m['avg_wait']:.2f} minutes
+Probability a customer waits: {m['prob_wait']:.2f}
+Maximum waiting time: {m['max_wait']} minutes
+
+Server Utilization:
+{servers}
+  System Utilization ({m['servers']} servers): {m['system_utilization']:.2f}
+
+Average service time (across all servers): {m['avg_service']:.2f} minutes
+Average time in system: {m['avg_in_system']:.2f} minutes"""
+
+
+# ==================== TRACE-DRIVEN INPUTS ====================
+def _check_customers(num_customers, trace, name):
+    if num_customers is None:
+        if trace is None:
+            raise ValueError(f"{name} is required unless a trace is given")
+    elif num_customers < 1:
+        raise ValueError(f"{name} must be at least 1")
+
+
+def _float_schema(schema):
+    """``schema`` with its time columns stored as floats."""
+    return tuple(Column(column.name, "f8", "g") if column.dtype == "i8" and column.name != "Cust" else column
+                 for column in schema)
+
+
+def _drawn_schema(schema, *distributions):
+    """``schema`` for rows drawn from ``distributions``: float times if any of them has fractional values."""
+    return _float_schema(schema) if has_fractions(*distributions) else schema
+
+
+def _trace_schema(schema):
+    """``schema`` for replayed rows: times are floats and the digit columns are blank."""
+    return tuple(Column(column.name, "i2", blank=-1) if column.name in ("RandArr", "RandServ") else column
+                 for column in _float_schema(schema))
+
+
+def _serve_trace(trace, limit, servers, progress, busy):
+    """Customers of a :class:`~simulation_engine.traces.Trace` at ``servers`` FIFO servers.
+
+    Yields the same tuples as :func:`_serve`, with -1 for both digits, for at
+    most ``limit`` customers (all of them if ``limit`` is None).
+    """
+    trace = as_trace(trace)
+    free = [(0.0, server) for server in range(servers)]
+    previous = 0.0
+    cust = 0
+    for arrivals, services in trace.chunks(limit):
+        for arrival, serv_time in zip(arrivals.tolist(), services.tolist()):
+            if progress is not None and cust and cust % PROGRESS_INTERVAL == 0:
+                progress(cust, trace.expected_length(limit))
+            free_time, server = free[0]
+            start = max(arrival, free_time)
+            end = start + serv_time
+            heapq.heapreplace(free, (end, server))
+            busy[server] += serv_time
+            cust += 1
+            yield cust, -1, arrival - previous, arrival, -1, server, serv_time, start, end
+            previous = arrival
+    if not cust:
+        raise ValueError(f"{trace.name} has no customers")
+
+
+# ==================== DOUBLE SERVER SIMULATION ====================
+def double_server_simulation(num_applicants=None, rng=None, progress=None, keep_rows=True, trace=None,
+                             arrival=None, service=None):
+    return double_server_stream(num_applicants, rng, progress, trace, arrival, service).run(keep_rows)
+
+
+def double_server_stream(num_applicants=None, rng=None, progress=None, trace=None, arrival=None, service=None):
+    """Able and Baker; with a ``trace``, at most ``num_applicants`` recorded customers are replayed.
+
+    ``arrival`` replaces the interarrival table and ``service`` the service
+    tables, as one distribution for both servers or a pair (Able, Baker).
+    """
+    _check_customers(num_applicants, trace, "num_applicants")
+    busy = [0, 0]
+    if trace is not None:
+        customers = _serve_trace(trace, num_applicants, 2, progress, busy)
+        return ModelStream("double_server", _trace_schema(DOUBLE_SERVER_SCHEMA),
+                           _double_server_rows(customers, busy), double_server_performance)
+    if service is None:
+        service = (SERVICE_DISTRIBUTION_SERVER1, SERVICE_DISTRIBUTION_SERVER2)
+    services = tuple(service) if isinstance(service, (list, tuple)) else (service, service)
+    if len(services) != 2:
+        raise ValueError(f"Expected 2 service distributions, got {len(services)}")
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    customers = _serve(num_applicants, arrival, services, rng, progress, busy)
+    return ModelStream("double_server", _drawn_schema(DOUBLE_SERVER_SCHEMA, arrival, *services),
+                       _double_server_rows(customers, busy), double_server_performance)
+
+
+def _double_server_rows(customers, busy):
+    waits = RunningStats()
+    in_system = RunningStats()
+    num_waited = 0
+    total_time_horizon = 0
+
+    for cust, rnd_arr, inter, arrival, rnd_serv, server, serv_time, start_time, end_time in customers:
+        if server == 0:
+            server_columns = (serv_time, start_time, end_time, 0, 0, 0)
+        else:
+            server_columns = (0, 0, 0, serv_time, start_time, end_time)
+        wait = start_time - arrival
+        if wait > 0:
+            num_waited += 1
+        waits.add(wait)
+        in_system.add(end_time - arrival)
+        total_time_horizon = max(total_time_horizon, end_time)
+        yield (cust, rnd_arr, inter, arrival, rnd_serv) + server_columns + (wait, end_time - arrival)
+
+    # Calculate performance measures
+    num_applicants = waits.count
+    total_service_time_1, total_service_time_2 = busy
+    total_service_time = total_service_time_1 + total_service_time_2
+    return {
+        "total_time_horizon": total_time_horizon,
+        "avg_wait": waits.mean,
+        "prob_wait": num_waited / num_applicants,
+        "server_utilization_1": total_service_time_1 / total_time_horizon,
+        "server_utilization_2": total_service_time_2 / total_time_horizon,
+        "system_utilization": total_service_time / (2 * total_time_horizon),
+        "prob_server_1_idle": (total_time_horizon - total_service_time_1) / total_time_horizon,
+        "prob_server_2_idle": (total_time_horizon - total_service_time_2) / total_time_horizon,
+        "avg_service": total_service_time / num_applicants,
+        "avg_in_system": in_system.mean,
+        "max_wait": waits.max,
+        "wait_std": waits.std,
+    }
+
+
+def double_server_performance(m):
+    return f"""Total Time Horizon (max end time): {m['total_time_horizon']} minutes
+Average waiting time: {m['avg_wait']:.2f} minutes
+Probability a customer waits: {m['prob_wait']:.2f}
+
+Server Utilization:
+  Server 1 (Able): {m['server_utilization_1']:.2f}
+  Server 2 (Baker): {m['server_utilization_2']:.2f}
+  System Utilization (2 servers): {m['system_utilization']:.2f}
+
+Server Idle Probability:
+  Server 1 (Able) Idle Prob: {m['prob_server_1_idle']:.2f}
+  Server 2 (Baker) Idle Prob: {m['prob_server_2_idle']:.2f}
+
+Average service time (across both servers): {m['avg_service']:.2f} minutes
+Average time in system: {m['avg_in_system']:.2f} minutes"""
+
+
+# ==================== SINGLE SERVER SIMULATION ====================
+def single_server_simulation(num_applicants=None, rng=None, vectorized=False, progress=None, keep_rows=True,
+                             trace=None, arrival=None, service=None):
+    if vectorized:
+        from .vectorized import single_server_trace_vectorized, single_server_vectorized
+        _check_customers(num_applicants, trace, "num_applicants")
+        if trace is not None:
+            return single_server_trace_vectorized(as_trace(trace), num_applicants, progress, keep_rows)
+        return single_server_vectorized(num_applicants, rng, progress, keep_rows, arrival, service)
+    return single_server_stream(num_applicants, rng, progress, trace, arrival, service).run(keep_rows)
+
+
+def single_server_stream(num_applicants=None, rng=None, progress=None, trace=None, arrival=None, service=None):
+    """The textbook single server; with a ``trace``, at most ``num_applicants`` recorded customers are replayed.
+
+    ``arrival`` and ``service`` replace the interarrival and service tables
+    with other distributions that have a digit table.
+    """
+    _check_customers(num_applicants, trace, "num_applicants")
+    if trace is not None:
+        busy = [0]
+        customers = _serve_trace(trace, num_applicants, 1, progress, busy)
+        return ModelStream("single_server", _trace_schema(SINGLE_SERVER_SCHEMA),
+                           _single_server_trace_rows(customers, busy), single_server_performance)
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    service = service or SERVICE_DISTRIBUTION
+    return ModelStream("single_server", _drawn_schema(SINGLE_SERVER_SCHEMA, arrival, service),
+                       _single_server_rows(num_applicants, arrival, service, rng, progress),
+                       single_server_performance)
+
+
+def _single_server_rows(num_applicants, arrival_distribution, service_distribution, rng, progress):
+    streams = as_streams(rng)
+    arrival_rng = streams.stream("arrival")
+    service_rng = streams.stream("service")
+    arrival_table, arrival_low, arrival_high = digit_table(arrival_distribution, "arrival")
+    service_table, service_low, service_high = digit_table(service_distribution, "service")
+
+    waits = RunningStats()
+    in_system = RunningStats()
+    num_waited = 0
+    total_idle = 0
+    total_service = 0
+
+    # First applicant
+    rnd_arr = arrival_rng.randint(arrival_low, arrival_high)
+    rnd_serv = service_rng.randint(service_low, service_high)
+    serv_time = service_table[rnd_serv]
+    arrival = 0
+    end = serv_time
+    total_service += serv_time
+    waits.add(0)
+    in_system.add(serv_time)
+    yield (1, rnd_arr, 0, 0, rnd_serv, serv_time, 0, 0, serv_time, 0, serv_time)
+
+    # Remaining customers
+    for i in range(1, num_applicants):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, num_applicants)
+        rnd_arr = arrival_rng.randint(arrival_low, arrival_high)
+        inter = arrival_table[rnd_arr]
+        arrival += inter
+
+        rnd_serv = service_rng.randint(service_low, service_high)
+        serv_time = service_table[rnd_serv]
+        total_service += serv_time
+
+        if arrival < end:
+            start = end
+            wait = start - arrival
+            idle = 0
+            num_waited += 1
+        else:
+            start = arrival
+            wait = 0
+            idle = arrival - end
+            total_idle += idle
+
+        end = start + serv_time
+        waits.add(wait)
+        in_system.add(end - arrival)
+        yield (i + 1, rnd_arr, inter, arrival, rnd_serv, serv_time, start, wait, end, idle, end - arrival)
+
+    measures = _single_server_measures(num_applicants, waits.total, num_waited, total_idle,
+                                       total_service, in_system.total)
+    measures["max_wait"] = waits.max
+    measures["wait_std"] = waits.std
+    return measures
+
+
+def _single_server_measures(num_applicants, total_wait, num_waited, total_idle,
+                            total_service, total_in_system):
+    busy_plus_idle = total_service + total_idle
+    return {
+        "avg_wait": total_wait / num_applicants,
+        "prob_wait": num_waited / num_applicants,
+        "server_utilization": (total_service / busy_plus_idle) if busy_plus_idle > 0 else 0,
+        "prob_server_idle": (total_idle / busy_plus_idle) if busy_plus_idle > 0 else 0,
+        "avg_service": total_service / num_applicants,
+        "avg_in_system": total_in_system / num_applicants,
+    }
+
+
+def _single_server_trace_rows(customers, busy):
+    waits = RunningStats()
+    in_system = RunningStats()
+    num_waited = 0
+    total_idle = 0
+    end = 0
+
+    for cust, rnd_arr, inter, arrival, rnd_serv, server, serv_time, start, service_end in customers:
+        wait = start - arrival
+        if wait > 0:
+            num_waited += 1
+        idle = start - end
+        total_idle += idle
+        end = service_end
+        waits.add(wait)
+        in_system.add(end - arrival)
+        yield (cust, rnd_arr, inter, arrival, rnd_serv, serv_time, start, wait, end, idle, end - arrival)
+
+    measures = _single_server_measures(waits.count, waits.total, num_waited, total_idle, busy[0],
+                                       in_system.total)
+    measures["max_wait"] = waits.max
+    measures["wait_std"] = waits.std
+    return measures
+
+
+def single_server_performance(m):
+    return f"""Average waiting time: {m['avg_wait']:.2f} minutes
+Probability someone waits: {m['prob_wait']:.2f}
+Server utilization (busy fraction): {m['server_utilization']:.2f}
+Probability server idle: {m['prob_server_idle']:.2f}
+Average service time: {m['avg_service']:.2f} minutes
+Average time in system: {m['avg_in_system']:.2f} minutes"""
@@ -0,0 +1,133 @@
+"""Independent replications of a model across a process pool."""
+import hashlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import cache_key
+from .models import get_model
+from .stats import format_summaries, summarize_measures
+from .streams import RandomStreams
+
+
+def replication_seed(base_seed, index):
+    """Seed of replication ``index``, derived reproducibly from ``base_seed``.
+
+    Hashing (base seed, index) gives well-separated 128-bit seeds, so each
+    replication gets its own streams no matter which worker process runs it
+    or in what order.
+    """
+    digest = hashlib.sha256(f"{base_seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:16], "little")
+
+
+def replication_streams(base_seed, index, antithetic=False):
+    """Random streams of replication ``index``.
+
+    In antithetic mode replications ``2k`` and ``2k + 1`` share the seed of
+    pair ``k`` and the odd one mirrors every draw of the even one.
+    """
+    if antithetic:
+        return RandomStreams(replication_seed(base_seed, index // 2), antithetic=bool(index % 2))
+    return RandomStreams(replication_seed(base_seed, index))
+
+
+def run_replication(model, params, base_seed, index, antithetic=False):
+    streams = replication_streams(base_seed, index, antithetic)
+    # Only the measures are needed, so the rows are not kept
+    return get_model(model)(rng=streams, keep_rows=False, **params).measures
+
+
+def _run_chunk(model, params, base_seed, start, stop, antithetic=False):
+    return [run_replication(model, params, base_seed, index, antithetic) for index in range(start, stop)]
+
+
+def _chunks(total, count):
+    size, extra = divmod(total, count)
+    start = 0
+    for i in range(count):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            yield start, stop
+        start = stop
+
+
+class ReplicationSummary:
+    """Per-replication measures of a batch of runs and their confidence intervals."""
+
+    def __init__(self, model, params, seed, samples, confidence):
+        self.model = model
+        self.params = dict(params)
+        self.seed = seed
+        self.samples = samples
+        self.confidence = confidence
+        self.measures = summarize_measures(samples, confidence)
+
+    @property
+    def replications(self):
+        return len(self.samples)
+
+    def format(self):
+        return (f"{self.model}: {self.replications} replications (seed {self.seed})\n"
+                + format_summaries(self.measures))
+
+    def __repr__(self):
+        return f"ReplicationSummary(model={self.model!r}, replications={self.replications}, seed={self.seed})"
+
+
+def _collect_range(model, params, seed, start, stop, workers, antithetic, chunks_per_worker):
+    workers = max(1, min(workers, stop - start))
+    if workers == 1:
+        return _run_chunk(model, params, seed, start, stop, antithetic)
+    chunks = list(_chunks(stop - start, workers * chunks_per_worker))
+    samples = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, model, params, seed, start + lo, start + hi, antithetic)
+                   for lo, hi in chunks]
+        for future in futures:
+            samples.extend(future.result())
+    return samples
+
+
+def collect_samples(model, params, replications, seed, workers=None, antithetic=False,
+                    chunks_per_worker=4, cache=None):
+    """Measures of replications ``0 .. replications - 1``, in index order.
+
+    With a :class:`~simulation_engine.cache.ResultCache`, replications already
+    computed for the same model, parameters and seed are taken from it and
+    only the missing ones are run.
+    """
+    if replications < 1:
+        raise ValueError("replications must be at least 1")
+    get_model(model)
+    params = dict(params)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if cache is None:
+        return _collect_range(model, params, seed, 0, replications, workers, antithetic, chunks_per_worker)
+    key = cache_key(model, params, seed, kind="replications", antithetic=antithetic)
+    samples = cache.get(key) or []
+    if len(samples) < replications:
+        samples = samples + _collect_range(model, params, seed, len(samples), replications, workers,
+                                           antithetic, chunks_per_worker)
+        cache.put(key, samples)
+    return samples[:replications]
+
+
+def run_replications(model, params, replications, seed=None, workers=None, confidence=0.95,
+                     cache=None):
+    """Run ``replications`` independent replications of ``model`` with ``params``.
+
+    Replication ``i`` always uses the streams ``replication_streams(seed, i)``,
+    so a run is reproducible from ``seed`` regardless of ``workers``, and two
+    configurations run with the same seed share common random numbers.  With
+    ``workers=1`` everything runs in this process; otherwise the replications
+    are split into contiguous chunks and spread over a process pool, which
+    defaults to one worker per CPU.  Replications found in ``cache`` are not
+    run again.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    samples = collect_samples(model, params, replications, seed, workers, cache=cache)
+    return ReplicationSummary(model, params, seed, samples, confidence)
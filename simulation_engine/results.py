@@ -0,0 +1,140 @@
+"""Structured results returned by every model in the engine."""
+from collections import deque
+
+
+class Column:
+    """Name, storage type and display format of one result column.
+
+    Cells hold plain numbers; ``display`` turns one into the text shown in a
+    table.  ``fmt`` is a format spec or a callable, ``blank`` is a value shown
+    as an empty cell and ``shape`` is the per-row shape of array-valued cells.
+    """
+
+    __slots__ = ("name", "dtype", "fmt", "blank", "shape")
+
+    def __init__(self, name, dtype, fmt="", blank=None, shape=()):
+        self.name = name
+        self.dtype = dtype
+        self.fmt = fmt
+        self.blank = blank
+        self.shape = tuple(shape)
+
+    def display(self, value):
+        if self.blank is not None and value == self.blank:
+            return ""
+        if callable(self.fmt):
+            return self.fmt(value)
+        return format(value, self.fmt)
+
+    def __repr__(self):
+        return f"Column({self.name!r}, {self.dtype!r})"
+
+
+def display_row(schema, row):
+    return tuple(column.display(value) for column, value in zip(schema, row))
+
+
+class SimulationResult:
+    """Rows, performance measures and the formatted summary of one run.
+
+    ``rows`` holds one tuple of plain numbers per table row in ``columns``
+    order (``schema`` says how to display them), ``measures`` maps measure
+    names to plain numbers and ``performance`` is the summary text shown
+    under the GUI table.
+    """
+
+    def __init__(self, model, schema, rows, measures, performance):
+        self.model = model
+        self.schema = tuple(schema)
+        self.rows = rows
+        self.measures = measures
+        self.performance = performance
+
+    @property
+    def columns(self):
+        return tuple(column.name for column in self.schema)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def display_rows(self, start=0, stop=None):
+        """Rows ``start:stop`` formatted as table text."""
+        return [display_row(self.schema, row) for row in self.rows[start:stop]]
+
+    def __repr__(self):
+        return f"SimulationResult(model={self.model!r}, rows={len(self.rows)}, measures={self.measures!r})"
+
+
+class ArrayRows:
+    """Read-only sequence of row tuples backed by equal-length column arrays.
+
+    Rows are only built when indexed or iterated, so results of vectorized
+    runs keep their compact array form until something actually needs tuples.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = list(arrays)
+        self._length = len(self.arrays[0]) if self.arrays else 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            columns = [column[index].tolist() for column in self.arrays]
+            return list(zip(*columns))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return tuple(column[index].tolist() for column in self.arrays)
+
+    def __iter__(self):
+        chunk = 65536
+        for start in range(0, self._length, chunk):
+            yield from self[start:start + chunk]
+
+
+class ModelStream:
+    """Rows of a model run, produced one at a time.
+
+    Iterating runs the model and yields its table rows; once the iteration is
+    finished ``measures`` holds the performance measures.  Nothing is kept
+    between rows unless the caller keeps it, so a run of any length needs
+    constant memory.
+    """
+
+    def __init__(self, model, schema, generator, format_performance):
+        self.model = model
+        self.schema = tuple(schema)
+        self.measures = None
+        self._generator = generator
+        self._format_performance = format_performance
+
+    @property
+    def columns(self):
+        return tuple(column.name for column in self.schema)
+
+    def __iter__(self):
+        self.measures = yield from self._generator
+
+    @property
+    def performance(self):
+        if self.measures is None:
+            raise RuntimeError("The stream has not been run to completion")
+        return self._format_performance(self.measures)
+
+    def run(self, keep_rows=True, rows=None):
+        """Drain the stream into a SimulationResult.
+
+        Rows are appended to ``rows`` (a new list by default) as they are
+        produced, so another thread can watch it grow; with
+        ``keep_rows=False`` they are discarded and only the measures remain.
+        """
+        if rows is None:
+            rows = []
+        if keep_rows:
+            rows.extend(self)
+        else:
+            deque(self, maxlen=0)
+        return SimulationResult(self.model, self.schema, rows, self.measures, self.performance)
@@ -0,0 +1,176 @@
+"""Sequential stopping rules: simulate until a confidence interval is narrow enough.
+
+The target is a relative half width: ``0.05`` asks for a confidence interval
+of the mean within ±5% of the estimate.  :func:`replicate_until` adds
+independent replications of a terminating run; :func:`batch_means_until`
+extends a single long (steady-state) run batch by batch.  Both stop as soon
+as the target is met, or at their budget, and report which happened.
+"""
+import math
+import random
+
+from .cache import ResultCache
+from .models import STREAMS, get_schema
+from .replication import collect_samples
+from .stats import summarize
+from .streams import RandomStreams
+
+# Parameter setting the length of a streamed run, per model
+LENGTH_PARAMS = {
+    "double_server": "num_applicants",
+    "single_server": "num_applicants",
+    "multi_server": "num_customers",
+    "mn_inventory": "num_days",
+    "newspaper": "num_days",
+}
+
+
+class SequentialSummary:
+    """Estimate of one measure from a sequential run, with its stopping history.
+
+    ``history`` holds ``(n, mean, relative_half_width)`` after every check,
+    where ``n`` counts replications or batches.
+    """
+
+    def __init__(self, model, params, measure, target, seed, method, estimate, samples, history,
+                 observations, batch_size=None):
+        self.model = model
+        self.params = dict(params)
+        self.measure = measure
+        self.target = target
+        self.seed = seed
+        self.method = method
+        self.estimate = estimate
+        self.samples = samples
+        self.history = history
+        self.observations = observations
+        self.batch_size = batch_size
+
+    @property
+    def reached(self):
+        return self.estimate.relative_half_width <= self.target
+
+    def format(self):
+        s = self.estimate
+        if self.method == "replications":
+            size = f"{self.observations} replications"
+        else:
+            size = f"{len(self.samples)} batches of {self.batch_size:,} ({self.observations:,} observations)"
+        status = "target reached" if self.reached else "budget exhausted before the target"
+        return (f"{self.model}: {self.measure} = {s.mean:.4f} ± {s.half_width:.4f} "
+                f"({s.confidence:.0%} CI, relative half width {s.relative_half_width:.2%}, "
+                f"target {self.target:.2%})\n{size} (seed {self.seed}); {status}")
+
+    def __repr__(self):
+        return (f"SequentialSummary(model={self.model!r}, measure={self.measure!r}, method={self.method!r}, "
+                f"mean={self.estimate.mean:.6g}, reached={self.reached})")
+
+
+def _column(model, column):
+    """Index and blank value of a column of a model with a run length."""
+    if model not in LENGTH_PARAMS:
+        raise ValueError(f"{model!r} has no run length to extend; expected one of {', '.join(LENGTH_PARAMS)}")
+    schema = get_schema(model)
+    names = [c.name for c in schema]
+    if column not in names:
+        raise ValueError(f"Unknown column {column!r}; {model} has {', '.join(names)}")
+    index = names.index(column)
+    return index, schema[index].blank
+
+
+def _check_target(relative_precision):
+    if not relative_precision > 0:
+        raise ValueError("relative_precision must be positive")
+
+
+def replicate_until(model, params, measure, relative_precision, seed=None, confidence=0.95, initial=10,
+                    max_replications=10000, workers=None, cache=None):
+    """Add replications until ``measure``'s relative half width is at most ``relative_precision``.
+
+    After ``initial`` replications, each round projects the number needed
+    from the current variance (``n * (h / target)^2``) but at most doubles
+    ``n``, so a noisy early estimate cannot overshoot far.  Earlier
+    replications are kept (in ``cache`` if given) and never rerun.
+    """
+    _check_target(relative_precision)
+    if initial < 2:
+        raise ValueError("initial must be at least 2")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    if cache is None:
+        cache = ResultCache(max_items=1)
+
+    n = min(initial, max_replications)
+    history = []
+    while True:
+        samples = collect_samples(model, params, n, seed, workers, cache=cache)
+        if measure not in samples[0]:
+            raise ValueError(f"Unknown measure {measure!r}; {model} reports {', '.join(samples[0])}")
+        estimate = summarize(measure, (sample[measure] for sample in samples), confidence)
+        relative = estimate.relative_half_width
+        history.append((n, estimate.mean, relative))
+        if relative <= relative_precision or n >= max_replications:
+            break
+        needed = math.ceil(n * (relative / relative_precision) ** 2) if math.isfinite(relative) else 2 * n
+        n = min(max_replications, max(n + 1, min(needed, 2 * n)))
+    return SequentialSummary(model, params, measure, relative_precision, seed, "replications", estimate,
+                             [sample[measure] for sample in samples], history, n)
+
+
+def batch_means_until(model, params, column, relative_precision, seed=None, confidence=0.95, warmup=0,
+                      batches=20, batch_size=32, max_observations=10 ** 7):
+    """Extend one run until the batch-means interval of ``column`` is narrow enough.
+
+    Rows of the model's stream are read one at a time; after the first
+    ``warmup`` observations, each ``batch_size`` consecutive values of the
+    column form a batch.  Between ``batches`` and ``2 * batches`` batch means
+    are kept: when there are ``2 * batches``, neighbours are merged and the
+    batch size doubles, so batches grow with the run and their means become
+    nearly independent.  The run stops once the interval meets the target or
+    after ``max_observations``; the rest of the stream is never generated.
+    """
+    _check_target(relative_precision)
+    if batches < 2:
+        raise ValueError("batches must be at least 2")
+    index, blank = _column(model, column)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+
+    run_params = dict(params, **{LENGTH_PARAMS[model]: warmup + max_observations})
+    stream = iter(STREAMS[model](rng=RandomStreams(seed), **run_params))
+    means = []
+    history = []
+    total = 0.0
+    in_batch = 0
+    observations = 0
+    skipped = 0
+    estimate = None
+    for row in stream:
+        value = row[index]
+        if blank is not None and value == blank:
+            continue
+        if skipped < warmup:
+            skipped += 1
+            continue
+        total += value
+        in_batch += 1
+        observations += 1
+        if in_batch < batch_size:
+            continue
+        means.append(total / batch_size)
+        total = 0.0
+        in_batch = 0
+        if len(means) == 2 * batches:
+            means = [(means[i] + means[i + 1]) / 2 for i in range(0, len(means), 2)]
+            batch_size *= 2
+        if len(means) >= batches:
+            estimate = summarize(column, means, confidence)
+            history.append((len(means), estimate.mean, estimate.relative_half_width))
+            if estimate.relative_half_width <= relative_precision:
+                break
+    stream.close()
+    if estimate is None:
+        raise ValueError(f"max_observations={max_observations} is too short for {batches} batches of {batch_size}")
+    # Observations of an unfinished last batch are not part of the estimate
+    return SequentialSummary(model, params, column, relative_precision, seed, "batch means", estimate, means,
+                             history, observations - in_batch, batch_size)
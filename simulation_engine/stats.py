@@ -0,0 +1,120 @@
+"""Summary statistics and confidence intervals for simulation output."""
+import math
+from statistics import NormalDist
+
+
+def _t_cdf(t, df):
+    """CDF of Student's t for integer ``df`` (Abramowitz & Stegun 26.7.3-4)."""
+    theta = math.atan(abs(t) / math.sqrt(df))
+    c2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if df % 2:
+        for k in range(1, (df - 1) // 2):
+            term *= 2 * k / (2 * k + 1) * c2
+            total += term
+        two_sided = 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if df > 1 else 0.0))
+    else:
+        for k in range(1, df // 2):
+            term *= (2 * k - 1) / (2 * k) * c2
+            total += term
+        two_sided = math.sin(theta) * total
+    return 0.5 + math.copysign(two_sided / 2, t)
+
+
+def _t_pdf(t, df):
+    log_norm = math.lgamma((df + 1) / 2) - math.lgamma(df / 2) - 0.5 * math.log(df * math.pi)
+    return math.exp(log_norm - (df + 1) / 2 * math.log1p(t * t / df))
+
+
+def t_quantile(p, df):
+    """Quantile of Student's t distribution with ``df`` degrees of freedom.
+
+    Starts from the Cornish-Fisher expansion around the normal quantile
+    (Abramowitz & Stegun 26.7.5), which is within 1e-5 from thirty degrees of
+    freedom; below that it is polished with Newton steps on the exact CDF.
+    """
+    if df < 1:
+        raise ValueError("df must be at least 1")
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    g1 = (z2 + 1) * z / 4
+    g2 = ((5 * z2 + 16) * z2 + 3) * z / 96
+    g3 = (((3 * z2 + 19) * z2 + 17) * z2 - 15) * z / 384
+    g4 = ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) * z / 92160
+    t = z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+    if df < 30:
+        df = int(df)
+        for _ in range(50):
+            step = (_t_cdf(t, df) - p) / _t_pdf(t, df)
+            t -= step
+            if abs(step) < 1e-12 * max(1.0, abs(t)):
+                break
+    return t
+
+
+class MeasureSummary:
+    """Mean of one performance measure with a t-based confidence interval."""
+
+    def __init__(self, name, n, mean, std, half_width, confidence):
+        self.name = name
+        self.n = n
+        self.mean = mean
+        self.std = std
+        self.half_width = half_width
+        self.confidence = confidence
+
+    @property
+    def low(self):
+        return self.mean - self.half_width
+
+    @property
+    def high(self):
+        return self.mean + self.half_width
+
+    @property
+    def relative_half_width(self):
+        return self.half_width / abs(self.mean) if self.mean else math.inf
+
+    def as_dict(self):
+        return {
+            "name": self.name, "n": self.n, "mean": self.mean, "std": self.std,
+            "half_width": self.half_width, "low": self.low, "high": self.high,
+            "confidence": self.confidence,
+        }
+
+    def __repr__(self):
+        return f"MeasureSummary({self.name!r}, mean={self.mean:.6g}, half_width={self.half_width:.3g}, n={self.n})"
+
+
+def summarize(name, values, confidence=0.95):
+    values = list(values)
+    n = len(values)
+    if n == 0:
+        raise ValueError(f"No observations for {name!r}")
+    mean = math.fsum(values) / n
+    if n > 1:
+        std = math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (n - 1))
+        half_width = t_quantile(0.5 + confidence / 2, n - 1) * std / math.sqrt(n)
+    else:
+        std = 0.0
+        half_width = math.inf
+    return MeasureSummary(name, n, mean, std, half_width, confidence)
+
+
+def summarize_measures(samples, confidence=0.95):
+    """Summaries for every numeric measure in a list of measure dicts."""
+    names = [name for name, value in samples[0].items() if isinstance(value, (int, float))]
+    return {name: summarize(name, (sample[name] for sample in samples), confidence) for name in names}
+
+
+def format_summaries(summaries):
+    width = max(len(name) for name in summaries)
+    lines = []
+    for name, s in summaries.items():
+        lines.append(f"{name:<{width}}  {s.mean:>12.4f} ± {s.half_width:<10.4f}"
+                     f" [{s.low:.4f}, {s.high:.4f}]  (n={s.n}, {s.confidence:.0%} CI)")
+    return "\n".join(lines)
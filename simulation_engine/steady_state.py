@@ -0,0 +1,139 @@
+"""Steady-state estimates from one long run: MSER warm-up truncation and batch means.
+
+A queue started empty shows shorter waits at first than it does in the long
+run.  MSER-5 picks the truncation point from the output itself: it averages
+the series in groups of five and drops the prefix that minimizes the squared
+standard error of the remaining mean.  The rest is split into a fixed number
+of batches whose means give a t confidence interval.  One run then pays the
+warm-up once, instead of once per replication.
+"""
+import math
+import random
+from array import array
+
+from .models import STREAMS
+from .sequential import LENGTH_PARAMS, _column
+from .stats import summarize
+from .streams import RandomStreams
+
+MSER_BATCH = 5
+
+
+def mser(values, batch=MSER_BATCH):
+    """Number of leading ``values`` to drop, by MSER-``batch``.
+
+    Truncation points are searched over the first half of the batches only;
+    a best point at that limit means the series never settles (for example
+    an overloaded queue).
+    """
+    n = len(values) // batch
+    if n < 2:
+        return 0
+    means = [math.fsum(values[i * batch:(i + 1) * batch]) / batch for i in range(n)]
+    # Suffix sums give the mean and squared deviations of every tail in O(n).
+    total = total_sq = 0.0
+    suffix = [None] * n
+    for i in range(n - 1, -1, -1):
+        total += means[i]
+        total_sq += means[i] * means[i]
+        suffix[i] = (total, total_sq)
+    best_d, best = 0, math.inf
+    for d in range(n // 2 + 1):
+        total, total_sq = suffix[d]
+        m = n - d
+        statistic = max(total_sq - total * total / m, 0.0) / (m * m)
+        if statistic < best:
+            best_d, best = d, statistic
+    return best_d * batch
+
+
+def lag1_autocorrelation(values):
+    n = len(values)
+    if n < 3:
+        return math.nan
+    mean = math.fsum(values) / n
+    deviations = [v - mean for v in values]
+    denominator = math.fsum(d * d for d in deviations)
+    if denominator == 0:
+        return 0.0
+    return math.fsum(deviations[i] * deviations[i + 1] for i in range(n - 1)) / denominator
+
+
+def batch_means(values, batches=20, confidence=0.95, name="mean"):
+    """Confidence interval of the mean of a stationary series from ``batches`` batch means.
+
+    Returns ``(summary, batch_means)``; values that do not fill a whole batch
+    are dropped from the start, where the series is least settled.
+    """
+    size = len(values) // batches
+    if batches < 2 or size < 1:
+        raise ValueError(f"{len(values)} values cannot form {batches} batches")
+    start = len(values) - size * batches
+    means = [math.fsum(values[start + i * size:start + (i + 1) * size]) / size for i in range(batches)]
+    return summarize(name, means, confidence), means
+
+
+class SteadyStateEstimate:
+    """Batch-means estimate of a column's long-run mean after warm-up truncation."""
+
+    def __init__(self, model, params, column, seed, observations, warmup, estimate, means, settled):
+        self.model = model
+        self.params = dict(params)
+        self.column = column
+        self.seed = seed
+        self.observations = observations
+        self.warmup = warmup
+        self.estimate = estimate
+        self.batch_means = means
+        self.settled = settled
+        # Batch means close to independent have a lag-1 autocorrelation near zero.
+        self.lag1 = lag1_autocorrelation(means)
+
+    @property
+    def batch_size(self):
+        return (self.observations - self.warmup) // len(self.batch_means)
+
+    def format(self):
+        s = self.estimate
+        lines = [f"{self.model}: steady-state {self.column} = {s.mean:.4f} ± {s.half_width:.4f} "
+                 f"({s.confidence:.0%} CI)",
+                 f"{self.observations:,} observations, warm-up {self.warmup:,} dropped, "
+                 f"{len(self.batch_means)} batches of {self.batch_size:,} (seed {self.seed}), "
+                 f"lag-1 autocorrelation {self.lag1:.3f}"]
+        if not self.settled:
+            lines.append("warning: the warm-up reached half the run; the output may not have a steady state")
+        elif abs(self.lag1) > 0.2:
+            lines.append("warning: batch means are correlated; use a longer run or fewer batches")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (f"SteadyStateEstimate(model={self.model!r}, column={self.column!r}, "
+                f"mean={self.estimate.mean:.6g}, warmup={self.warmup}, settled={self.settled})")
+
+
+def steady_state(model, params, column, length, seed=None, warmup="mser", batches=20, confidence=0.95):
+    """Long-run mean of ``column`` from a single run of ``length`` customers or days.
+
+    The column's values are kept as a compact float array (blank cells are
+    skipped); ``warmup`` is a number of observations to drop, or ``"mser"``
+    to choose it with MSER-5.
+    """
+    index, blank = _column(model, column)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+
+    run_params = dict(params, **{LENGTH_PARAMS[model]: length})
+    values = array("d")
+    for row in STREAMS[model](rng=RandomStreams(seed), **run_params):
+        value = row[index]
+        if blank is None or value != blank:
+            values.append(value)
+
+    settled = True
+    if warmup == "mser":
+        warmup = mser(values)
+        settled = warmup < len(values) // MSER_BATCH // 2 * MSER_BATCH
+    elif warmup < 0 or warmup >= len(values):
+        raise ValueError(f"warmup must be in [0, {len(values)})")
+    estimate, means = batch_means(values[warmup:], batches, confidence, column)
+    return SteadyStateEstimate(model, params, column, seed, len(values), warmup, estimate, means, settled)
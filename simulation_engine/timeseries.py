@@ -0,0 +1,213 @@
+"""Time series of model runs, decimated for plotting.
+
+A :class:`SeriesTracker` turns table rows into the points of a model's chart
+series (queue lengths over the clock, inventory position by day, cumulative
+profit, ...) as the rows arrive.  Each series goes through a
+:class:`MinMaxDecimator`, which keeps the minimum and maximum of at most a
+fixed number of buckets, so a run of any length is drawn from a few
+thousand points, and spikes such as a queue's peak are never averaged away.
+:func:`lttb` further reduces a point list to a target size for drawing.
+"""
+from .inventory import BLANK
+
+
+class MinMaxDecimator:
+    """Constant-memory min/max bucketing of a stream of ``(x, y)`` points.
+
+    Consecutive points are grouped in buckets of ``width`` points and each
+    bucket keeps its lowest and highest point.  When ``2 * buckets`` buckets
+    are full, neighbours are merged and ``width`` doubles, so at most about
+    ``4 * buckets`` points are ever kept.
+    """
+
+    __slots__ = ("buckets", "width", "count", "first", "last", "_done", "_current", "_filled")
+
+    def __init__(self, buckets=1000):
+        if buckets < 1:
+            raise ValueError("buckets must be at least 1")
+        self.buckets = buckets
+        self.width = 1
+        self.count = 0
+        self.first = None
+        self.last = None
+        self._done = []
+        self._current = None
+        self._filled = 0
+
+    def add(self, x, y):
+        self.count += 1
+        self.last = (x, y)
+        current = self._current
+        if current is None:
+            if self.first is None:
+                self.first = (x, y)
+            # [x of min, min, x of max, max]
+            self._current = current = [x, y, x, y]
+            self._filled = 1
+        else:
+            if y < current[1]:
+                current[0] = x
+                current[1] = y
+            elif y > current[3]:
+                current[2] = x
+                current[3] = y
+            self._filled += 1
+        if self._filled == self.width:
+            self._done.append(current)
+            self._current = None
+            if len(self._done) == 2 * self.buckets:
+                self._merge()
+
+    def _merge(self):
+        done = self._done
+        merged = []
+        for i in range(0, len(done), 2):
+            a, b = done[i], done[i + 1]
+            low = a if a[1] <= b[1] else b
+            high = a if a[3] >= b[3] else b
+            merged.append([low[0], low[1], high[2], high[3]])
+        self._done = merged
+        self.width *= 2
+
+    def points(self):
+        """The kept points in x order, starting and ending with the first and latest point."""
+        if self.first is None:
+            return []
+        points = [self.first]
+        buckets = self._done + [self._current] if self._current is not None else self._done
+        for x_low, low, x_high, high in buckets:
+            pair = ((x_low, low), (x_high, high)) if x_low <= x_high else ((x_high, high), (x_low, low))
+            for point in pair:
+                if point != points[-1]:
+                    points.append(point)
+        if self.last != points[-1]:
+            points.append(self.last)
+        return points
+
+    def __len__(self):
+        return self.count
+
+
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets reduction of ``points`` to ``threshold`` points.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    buckets in between, the point forming the largest triangle with the point
+    kept before it and the average of the next bucket.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * size) + 1
+        stop = int((i + 1) * size) + 1
+        next_stop = min(int((i + 2) * size) + 1, n)
+        following = points[stop:next_stop] or [points[-1]]
+        avg_x = sum(p[0] for p in following) / len(following)
+        avg_y = sum(p[1] for p in following) / len(following)
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+# ==================== MODEL SERIES ====================
+# Each factory returns (x label, series names, point) where point(row) gives
+# the x value and a tuple with one y value per series.
+def _event_scheduling_series():
+    def point(row):
+        return row[0], (row[2], row[3])
+
+    return "Clock (min)", ("LQ(t)", "LS(t)"), point
+
+
+def _mn_inventory_series():
+    day = 0
+    ordered = 0
+
+    def point(row):
+        nonlocal day, ordered
+        day += 1
+        if row[7] != BLANK:
+            ordered = row[7]
+        net = row[5] - row[6]
+        # DaysUntil is shown while an order is outstanding
+        return day, (net + (ordered if row[9] != BLANK else 0), net)
+
+    return "Day", ("Inventory position", "Net inventory"), point
+
+
+def _newspaper_series():
+    profit = 0.0
+
+    def point(row):
+        nonlocal profit
+        profit += row[8]
+        return row[0], (profit,)
+
+    return "Day", ("Cumulative profit",), point
+
+
+def _queue_series(wait_index):
+    def factory():
+        def point(row):
+            return row[0], (row[wait_index],)
+
+        return "Customer", ("Wait",), point
+
+    return factory
+
+
+CHART_SERIES = {
+    "double_server": _queue_series(11),
+    "single_server": _queue_series(7),
+    "multi_server": _queue_series(8),
+    "event_scheduling": _event_scheduling_series,
+    "mn_inventory": _mn_inventory_series,
+    "newspaper": _newspaper_series,
+}
+
+
+class SeriesTracker:
+    """Decimated chart series of one model run, fed its rows as they are produced."""
+
+    def __init__(self, model, buckets=1000):
+        try:
+            factory = CHART_SERIES[model]
+        except KeyError:
+            raise ValueError(f"No chart series for model {model!r}") from None
+        self.model = model
+        self.x_label, self.names, self._point = factory()
+        self.decimators = [MinMaxDecimator(buckets) for _ in self.names]
+
+    def feed(self, rows):
+        point = self._point
+        adds = [decimator.add for decimator in self.decimators]
+        if len(adds) == 1:
+            add = adds[0]
+            for row in rows:
+                x, (y,) = point(row)
+                add(x, y)
+            return
+        for row in rows:
+            x, ys = point(row)
+            for add, y in zip(adds, ys):
+                add(x, y)
+
+    @property
+    def count(self):
+        return self.decimators[0].count
+
+    def series(self):
+        """``{name: points}`` of every series."""
+        return {name: decimator.points() for name, decimator in zip(self.names, self.decimators)}
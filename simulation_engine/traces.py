@@ -0,0 +1,298 @@
+"""Recorded arrivals and service durations that drive the queue models.
+
+A :class:`Trace` reads a log of real customers (one arrival and one
+service duration per customer) chunk by chunk, so replaying hundreds of
+millions of them needs memory for one chunk only:
+
+* CSV files are memory-mapped and split into chunks of whole lines, each
+  parsed by NumPy's C reader;
+* raw binary records and ``.npy`` files are memory-mapped and sliced, so
+  pages are read only as the replay reaches them.
+
+Arrivals are absolute timestamps or gaps between customers; either way the
+queue's clock starts at 0 with the first customer, as in the textbook
+tables.  NumPy is optional, as for :mod:`simulation_engine.vectorized`.
+"""
+import hashlib
+import io
+import mmap
+import os
+
+from .vectorized import np, require_numpy
+
+ARRIVALS = ("timestamps", "interarrival")
+CHUNK_ROWS = 1 << 20
+CHUNK_BYTES = 1 << 24
+# Two float64 fields per customer, native byte order
+BINARY_DTYPE = (("arrival", "<f8"), ("service", "<f8"))
+
+
+def _csv_columns(header, columns, delimiter):
+    names = [name.strip() for name in header.decode().split(delimiter)]
+    indices = []
+    for column in columns:
+        if isinstance(column, int):
+            indices.append(column)
+        elif column in names:
+            indices.append(names.index(column))
+        else:
+            raise ValueError(f"Unknown column {column!r}; the file has {', '.join(names)}")
+    return tuple(indices)
+
+
+# ==================== FILE READERS ====================
+# Shared with simulation_engine.fitting, which reads the same logs.
+def csv_layout(path, columns, delimiter=",", header=True):
+    """Indices of ``columns`` (header names or indices) and the byte offset of the first data line."""
+    if not header:
+        if not all(isinstance(column, int) for column in columns):
+            raise ValueError("Without a header, columns must be given as indices")
+        return tuple(columns), 0
+    with open(path, "rb") as f:
+        first = f.readline()
+    return _csv_columns(first.rstrip(b"\r\n"), columns, delimiter), len(first)
+
+
+def split_lines(path, start, parts):
+    """``parts + 1`` line starts cutting bytes ``[start, end of file)`` into about equal ranges."""
+    size = os.path.getsize(path)
+    step = max((size - start) // parts, 1)
+    bounds = [start]
+    if size > start:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for k in range(1, parts):
+                cut = data.find(b"\n", max(start + k * step - 1, bounds[-1]))
+                bounds.append(cut + 1 if cut >= 0 else size)
+    bounds.append(size)
+    return bounds
+
+
+def csv_chunks(path, columns, start, stop, delimiter=",", dtype=None, chunk_bytes=CHUNK_BYTES):
+    """``(arrays of the columns, end offset)`` for the lines in bytes ``[start, stop)``, chunk by chunk.
+
+    ``columns`` are indices and ``start`` and ``stop`` line starts; each
+    chunk is a run of whole lines parsed by :func:`numpy.loadtxt`.
+    """
+    require_numpy()
+    if start >= stop:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while start < stop:
+            end = min(start + chunk_bytes, stop)
+            if end < stop:
+                # End the chunk after its last full line, or extend it to one
+                cut = data.rfind(b"\n", start, end)
+                end = cut + 1 if cut >= 0 else min(data.find(b"\n", end) + 1 or stop, stop)
+            values = np.loadtxt(io.BytesIO(data[start:end]), delimiter=delimiter, usecols=columns,
+                                dtype=dtype or np.float64, ndmin=2).reshape(-1, len(columns))
+            yield [values[:, k] for k in range(len(columns))], end
+            start = end
+
+
+def binary_columns(path, columns, dtype=BINARY_DTYPE, offset=0):
+    """Memory-mapped arrays of ``columns`` of a ``.npy`` file or of raw ``dtype`` records after ``offset``.
+
+    Columns are field names of structured records, or indices into the
+    second axis of a two-dimensional ``.npy`` array.
+    """
+    require_numpy()
+    if str(path).endswith(".npy"):
+        records = np.load(path, mmap_mode="r")
+        if records.dtype.names is None and records.ndim != 2:
+            raise ValueError(f"{path} must hold a structured or two-dimensional array")
+    else:
+        records = np.memmap(path, dtype=np.dtype(list(dtype)), mode="r", offset=offset)
+    if records.dtype.names is None:
+        if not all(isinstance(column, int) for column in columns):
+            raise ValueError(f"{path} has no field names; give columns as indices")
+        return [records[:, column] for column in columns]
+    for field in columns:
+        if field not in records.dtype.names:
+            raise ValueError(f"Unknown field {field!r}; the file has {', '.join(records.dtype.names)}")
+    return [records[field] for field in columns]
+
+
+class Trace:
+    """Arrival times and service durations of recorded customers, read in chunks.
+
+    Use :meth:`from_csv`, :meth:`from_binary` or :meth:`from_arrays`.
+    ``arrivals`` says whether the arrival column holds ``"timestamps"`` or
+    ``"interarrival"`` gaps (the first gap is ignored), and ``scale``
+    multiplies every time, e.g. ``1 / 60`` for logs in seconds.  A trace
+    keeps only how to read its file, so it pickles to worker processes.
+    """
+
+    def __init__(self, source, name, arrivals="timestamps", scale=1.0, length=None, size=None):
+        require_numpy()
+        if arrivals not in ARRIVALS:
+            raise ValueError(f"Unknown arrivals {arrivals!r}; expected one of {', '.join(ARRIVALS)}")
+        self._source = source
+        self.name = name
+        self.arrivals = arrivals
+        self.scale = scale
+        self.length = length
+        self.size = size
+        self.rows_read = 0
+        self.bytes_read = 0
+
+    @classmethod
+    def from_csv(cls, path, arrival="arrival", service="service", arrivals="timestamps", scale=1.0,
+                 delimiter=",", header=True, chunk_bytes=CHUNK_BYTES):
+        """A CSV log; ``arrival`` and ``service`` are header names or column indices."""
+        columns, start = csv_layout(path, (arrival, service), delimiter, header)
+        source = ("csv", str(path), columns, start, delimiter, chunk_bytes)
+        return cls(source, str(path), arrivals, scale, size=os.path.getsize(path))
+
+    @classmethod
+    def from_binary(cls, path, dtype=BINARY_DTYPE, arrival="arrival", service="service", arrivals="timestamps",
+                    scale=1.0, offset=0, chunk_rows=CHUNK_ROWS):
+        """Fixed-size records, or a ``.npy`` file, mapped into memory.
+
+        A raw file holds records of the structured ``dtype`` after ``offset``
+        header bytes.  A ``.npy`` file is either structured, with ``arrival``
+        and ``service`` as field names, or two-dimensional, with them as
+        column indices (default 0 and 1).
+        """
+        require_numpy()
+        if str(path).endswith(".npy") and np.load(path, mmap_mode="r").dtype.names is None:
+            arrival = arrival if isinstance(arrival, int) else 0
+            service = service if isinstance(service, int) else 1
+        columns = (arrival, service)
+        length = len(binary_columns(path, columns, dtype, offset)[0])
+        source = ("binary", str(path), columns, dtype, offset, chunk_rows)
+        return cls(source, str(path), arrivals, scale, length=length, size=length)
+
+    @classmethod
+    def from_arrays(cls, arrival, service, arrivals="timestamps", scale=1.0, chunk_rows=CHUNK_ROWS, name="arrays"):
+        """Arrays (or memory maps) of equal length already at hand."""
+        require_numpy()
+        if len(arrival) != len(service):
+            raise ValueError("arrival and service must have the same length")
+        length = len(arrival)
+        return cls(("arrays", arrival, service, chunk_rows), name, arrivals, scale, length=length, size=length)
+
+    def _read(self):
+        """``(arrival values, service values, position)`` of every chunk of the source."""
+        kind, *args = self._source
+        if kind == "csv":
+            path, columns, start, delimiter, chunk_bytes = args
+            for (arrival, service), end in csv_chunks(path, columns, start, os.path.getsize(path), delimiter,
+                                                      chunk_bytes=chunk_bytes):
+                yield arrival, service, end
+            return
+        if kind == "binary":
+            path, columns, dtype, offset, chunk_rows = args
+            arrival, service = binary_columns(path, columns, dtype, offset)
+        else:
+            arrival, service, chunk_rows = args
+        for start in range(0, len(arrival), chunk_rows):
+            stop = min(start + chunk_rows, len(arrival))
+            yield (np.asarray(arrival[start:stop], dtype=np.float64),
+                   np.asarray(service[start:stop], dtype=np.float64), stop)
+
+    def fingerprint(self):
+        """What identifies the replay: the file's path, size and modification time, or the arrays' digest."""
+        kind, *args = self._source
+        if kind == "arrays":
+            digest = hashlib.sha256()
+            for array in args[:2]:
+                digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+            data = {"arrays": digest.hexdigest()}
+        else:
+            data = {"file": file_fingerprint(args[0]), "read": list(args[1:])}
+        return {"source": kind, **data, "arrivals": self.arrivals, "scale": self.scale}
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError(f"The length of {self.name} is only known once it has been read")
+        return self.length
+
+    def expected_length(self, limit=None):
+        """Customers a replay of at most ``limit`` will serve, estimated from the bytes read if need be."""
+        if self.length is not None:
+            total = self.length
+        elif self.bytes_read:
+            total = round(self.rows_read * self.size / self.bytes_read)
+        else:
+            total = 0
+        return min(total, limit) if limit is not None else total
+
+    def chunks(self, limit=None):
+        """``(arrival times, service durations)`` float64 arrays of at most ``limit`` customers.
+
+        Arrival times count from the first customer's arrival.
+        """
+        origin = None
+        last = 0.0
+        remaining = limit
+        self.rows_read = self.bytes_read = 0
+        chunks = self._read()
+        try:
+            for arrival, service, position in chunks:
+                if remaining is not None:
+                    arrival, service = arrival[:remaining], service[:remaining]
+                    remaining -= len(arrival)
+                self.rows_read += len(arrival)
+                self.bytes_read = position
+                if not len(arrival):
+                    if remaining == 0:
+                        break
+                    continue
+                if self.arrivals == "interarrival":
+                    if origin is None:
+                        arrival = arrival.copy()
+                        arrival[0] = 0.0
+                        origin = 0.0
+                    arrival = np.cumsum(arrival) + origin
+                    origin = arrival[-1]
+                else:
+                    if origin is None:
+                        origin = arrival[0]
+                    arrival = arrival - origin
+                # Replaying out-of-order records would serve customers before they arrive
+                first = self.rows_read - len(arrival) + 1
+                decreasing = np.diff(arrival, prepend=last) < 0
+                if decreasing.any():
+                    raise ValueError(f"Row {first + int(decreasing.argmax())} of {self.name} arrives before "
+                                     f"the previous one")
+                negative = service < 0
+                if negative.any():
+                    raise ValueError(f"Row {first + int(negative.argmax())} of {self.name} has a negative "
+                                     f"service duration")
+                last = arrival[-1]
+                if self.scale != 1.0:
+                    arrival = arrival * self.scale
+                    service = service * self.scale
+                yield arrival, service
+                if remaining == 0:
+                    break
+        finally:
+            chunks.close()
+
+    def __repr__(self):
+        return f"Trace({self.name!r}, arrivals={self.arrivals!r}, scale={self.scale!r})"
+
+
+def open_trace(path, **options):
+    """A :class:`Trace` of ``path``: CSV for ``.csv`` and ``.txt`` files, memory-mapped records otherwise."""
+    if str(path).lower().endswith((".csv", ".txt")):
+        return Trace.from_csv(path, **options)
+    return Trace.from_binary(path, **options)
+
+
+def file_fingerprint(path):
+    """Absolute path, size and modification time of a file, which change whenever it is rewritten."""
+    status = os.stat(path)
+    return {"path": os.path.abspath(path), "size": status.st_size, "mtime_ns": status.st_mtime_ns}
+
+
+def trace_fingerprint(trace):
+    """What identifies a ``trace`` parameter (a Trace or a file path) in cache keys."""
+    if isinstance(trace, Trace):
+        return trace.fingerprint()
+    return {"source": "path", "file": file_fingerprint(trace)}
+
+
+def as_trace(trace):
+    """``trace`` itself, or the trace of a file path (as given in scenario files)."""
+    return trace if isinstance(trace, Trace) else open_trace(trace)
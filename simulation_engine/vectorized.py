@@ -0,0 +1,287 @@
+"""NumPy implementations of the models for very long runs.
+
+NumPy is optional: the rest of the engine works without it, and the functions
+here raise ImportError when it is missing.
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .results import SimulationResult
+from .streams import as_streams
+
+_WORDS_PER_CHUNK = 1 << 16
+# Customers per array pass; a chunk's arrays stay in cache between passes
+CHUNK_ROWS = 1 << 18
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("The vectorized engine requires NumPy (pip install numpy)")
+    return np
+
+
+def draw_randint(rng, low, high, size):
+    """Return ``size`` values equal to ``size`` successive ``rng.randint(low, high)`` calls.
+
+    ``randint`` draws one 32-bit Mersenne Twister word per attempt, keeps its
+    top ``k`` bits and rejects values outside the range.  The generator state
+    is copied into NumPy's MT19937, the words are pulled in bulk with the same
+    rejection applied, and the advanced state is written back, so ``rng``
+    ends up exactly where the scalar calls would have left it.
+    """
+    require_numpy()
+    if rng is None:
+        rng = random
+    width = high - low + 1
+    k = width.bit_length()
+    version, internal, gauss_next = rng.getstate()
+    bit_generator = np.random.MT19937()
+    bit_generator.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.array(internal[:-1], dtype=np.uint32), "pos": internal[-1]},
+    }
+
+    out = np.empty(size, dtype=np.min_scalar_type(high) if low >= 0 else np.int64)
+    bits = np.min_scalar_type((1 << k) - 1)
+    filled = 0
+    while filled < size:
+        # Acceptance rate is width / 2**k >= 1/2; ask for a little more than expected.
+        needed = size - filled
+        words = min(_WORDS_PER_CHUNK, needed * (1 << k) // width + 64)
+        before = bit_generator.state
+        # Top k bits, in the narrowest type that holds them, so the passes below move fewer bytes
+        values = (bit_generator.random_raw(words) >> np.uint64(32 - k)).astype(bits)
+        valid = values < width
+        accepted = np.compress(valid, values)
+        if len(accepted) >= needed:
+            # Rewind and consume only the words the scalar calls would have used.
+            accepted = accepted[:needed]
+            used = int(np.flatnonzero(valid)[needed - 1]) + 1
+            bit_generator.state = before
+            bit_generator.random_raw(used)
+        out[filled:filled + len(accepted)] = accepted
+        filled += len(accepted)
+
+    state = bit_generator.state["state"]
+    rng.setstate((version, tuple(state["key"].tolist()) + (int(state["pos"]),), gauss_next))
+    if low:
+        out += low
+    if getattr(rng, "antithetic", False):
+        out = (low + high) - out
+    return out
+
+
+def time_dtype(num_entities, *distributions):
+    """Smallest safe integer dtype for clock values of a run of ``num_entities``.
+
+    Distributions with fractional values (fitted at a finer resolution) need float64.
+    """
+    from .distributions import has_fractions
+
+    require_numpy()
+    if has_fractions(*distributions):
+        return np.float64
+    horizon = num_entities * sum(max(dist.values) for dist in distributions)
+    return np.int32 if horizon < np.iinfo(np.int32).max else np.int64
+
+
+def lindley(arrivals, services, free=None):
+    """Service end times of a FIFO single server via the Lindley recursion.
+
+    ``end[i] = max(arrival[i], end[i-1]) + service[i]`` unrolls to
+    ``end[i] = S[i] + max_{j<=i}(arrival[j] - S[j-1])`` with ``S`` the running
+    total of service times, which is two cumulative array operations.  A
+    server busy until ``free`` adds ``free`` to the maximum, so long inputs
+    can be processed one chunk at a time.
+    """
+    total_service = np.cumsum(services, dtype=services.dtype)
+    end = arrivals - total_service
+    end += services
+    np.maximum.accumulate(end, out=end)
+    if free is not None:
+        np.maximum(end, free, out=end)
+    end += total_service
+    return end
+
+
+# ==================== SINGLE SERVER SIMULATION ====================
+def _single_server_chunk(arrival_times, service_durations, previous_end):
+    """Service starts, waits, ends and idle times of a chunk of customers after a server free at ``previous_end``.
+
+    :func:`lindley` gives the time each customer's predecessor leaves; as in
+    the scalar model a service starts at the later of that and the arrival,
+    so a customer who finds the server free waits exactly 0 (and one who
+    waits leaves no idle time) even when float clocks carry round-off.
+    """
+    previous = np.empty_like(service_durations)
+    previous[0] = previous_end
+    previous[1:] = lindley(arrival_times[:-1], service_durations[:-1], previous_end)
+    service_start = np.maximum(arrival_times, previous)
+    waiting_times = service_start - arrival_times
+    idle_times = np.subtract(service_start, previous, out=previous)
+    service_end = service_start + service_durations
+    return service_start, waiting_times, service_end, idle_times
+
+
+def single_server_vectorized(num_applicants, rng=None, progress=None, keep_rows=True, arrival=None, service=None):
+    from .columnar import ColumnarResult
+    from .distributions import digit_table
+    from .online import RunningStats
+    from .queueing import (ARRIVAL_DISTRIBUTION, SERVICE_DISTRIBUTION, SINGLE_SERVER_SCHEMA, _drawn_schema,
+                           _single_server_measures, single_server_performance)
+
+    require_numpy()
+    if num_applicants < 1:
+        raise ValueError("num_applicants must be at least 1")
+    arrival = arrival or ARRIVAL_DISTRIBUTION
+    service = service or SERVICE_DISTRIBUTION
+    _, arrival_low, arrival_high = digit_table(arrival, "arrival")
+    _, service_low, service_high = digit_table(service, "service")
+
+    if progress is not None:
+        progress(0, num_applicants)
+    streams = as_streams(rng)
+    if streams.shared:
+        if (arrival_low, arrival_high) != (service_low, service_high):
+            raise ValueError("A shared generator needs arrival and service digits of the same range; "
+                             "pass RandomStreams instead")
+        # The scalar model draws arrival, service, arrival, service, ...
+        digits = draw_randint(streams.rng, arrival_low, arrival_high, 2 * num_applicants)
+        rand_arrival_digits = digits[0::2]
+        rand_service_digits = digits[1::2]
+    else:
+        rand_arrival_digits = draw_randint(streams.stream("arrival"), arrival_low, arrival_high, num_applicants)
+        rand_service_digits = draw_randint(streams.stream("service"), service_low, service_high, num_applicants)
+
+    if progress is not None:
+        progress(num_applicants // 2, num_applicants)
+
+    # Clock values stay in int32 whenever the run cannot overflow it, which
+    # halves the memory traffic of every array pass below.
+    dtype = time_dtype(num_applicants, arrival, service)
+    # Integer clocks are summed in int64, so the totals are exact
+    total = np.int64 if dtype != np.float64 else np.float64
+    # Customer numbers stay integers when fractional distributions make the clock float
+    cust_dtype = np.int64 if dtype == np.float64 else dtype
+    waits = RunningStats()
+    num_waited = 0
+    total_idle = total_service = 0
+    previous_arrival = previous_end = dtype(0)
+    parts = []
+    for start in range(0, num_applicants, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, num_applicants)
+        interarrivals = arrival.lookup_array(rand_arrival_digits[start:stop], dtype)
+        if start == 0:
+            interarrivals[0] = 0
+        # Seeding the running sum with the previous arrival adds in the scalar model's order
+        first = interarrivals[0]
+        interarrivals[0] += previous_arrival
+        arrival_times = np.cumsum(interarrivals, dtype=dtype)
+        interarrivals[0] = first
+        service_durations = service.lookup_array(rand_service_digits[start:stop], dtype)
+        service_start, waiting_times, service_end, idle_times = _single_server_chunk(
+            arrival_times, service_durations, previous_end)
+
+        waits.merge(RunningStats.from_array(waiting_times))
+        num_waited += int(np.count_nonzero(waiting_times))
+        total_idle += idle_times.sum(dtype=total).item()
+        total_service += service_durations.sum(dtype=total).item()
+        if keep_rows:
+            parts.append([np.arange(start + 1, stop + 1, dtype=cust_dtype), rand_arrival_digits[start:stop],
+                          interarrivals, arrival_times, rand_service_digits[start:stop], service_durations,
+                          service_start, waiting_times, service_end, idle_times, service_end - arrival_times])
+        previous_arrival = arrival_times[-1]
+        previous_end = service_end[-1]
+
+    # Time in system is wait plus service for every customer
+    measures = _single_server_measures(num_applicants, waits.total, num_waited, total_idle, total_service,
+                                       waits.total + total_service)
+    measures["max_wait"] = waits.max
+    measures["wait_std"] = waits.std
+    performance = single_server_performance(measures)
+    schema = _drawn_schema(SINGLE_SERVER_SCHEMA, arrival, service)
+    if not keep_rows:
+        return SimulationResult("single_server", schema, [], measures, performance)
+    arrays = [np.concatenate(columns) for columns in zip(*parts)]
+    return ColumnarResult("single_server", schema, arrays, measures, performance)
+
+
+def single_server_trace_vectorized(trace, limit=None, progress=None, keep_rows=True):
+    """The single server replaying a :class:`~simulation_engine.traces.Trace`, one chunk at a time.
+
+    Each chunk goes through :func:`lindley` starting from the previous
+    chunk's last service end, and only running totals are kept between
+    chunks unless ``keep_rows`` asks for the whole table.
+    """
+    from .columnar import ColumnarResult
+    from .online import RunningStats
+    from .queueing import SINGLE_SERVER_SCHEMA, _single_server_measures, _trace_schema, single_server_performance
+
+    require_numpy()
+    schema = _trace_schema(SINGLE_SERVER_SCHEMA)
+    waits = RunningStats()
+    num_waited = 0
+    total_idle = total_service = total_in_system = 0.0
+    previous_arrival = previous_end = 0.0
+    parts = []
+    for arrival_times, service_durations in trace.chunks(limit):
+        service_start, waiting_times, service_end, idle_times = _single_server_chunk(
+            arrival_times, service_durations, previous_end)
+        time_in_system = service_end - arrival_times
+
+        waits.merge(RunningStats.from_array(waiting_times))
+        num_waited += int(np.count_nonzero(waiting_times))
+        total_idle += float(idle_times.sum())
+        total_service += float(service_durations.sum())
+        total_in_system += float(time_in_system.sum())
+        if keep_rows:
+            interarrivals = np.diff(arrival_times, prepend=previous_arrival)
+            count = waits.count - len(arrival_times)
+            no_digits = np.full(len(arrival_times), -1, dtype=np.int16)
+            parts.append([np.arange(count + 1, waits.count + 1), no_digits, interarrivals, arrival_times,
+                          no_digits, service_durations, service_start, waiting_times, service_end, idle_times,
+                          time_in_system])
+        previous_arrival = float(arrival_times[-1])
+        previous_end = float(service_end[-1])
+        if progress is not None:
+            progress(waits.count, trace.expected_length(limit))
+    if not waits.count:
+        raise ValueError(f"{trace.name} has no customers")
+
+    measures = _single_server_measures(waits.count, waits.total, num_waited, total_idle, total_service,
+                                       total_in_system)
+    measures["max_wait"] = waits.max
+    measures["wait_std"] = waits.std
+    performance = single_server_performance(measures)
+    if not keep_rows:
+        return SimulationResult("single_server", schema, [], measures, performance)
+    arrays = [np.concatenate(columns) for columns in zip(*parts)]
+    return ColumnarResult("single_server", schema, arrays, measures, performance)
+
+
+# ==================== NEWSPAPER SIMULATION ====================
+def newspaper_demands(num_days, rng=None):
+    """Daily demands of ``num_days`` newspaper days, drawn as the scalar model draws them."""
+    from .newspaper import DEMAND_DISTRIBUTIONS, NEWSDAY_DISTRIBUTION
+
+    require_numpy()
+    streams = as_streams(rng)
+    if streams.shared:
+        # The scalar model draws newsday, demand, newsday, demand, ...
+        digits = draw_randint(streams.rng, 1, 100, 2 * num_days)
+        newsday_digits = digits[0::2]
+        demand_digits = digits[1::2]
+    else:
+        newsday_digits = draw_randint(streams.stream("newsday"), 1, 100, num_days)
+        demand_digits = draw_randint(streams.stream("demand"), 1, 100, num_days)
+
+    # Newsday digit -> type index, then (type index, demand digit) -> demand.
+    day_types = NEWSDAY_DISTRIBUTION.values
+    type_codes = np.array([day_types.index(day_type) for day_type in NEWSDAY_DISTRIBUTION.table[1:]], dtype=np.uint8)
+    demand_table = np.stack([DEMAND_DISTRIBUTIONS[day_type].lookup_array(np.arange(101), np.uint8)
+                             for day_type in day_types])
+    return demand_table[type_codes[newsday_digits - 1], demand_digits]
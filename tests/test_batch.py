@@ -0,0 +1,68 @@
+"""Batch runs: scenario validation, the command line and traces."""
+import csv
+import json
+
+import pytest
+
+from simulation_engine.__main__ import main
+from simulation_engine.batch import Scenario, load_scenarios
+
+
+def _write(tmp_path, blocks):
+    path = tmp_path / "scenarios.json"
+    path.write_text(json.dumps(blocks))
+    return str(path)
+
+
+@pytest.mark.parametrize("model, params, message", [
+    ("newspaper", {"num_papers": 70, "num_days": -3}, "num_days must be at least 1"),
+    ("newspaper", {"num_papers": -1, "num_days": 5}, "num_papers must not be negative"),
+    ("mn_inventory", {"initial_inv": 12, "cycle_length": 5, "reorder_point": -6, "order_quantity": 10,
+                      "num_days": 20}, "must not be negative"),
+    ("event_scheduling", {"max_customers": 0, "stop_time": 60}, "max_customers must be at least 1"),
+    ("single_server", {"num_applicants": 0, "vectorized": True}, "num_applicants must be at least 1"),
+    ("multi_server", {"num_customers": 10, "servers": 0}, "servers must be at least 1"),
+    ("double_server", {"num_applicants": 10, "keep_rows": False}, "keep_rows cannot be set"),
+    ("newspaper", {"num_papers": 70, "num_days": 5, "vectorized": True}, "vectorized"),
+])
+def test_bad_values_fail_validation(model, params, message):
+    with pytest.raises(ValueError, match=message):
+        Scenario("0000-bad", model, params, seed=1).validate()
+
+
+def test_cli_rejects_bad_scenarios_before_running(tmp_path, capsys):
+    path = _write(tmp_path, [{"model": "newspaper", "params": {"num_papers": 70, "num_days": 5}},
+                             {"model": "newspaper", "params": {"num_papers": 70, "num_days": -3}}])
+    output = tmp_path / "out"
+    with pytest.raises(SystemExit) as exit_info:
+        main([path, "-o", str(output), "-w", "1"])
+    assert exit_info.value.code == 2
+    assert "Scenario 0001-newspaper: num_days must be at least 1" in capsys.readouterr().err
+    assert not output.exists()
+    with pytest.raises(SystemExit):
+        main([path, "-o", str(output), "--replications", "0"])
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_traces_of_engine_selected_scenarios(tmp_path, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    path = _write(tmp_path, {"model": "single_server", "seed": 3, "replications": 2,
+                             "params": {"num_applicants": 40, "vectorized": vectorized}})
+    output = tmp_path / "out"
+    assert main([path, "-o", str(output), "-w", "1", "--trace", "csv"]) == 0
+    with open(output / "metrics.csv", newline="") as f:
+        (record,) = csv.DictReader(f)
+    assert record["error"] == ""
+    with open(record["trace_path"], newline="") as f:
+        assert len(list(csv.reader(f))) == 41
+
+
+def test_matrix_expansion(tmp_path):
+    path = _write(tmp_path, {"model": "mn_inventory", "seed": 4,
+                             "params": {"initial_inv": 12, "cycle_length": 7, "order_quantity": 10, "num_days": 28},
+                             "matrix": {"reorder_point": [4, 5, 6], "initial_inv": [8, 16]}})
+    scenarios = load_scenarios(path, replications=3)
+    assert [(s.params["reorder_point"], s.params["initial_inv"]) for s in scenarios] == [
+        (4, 8), (4, 16), (5, 8), (5, 16), (6, 8), (6, 16)]
+    assert {s.seed for s in scenarios} == {4} and {s.replications for s in scenarios} == {3}
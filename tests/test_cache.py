@@ -0,0 +1,80 @@
+"""Result cache: hits, keys, and the size limits that keep large tables out of it."""
+import os
+import random
+import threading
+
+import simulation_engine as engine
+from simulation_engine import EmpiricalDistribution
+
+
+class _Table:
+    """A result-shaped value whose pickle would be huge."""
+
+    schema = tuple(range(10))
+
+    def __init__(self, num_rows):
+        self.rows = range(num_rows)
+
+    def __reduce__(self):
+        raise AssertionError("a result over the item limit must not be pickled")
+
+
+def test_cache_hits(tmp_path):
+    cache = engine.ResultCache(str(tmp_path))
+    params = {"num_papers": 70, "num_days": 30}
+    first = engine.cached_run("newspaper", params, 7, cache)
+    again = engine.cached_run("newspaper", params, 7, cache)
+    assert cache.hits == 1 and again.rows == first.rows
+    reopened = engine.ResultCache(str(tmp_path))
+    assert engine.cached_run("newspaper", params, 7, reopened).rows == first.rows
+    assert reopened.hits == 1
+    engine.cached_run("newspaper", params, 8, reopened)
+    assert reopened.misses == 1
+
+
+def test_cache_keys_tell_distributions_and_rewritten_traces_apart(tmp_path):
+    shifted = [EmpiricalDistribution.from_ranges([(1, 0, 49), (2, 50, 99)]),
+               EmpiricalDistribution.from_ranges([(1, 1, 50), (2, 51, 100)], 1, 100),
+               EmpiricalDistribution([1, 2], [0.50001, 0.49999])]
+    assert len({engine.cache_key("single_server", {"service": d}, 1) for d in shifted}) == 3
+
+    log = tmp_path / "log.csv"
+    log.write_text("arrival,service\n0,1\n1,1\n")
+    before = engine.cache_key("single_server", {"trace": str(log)}, 1)
+    log.write_text("arrival,service\n0,9\n1,9\n")
+    os.utime(log, ns=(0, os.stat(log).st_mtime_ns + 1))
+    assert engine.cache_key("single_server", {"trace": str(log)}, 1) != before
+
+
+def test_large_results_are_skipped_before_pickling(tmp_path):
+    cache = engine.ResultCache(str(tmp_path), max_item_bytes=2 ** 20)
+    assert not cache.put("large", _Table(10 ** 6))
+    assert "large" not in cache and cache.disk_bytes == 0
+    small = engine.newspaper_simulation(70, 30, random.Random(1))
+    assert cache.put("small", small) and cache.get("small") is small
+
+
+def test_memory_tier_is_bounded_in_bytes():
+    cache = engine.ResultCache(max_memory_bytes=3 * 10 ** 5)
+    results = [engine.single_server_simulation(1000, random.Random(seed)) for seed in range(4)]
+    for seed, result in enumerate(results):
+        cache.put(seed, result)
+    # Each table is about 88 kB by the estimate, so only the three most recent stay
+    assert cache.get(0) is None and all(cache.get(seed) is results[seed] for seed in (1, 2, 3))
+
+
+def test_puts_from_several_threads(tmp_path):
+    cache = engine.ResultCache(str(tmp_path), max_items=8)
+    result = engine.newspaper_simulation(70, 10, random.Random(2))
+
+    def put_many(offset):
+        for i in range(200):
+            cache.put(f"{offset}-{i}", result)
+            cache.get(f"{offset}-{i // 2}")
+
+    threads = [threading.Thread(target=put_many, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache._memory) == 8 and cache.get("3-199") is result
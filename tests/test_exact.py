@@ -0,0 +1,50 @@
+"""Exact expected values: agreement with simulation, and the work bound of the slow solvers."""
+import time
+
+import pytest
+
+import simulation_engine as engine
+from simulation_engine.newspaper import DEMAND_DISTRIBUTIONS, NEWSDAY_DISTRIBUTION, SELLING_PRICE
+
+
+def test_newspaper_matches_a_direct_sum():
+    expected_sold = sum(pt * pd * min(70, demand)
+                        for day_type, pt in zip(NEWSDAY_DISTRIBUTION.values, NEWSDAY_DISTRIBUTION.probabilities)
+                        for demand, pd in zip(DEMAND_DISTRIBUTIONS[day_type].values,
+                                              DEMAND_DISTRIBUTIONS[day_type].probabilities))
+    measures = engine.exact_measures("newspaper", num_papers=70, num_days=20)
+    assert measures["total_revenue"] == pytest.approx(20 * SELLING_PRICE * expected_sold)
+
+
+@pytest.mark.parametrize("model, params", [
+    ("single_server", {"num_applicants": 20}),
+    ("double_server", {"num_applicants": 20}),
+    ("mn_inventory", {"initial_inv": 12, "cycle_length": 7, "reorder_point": 6, "order_quantity": 10,
+                      "num_days": 28}),
+])
+def test_simulation_means_agree(model, params):
+    exact = engine.exact_measures(model, **params)
+    summary = engine.run_replications(model, params, 400, seed=5, workers=1)
+    for name, value in exact.items():
+        if name in summary.measures and name not in ("server_utilization", "prob_server_idle"):
+            estimate = summary.measures[name]
+            assert abs(estimate.mean - value) <= 2 * estimate.half_width + 1e-9, name
+
+
+@pytest.mark.parametrize("model, params", [
+    ("double_server", {"num_applicants": 3000}),
+    ("mn_inventory", {"initial_inv": 12, "cycle_length": 7, "reorder_point": 6, "order_quantity": 10,
+                      "num_days": 10**6}),
+])
+def test_slow_solvers_give_up(model, params):
+    start = time.perf_counter()
+    with pytest.raises(engine.ExactTooCostly, match="run the simulation instead"):
+        engine.exact_measures(model, max_work=10**5, **params)
+    assert time.perf_counter() - start < 1
+    # A ValueError, so batch runs and the GUI report it as bad input
+    assert issubclass(engine.ExactTooCostly, ValueError)
+
+
+def test_settling_runs_stay_within_the_bound():
+    measures = engine.exact_measures("single_server", num_applicants=10**7)
+    assert measures["prob_wait"] == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,71 @@
+"""Fitted input tables: families, and fractional values in every model and saved result."""
+import math
+import random
+
+import pytest
+
+import simulation_engine as engine
+from simulation_engine import DistributionFit
+
+np = pytest.importorskip("numpy")
+
+
+def _half_minutes(mean, seed):
+    """A table fitted at resolution 0.5, so most of its values are fractional."""
+    values = np.random.default_rng(seed).exponential(mean, 20000) + 0.5
+    return DistributionFit(resolution=0.5).add(values).empirical()
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return _half_minutes(4.0, 1), _half_minutes(3.0, 2)
+
+
+def _is_half(value):
+    return float(value * 2).is_integer()
+
+
+@pytest.mark.parametrize("model, params", [
+    ("single_server", {"num_applicants": 300}),
+    ("single_server", {"num_applicants": 300, "vectorized": True}),
+    ("double_server", {"num_applicants": 300}),
+    ("multi_server", {"num_customers": 300, "servers": 3}),
+    ("event_scheduling", {"max_customers": 100, "stop_time": 400}),
+])
+def test_fractional_tables_keep_their_halves(model, params, tables, tmp_path):
+    arrival, service = tables
+    key = "interarrival" if model == "event_scheduling" else "arrival"
+    result = engine.run_model(model, rng=random.Random(0), **{key: arrival, "service": service}, **params)
+    saved = engine.write_columnar(result, str(tmp_path / model))
+    assert saved.display_rows() == result.display_rows()
+    clock = saved.columns[0] if model == "event_scheduling" else "Arrive"
+    times = saved.column(clock)
+    assert times.dtype == np.float64 and any(not float(t).is_integer() for t in times)
+    assert all(_is_half(t) for t in times)
+    if model != "event_scheduling":
+        # Customer numbers stay integers
+        assert saved.column("Cust").dtype.kind == "i" and result.display_rows()[2][0] == "3"
+
+
+def test_fel_keeps_event_types_and_fractional_times(tables):
+    arrival, service = tables
+    result = engine.event_scheduling_simulation(50, 200, random.Random(3), interarrival=arrival, service=service)
+    for row, shown in zip(result.rows, result.display_rows()):
+        for kind, time in row[4]:
+            if kind >= 0:
+                assert f"({'DA'[kind]},{time:g})" in shown[4]
+                assert time >= row[0] and _is_half(time)
+
+
+def test_integer_tables_keep_integer_columns(tmp_path):
+    result = engine.event_scheduling_simulation(20, 60, random.Random(1))
+    saved = engine.write_columnar(result, str(tmp_path / "es"))
+    assert saved.column("Clock").dtype.kind == "i" and saved.column("FEL").shape == (len(result), 5, 2)
+    assert saved.display_rows() == result.display_rows()
+    assert result.display_rows()[0][4].startswith("(D,") or result.display_rows()[0][4].startswith("(A,")
+
+
+def test_compare_keeps_tail_log_likelihoods_finite():
+    fit = DistributionFit().add(np.random.default_rng(7).exponential(5.0, 5000))
+    ranked = fit.compare()
+    assert len(ranked) > 1 and all(math.isfinite(aic) for aic, _ in ranked)
@@ -0,0 +1,84 @@
+"""Invariants the engine promises: baseline output, scalar/vectorized parity, event order, IS bias.
+
+Run from the repository root with ``python -m pytest``.
+"""
+import hashlib
+import random
+
+import pytest
+
+import simulation_engine as engine
+from simulation_engine import EmpiricalDistribution
+
+SEEDS = (0, 1, 2)
+
+# Digests of the rows and summary the original GUI methods produced after random.seed(seed)
+BASELINE = {
+    ("double_server_simulation", (50,)): ("8f25c4bcaf8aa76b", "6abd24f938d4f20b", "9fbd864b9269402d"),
+    ("single_server_simulation", (50,)): ("6c8d3cb2c81b869e", "86462401960161e6", "d69de7fa4642a71a"),
+    ("mn_inventory_simulation", (12, 7, 6, 10, 60)): ("e8fe23b1e78aa596", "8e7c852c9e44bd89", "853e48dc13d3b50b"),
+    ("newspaper_simulation", (70, 40)): ("290f2d690efa33e7", "f1471751a9dc70a9", "df462ad2218792a4"),
+}
+
+
+def _digest(result):
+    digest = hashlib.sha256()
+    for row in result.display_rows():
+        digest.update(("\t".join(row) + "\n").encode())
+    digest.update(result.performance.encode())
+    return digest.hexdigest()[:16]
+
+
+@pytest.mark.parametrize("name, args", list(BASELINE))
+def test_baseline_output(name, args):
+    for seed, expected in zip(SEEDS, BASELINE[name, args]):
+        random.seed(seed)
+        assert _digest(getattr(engine, name)(*args)) == expected, (name, seed)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("num_applicants", [1, 50, 5000])
+def test_vectorized_single_server_matches_scalar(seed, num_applicants):
+    pytest.importorskip("numpy")
+    scalar_rng, vector_rng = random.Random(seed), random.Random(seed)
+    scalar = engine.single_server_simulation(num_applicants, scalar_rng)
+    vector = engine.single_server_simulation(num_applicants, vector_rng, vectorized=True)
+    assert vector.display_rows() == scalar.display_rows()
+    # wait_std comes from array sums rather than Welford updates, so only its last bits may differ
+    assert vector.measures == pytest.approx(scalar.measures, rel=1e-12)
+    assert vector.performance == scalar.performance
+    # The NumPy draws must leave the Mersenne Twister where the scalar path does
+    assert vector_rng.getstate() == scalar_rng.getstate()
+
+
+@pytest.mark.parametrize("low, high", [(0, 99), (1, 100), (0, 255), (3, 1000), (-5, 5)])
+def test_draw_randint_matches_randint(low, high):
+    pytest.importorskip("numpy")
+    from simulation_engine.vectorized import draw_randint
+
+    bulk, scalar = random.Random(4), random.Random(4)
+    assert draw_randint(bulk, low, high, 100000).tolist() == [scalar.randint(low, high) for _ in range(100000)]
+    assert bulk.getstate() == scalar.getstate()
+
+
+def test_departure_before_arrival_at_the_same_time():
+    two = EmpiricalDistribution.from_ranges([(2, 0, 99)])
+    result = engine.event_scheduling_simulation(5, 100, random.Random(0), interarrival=two, service=two)
+    clocks = [row[0] for row in result.rows]
+    events = [row[1] for row in result.rows]
+    assert len(set(clocks)) < len(clocks), "expected a departure and an arrival at the same time"
+    for clock in set(clocks[1:]):
+        tied = [event for c, event in zip(clocks, events) if c == clock]
+        # Departures carry the negated customer number
+        assert tied == sorted(tied), clock
+
+
+@pytest.mark.parametrize("per, num_days", [("row", 20), ("run", 5)])
+def test_importance_sampling_is_unbiased(per, num_days):
+    # Demand above 90 only happens on good days (probability 0.35), as 100 (probability 0.07)
+    daily = 0.35 * 0.07
+    exact = daily if per == "row" else 1 - (1 - daily) ** num_days
+    summary = engine.importance_sampling("newspaper", {"num_papers": 70, "num_days": num_days},
+                                         engine.Exceeds("Dem", 90), {"demand": 2.0, "newsday": -2.0},
+                                         replications=4000, seed=11, per=per, workers=1)
+    assert abs(summary.probability - exact) <= summary.estimate.half_width
@@ -0,0 +1,84 @@
+"""Trace replay: readers, scalar/vectorized parity, pickling and saved results."""
+import pickle
+import random
+
+import pytest
+
+import simulation_engine as engine
+
+np = pytest.importorskip("numpy")
+
+
+def _exponential_trace(n=200000, seed=5, chunk_rows=1 << 20):
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1.0, n))
+    services = rng.exponential(0.95, n)
+    return engine.Trace.from_arrays(arrivals, services, chunk_rows=chunk_rows)
+
+
+@pytest.mark.parametrize("chunk_rows", [1 << 20, 4096])
+def test_vectorized_replay_matches_scalar(chunk_rows):
+    trace = _exponential_trace(chunk_rows=chunk_rows)
+    scalar = engine.single_server_simulation(trace=trace)
+    vector = engine.single_server_simulation(trace=trace, vectorized=True)
+    # Customers who find the server free wait exactly 0 on both paths
+    assert vector.measures["prob_wait"] == scalar.measures["prob_wait"]
+    assert vector.measures == pytest.approx(scalar.measures, rel=1e-9)
+    assert vector.display_rows() == scalar.display_rows()
+    assert vector.column("Idle").min() >= 0 and vector.column("Wait").min() >= 0
+
+
+def test_replay_reproduces_a_drawn_run(tmp_path):
+    drawn = engine.single_server_simulation(200, random.Random(3))
+    path = tmp_path / "log.csv"
+    with open(path, "w") as f:
+        f.write("arrival,service\n")
+        for row in drawn.rows:
+            f.write(f"{row[3]},{row[5]}\n")
+    for vectorized in (False, True):
+        replay = engine.single_server_simulation(trace=engine.open_trace(str(path)), vectorized=vectorized)
+        assert replay.measures == pytest.approx(drawn.measures)
+
+
+def test_readers_agree(tmp_path):
+    rng = np.random.default_rng(1)
+    arrivals = np.cumsum(rng.integers(1, 10, 5000)).astype(float)
+    services = rng.integers(1, 10, 5000).astype(float)
+    csv_path = tmp_path / "log.csv"
+    np.savetxt(csv_path, np.column_stack([arrivals, services]), delimiter=",", header="arrival,service",
+               comments="", fmt="%g")
+    records = np.empty(5000, dtype=list(engine.traces.BINARY_DTYPE))
+    records["arrival"], records["service"] = arrivals, services
+    records.tofile(tmp_path / "log.bin")
+    np.save(tmp_path / "log.npy", np.column_stack([arrivals, services]))
+    gaps = np.diff(arrivals, prepend=0.0)
+    traces = [engine.Trace.from_csv(str(csv_path), chunk_bytes=4096), engine.open_trace(str(tmp_path / "log.bin")),
+              engine.open_trace(str(tmp_path / "log.npy")),
+              engine.Trace.from_arrays(gaps, services, arrivals="interarrival")]
+    results = [engine.single_server_simulation(trace=trace).measures for trace in traces]
+    assert all(result == results[0] for result in results)
+
+
+def test_out_of_order_timestamps_are_rejected():
+    trace = engine.Trace.from_arrays(np.array([0.0, 5.0, 4.0]), np.ones(3))
+    with pytest.raises(ValueError, match="Row 3 of arrays arrives before the previous one"):
+        engine.single_server_simulation(trace=trace)
+
+
+def test_traces_pickle_to_workers(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("arrival,service\n0,1.1\n1,3.6\n2.2,1.1\n3,1\n")
+    trace = engine.Trace.from_csv(str(path))
+    clone = pickle.loads(pickle.dumps(trace))
+    assert [a.tolist() for a in next(clone.chunks())] == [a.tolist() for a in next(trace.chunks())]
+    summary = engine.run_replications("single_server", {"trace": trace}, 2, seed=1, workers=2)
+    assert summary.measures["avg_wait"].mean == pytest.approx(1.35)
+
+
+def test_saved_replay_keeps_its_schema(tmp_path):
+    trace = engine.Trace.from_arrays(np.array([0.0, 1.0, 2.2]), np.array([1.1, 3.6, 1.1]))
+    result = engine.single_server_simulation(trace=trace)
+    saved = engine.write_columnar(result, str(tmp_path / "replay"))
+    reopened = engine.ColumnarResult.load(str(tmp_path / "replay"))
+    assert saved.display_rows() == reopened.display_rows() == result.display_rows()
+    assert reopened.display_rows()[1][1] == "" and reopened.display_rows()[1][5] == "3.6"
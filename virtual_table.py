@@ -0,0 +1,121 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTable(ttk.Frame):
+    """Scrollable table that only materializes the rows currently on screen.
+
+    The rows live in a backing sequence (anything with ``len`` and integer
+    indexing); the Treeview holds one item per visible line and those items
+    are re-filled as the user scrolls, so showing or clearing a million-row
+    result costs the same as a screenful.  ``format_row`` turns a stored row
+    into the cell texts and is only applied to the rows on screen.
+    """
+
+    HEADING_HEIGHT = 25
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, master, columns, headings=None, widths=80, format_row=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = ()
+        self.format_row = format_row
+        # Optional Instrumentation that gets the format and insert times of each refresh
+        self.instrumentation = None
+        self.offset = 0
+        self._items = []
+        self._visible = 1
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or self.DEFAULT_ROW_HEIGHT)
+
+        self.scroll_y = ttk.Scrollbar(self, command=self._on_scrollbar)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="none",
+                                 xscrollcommand=self.scroll_x.set)
+        self.scroll_x.config(command=self.tree.xview)
+
+        if isinstance(widths, int):
+            widths = [widths] * len(columns)
+        for col, heading, width in zip(columns, headings or columns, widths):
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=width, anchor=tk.CENTER)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self._visible))
+        self.tree.bind("<Next>", lambda event: self.scroll(self._visible))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.rows)))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def set_rows(self, rows):
+        """Show ``rows``; the sequence is kept by reference, not copied."""
+        self.rows = rows
+        self.offset = 0
+        self.refresh()
+
+    def clear(self):
+        self.set_rows(())
+
+    def scroll(self, lines):
+        self.scroll_to(self.offset + lines)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.rows) - self._visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def refresh(self):
+        """Re-fill the visible window, e.g. after the backing sequence grew."""
+        start = time.perf_counter()
+        total = len(self.rows)
+        self.offset = max(0, min(self.offset, total - self._visible))
+        shown = max(0, min(self._visible, total - self.offset))
+
+        values = [self.rows[i] for i in range(self.offset, self.offset + shown)]
+        if self.format_row is not None:
+            values = [self.format_row(row) for row in values]
+        formatted = time.perf_counter()
+
+        while len(self._items) < shown:
+            self._items.append(self.tree.insert("", tk.END))
+        if len(self._items) > shown:
+            self.tree.delete(*self._items[shown:])
+            del self._items[shown:]
+        for item, row in zip(self._items, values):
+            self.tree.item(item, values=row)
+
+        if total:
+            self.scroll_y.set(self.offset / total, (self.offset + shown) / total)
+        else:
+            self.scroll_y.set(0, 1)
+
+        if self.instrumentation is not None:
+            self.instrumentation.add_time("format", formatted - start)
+            self.instrumentation.add_time("ui_insert", time.perf_counter() - formatted)
+            self.instrumentation.count("ui_refreshes")
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.rows))
+        elif unit == "pages":
+            self.scroll(int(amount) * self._visible)
+        else:
+            self.scroll(int(amount))
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - self.HEADING_HEIGHT) // self._row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self.refresh()